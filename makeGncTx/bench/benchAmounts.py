@@ -0,0 +1,94 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchAmounts.py -- benchmark converting the Gross, Net and Units of a large batch of trades:
+#                    per-trade regexes VS to_scaled_int on each row VS amountColumns on whole columns
+#
+#   python3 benchAmounts.py [-n 10000 100000] [-p bad %]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import time
+import random
+from argparse import ArgumentParser
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+from monarchTokens import RE_DOLLARS, RE_UNITS
+from amountColumns import scale_columns, HAVE_NUMPY
+
+PLACES = { GROSS: 2, NET: 2, UNITS: 4 }
+
+
+def synth_trades(p_num:int, p_bad_pct:int, p_seed:int = 1) -> list:
+    rand = random.Random(p_seed)
+    trades = []
+    for _ in range(p_num):
+        gross = rand.randint(-9999999, 9999999)
+        sign = '-' if gross < 0 else ''
+        dollars = "{}${:,}.{:02d}".format(sign, abs(gross) // 100, abs(gross) % 100)
+        units = rand.randint(-999999999, 999999999)
+        trades.append({ GROSS: dollars, NET: dollars,
+                        UNITS: "{}{}.{:04d}".format('-' if units < 0 else '', abs(units) // 10000, abs(units) % 10000) })
+    for row in rand.sample(range(p_num), p_num * p_bad_pct // 100):
+        trades[row][UNITS] = "n/a"
+    return trades
+
+
+def regex_amount(p_regex, p_value:str):
+    re_match = p_regex.match(p_value)
+    if not re_match:
+        return None
+    amount = int( (re_match.group(2) + re_match.group(3)).replace(',', '') )
+    return -amount if re_match.group(1) else amount
+
+
+def by_regex(p_trades:list) -> list:
+    """the per-trade path of ParseMonarchInput.match_trade_amounts"""
+    return [ ( regex_amount(RE_DOLLARS, tx[GROSS]), regex_amount(RE_DOLLARS, tx[NET]), regex_amount(RE_UNITS, tx[UNITS]) )
+             for tx in p_trades ]
+
+
+def by_row(p_trades:list) -> list:
+    results = []
+    for tx in p_trades:
+        try:
+            results.append( tuple(to_scaled_int(tx[key], places) for key, places in PLACES.items()) )
+        except ValueError:
+            results.append(None)
+    return results
+
+
+def by_column(p_trades:list) -> list:
+    columns = scale_columns(p_trades, PLACES)
+    return list( zip(*(columns[key].to_list() for key in PLACES)) )
+
+
+def bench_amounts_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the conversion of trade amounts", prog="python3 benchAmounts.py")
+    arg_parser.add_argument('-n', '--trades', nargs='+', type=int, default=[10000, 100000], help="trades per batch")
+    arg_parser.add_argument('-p', '--bad', type=int, default=1, help="percent of the trades with bad units")
+    opts = arg_parser.parse_args(args)
+
+    print(f"numpy {'IS' if HAVE_NUMPY else 'is NOT'} available")
+    for num in opts.trades:
+        trades = synth_trades(num, opts.bad)
+        print(f"{num} trades with {opts.bad}% bad:")
+        for name, func in (("regex", by_regex), ("to_scaled_int", by_row), ("columns", by_column)):
+            start = time.perf_counter()
+            results = func(trades)
+            secs = time.perf_counter() - start
+            bad = sum( 1 for res in results if res is None or None in res )
+            print(f"  {name:14s}: {secs:8.3f} s = {num / secs:10.0f} trades/s ; {bad} bad")
+
+
+if __name__ == "__main__":
+    bench_amounts_main(sys.argv[1:])
@@ -0,0 +1,113 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchCardCsv.py -- benchmark parseCardCsv on synthetic CIBC and PC Banking csv files,
+#                    and optionally the write of the parsed txs through GnucashSession on the in-memory bindings
+#
+#   python3 benchCardCsv.py [-n 10000 100000] [-w]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import csv
+import time
+import random
+import tempfile
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+from datetime import date, timedelta
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+# MUST be set before gncBindings is first imported
+os.environ[GNC_BINDINGS_ENV] = MOCK_BINDINGS
+from parseCardCsv import CardCsvStream, collect_cards
+
+MERCHANTS = [ "LOBLAWS #170             OTTAWA       ON ", "QUICKIE #60              OTTAWA       ON ",
+              "THE FROCK EXCHANGE KANATA, ON", "FIDO Mobile *779553346   888-481-3436 ON ",
+              "SHOPPERS DRUG MART #1243 OTTAWA       ON ", "Amazon Downloads www.Amazon.ca, ON" ]
+
+
+def synth_rows(p_rows:int, p_seed:int) -> list:
+    """(date, description, cents) with about 1 payment in 30 rows, 50 rows per day"""
+    rand = random.Random(p_seed)
+    start = date(2015, 1, 1)
+    rows = []
+    for num in range(p_rows):
+        if rand.random() < 1/30:
+            rows.append( (start + timedelta(days=num // 50), "PAYMENT THANK YOU", -rand.randint(10000, 500000)) )
+        else:
+            rows.append( (start + timedelta(days=num // 50), rand.choice(MERCHANTS), rand.randint(100, 40000)) )
+    return rows
+
+
+def write_cibc(p_file:str, p_rows:list):
+    with open(p_file, 'w', newline='') as fp:
+        writer = csv.writer(fp)
+        for tx_date, desc, cents in p_rows:
+            amount = "{}.{:02d}".format(abs(cents) // 100, abs(cents) % 100)
+            writer.writerow( [tx_date.isoformat(), desc, amount if cents > 0 else '', '' if cents > 0 else amount,
+                              "4500********7414"] )
+
+
+def write_pcbanking(p_file:str, p_rows:list):
+    with open(p_file, 'w', newline='') as fp:
+        writer = csv.writer(fp)
+        for tx_date, desc, cents in p_rows:
+            writer.writerow( ["{}/{}/{}".format(tx_date.month, tx_date.day, tx_date.year), desc,
+                              "{}{}.{:02d}".format('-' if cents > 0 else '', abs(cents) // 100, abs(cents) % 100)] )
+
+
+def parse_file(p_file:str) -> tuple:
+    stream = CardCsvStream()
+    with open(p_file, newline='') as fp:
+        record = collect_cards(stream, fp)
+    return record, stream.problems
+
+
+def write_record(p_record, p_gnc_file:str):
+    from gnucashSession import GnucashSession
+    gncs = GnucashSession(p_record, PROD, p_gnc_file, False, CARD)
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        gncs.prepare_session()
+    return gncs.existing.skipped_trades
+
+
+def bench_card_csv_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the card csv importer", prog="python3 benchCardCsv.py")
+    arg_parser.add_argument('-n', '--rows', nargs='+', type=int, default=[10000, 100000], help="rows per csv file")
+    arg_parser.add_argument('-w', '--write', action='store_true', help="ALSO write the txs to an in-memory Gnucash book")
+    opts = arg_parser.parse_args(args)
+
+    GNULOG.set_level(LOG_OFF)
+    for num_rows in opts.rows:
+        rows = synth_rows(num_rows, num_rows)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, writer in ( ("cibc", write_cibc), ("pcbanking", write_pcbanking) ):
+                csv_file = os.path.join(tmp_dir, name + ".csv")
+                writer(csv_file, rows)
+
+                start = time.perf_counter()
+                record, problems = parse_file(csv_file)
+                secs = time.perf_counter() - start
+                print(f"{name:9s} {num_rows:7d} rows: parse {secs:7.3f} s = {num_rows / secs:9.0f} rows/s ;"
+                      f" {record.get_size_str()} ; {len(problems)} problems")
+
+                if opts.write:
+                    gnc_file = f"mock:benchCardCsv-{name}-{num_rows}"
+                    for run in ("new book", "re-import"):
+                        start = time.perf_counter()
+                        skipped = write_record(record, gnc_file)
+                        secs = time.perf_counter() - start
+                        print(f"    write {run:9s}: {secs:7.3f} s = {num_rows / secs:9.0f} txs/s ; skipped {skipped}")
+
+
+if __name__ == "__main__":
+    bench_card_csv_main(sys.argv[1:])
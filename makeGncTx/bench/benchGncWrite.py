@@ -0,0 +1,108 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchGncWrite.py -- benchmark the Gnucash write path of GnucashSession: create_gnc_trade_txs and create_gnc_price_txs
+#                     on synthetic Monarch reports, with the in-memory bindings of mockGnucash.py by default
+#
+#   python3 benchGncWrite.py [-n 1000 10000] [-b mock|gnucash] [-g gnucash file]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import time
+import tempfile
+from argparse import ArgumentParser
+from contextlib import redirect_stdout
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+
+MOCK_FILE = "mock:benchGncWrite"
+
+
+class TimedSession:
+    """wrap the two create methods of a GnucashSession to add up their calls and times"""
+    def __init__(self, p_session):
+        self.calls = { "create_gnc_trade_txs": 0, "create_gnc_price_txs": 0 }
+        self.secs = { name: 0.0 for name in self.calls }
+        for name in self.calls:
+            setattr( p_session, name, self.timed(name, getattr(p_session, name)) )
+
+    def timed(self, p_name:str, p_method):
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return p_method(*args)
+            finally:
+                self.secs[p_name] += time.perf_counter() - start
+                self.calls[p_name] += 1
+        return wrapper
+
+# END class TimedSession
+
+
+def synth_record(p_trades:int, p_dir:str):
+    """the trades of a synthetic copy report plus the prices of a synthetic funds report, for ONE owner"""
+    from monarchStream import CopyTxStream, FundsStream, collect_record
+    from genMonarchReports import generate
+    manifest = generate(p_dir, p_trades, p_formats=["copy", "funds"], p_owners=[MON_MARK])
+    record = None
+    for fname, info in manifest["files"].items():
+        stream = CopyTxStream() if info["format"] == "copy" else FundsStream()
+        with open(os.path.join(p_dir, fname)) as fp:
+            record = collect_record(stream, fp, record)
+    return record
+
+
+def run_write(p_record, p_gnc_file:str) -> dict:
+    """import the record TWICE into the same book: the second pass should find everything ALREADY there"""
+    from gnucashSession import GnucashSession
+    passes = []
+    for _ in range(2):
+        gncs = GnucashSession(p_record, PROD, p_gnc_file, False, BOTH)
+        timer = TimedSession(gncs)
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            start = time.perf_counter()
+            gncs.prepare_session()
+            secs = time.perf_counter() - start
+        passes.append({ "secs": secs, "calls": timer.calls, "method_secs": timer.secs,
+                        "skipped": (gncs.existing.skipped_trades, gncs.price_loader.skipped) })
+    return { "passes": passes }
+
+
+def bench_gnc_write_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the Gnucash write path", prog="python3 benchGncWrite.py")
+    arg_parser.add_argument('-n', '--trades', nargs='+', type=int, default=[1000, 10000], help="trades per run")
+    arg_parser.add_argument('-b', '--bindings', choices=[MOCK_BINDINGS, "gnucash"], default=MOCK_BINDINGS,
+                            help="in-memory mock or the real gnucash bindings")
+    arg_parser.add_argument('-g', '--gnc_file', help="Gnucash file to write to with the real bindings: it is CHANGED!")
+    opts = arg_parser.parse_args(args)
+
+    if opts.bindings == MOCK_BINDINGS:
+        # MUST be set before gncBindings is first imported
+        os.environ[GNC_BINDINGS_ENV] = MOCK_BINDINGS
+    elif not opts.gnc_file:
+        arg_parser.error("the gnucash bindings need a Gnucash file (-g)")
+
+    GNULOG.set_level(LOG_OFF)
+    for trades in opts.trades:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            record = synth_record(trades, tmp_dir)
+        gnc_file = MOCK_FILE + str(trades) if opts.bindings == MOCK_BINDINGS else opts.gnc_file
+        result = run_write(record, gnc_file)
+        print(f"{opts.bindings} bindings, {record.get_size_str()}:")
+        for num, res in enumerate(result["passes"], start=1):
+            per_call = ", ".join( "{} {} x {:.1f} us".format(name, count, 1e6 * res["method_secs"][name] / max(1, count))
+                                  for name, count in res["calls"].items() )
+            print(f"  pass {num}: {res['secs']:8.3f} s ; {per_call} ; skipped trades/prices = {res['skipped']}")
+
+
+if __name__ == "__main__":
+    bench_gnc_write_main(sys.argv[1:])
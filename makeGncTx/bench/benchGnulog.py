@@ -0,0 +1,55 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchGnulog.py -- micro-benchmark of the per-call cost of Gnulog at each level threshold,
+#                   for eager (pre-formatted), lazy (LogMsg) and guarded (is_enabled) messages
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import timeit
+from sys import path, argv
+from contextlib import redirect_stdout
+path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from Configuration import Gnulog, LogMsg, LOG_DEBUG, LOG_INFO, LOG_ERROR, LOG_OFF, CYAN
+
+LEVELS = {"DEBUG": LOG_DEBUG, "INFO": LOG_INFO, "ERROR": LOG_ERROR, "OFF": LOG_OFF}
+
+
+def bench_level(p_level:int, p_number:int) -> dict:
+    logger = Gnulog(True, p_level)
+    gross, units, fund = 123456, -672970, "CIG 18140"
+    cases = {
+        "debug eager" : lambda: logger.print_debug("gross = {} units = {} fund = {}".format(gross, units, fund), CYAN),
+        "debug lazy"  : lambda: logger.print_debug(LogMsg("gross = {} units = {} fund = {}", gross, units, fund), CYAN),
+        "debug guard" : lambda: logger.is_enabled(LOG_DEBUG) and
+                                logger.print_debug("gross = {} units = {} fund = {}".format(gross, units, fund), CYAN),
+        "info lazy"   : lambda: logger.print_info(LogMsg("gross = {} units = {} fund = {}", gross, units, fund), CYAN),
+        "error lazy"  : lambda: logger.print_error(LogMsg("gross = {} units = {} fund = {}", gross, units, fund))
+    }
+    results = {}
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for label, fxn in cases.items():
+            logger.clear_log()
+            secs = min( timeit.repeat(fxn, number = p_number, repeat = 3) )
+            results[label] = secs / p_number * 1e9
+    return results
+
+
+def bench_gnulog_main(args:list):
+    number = int(args[0]) if args else 100000
+    print(f"Gnulog per-call cost in nanoseconds ({number} calls, best of 3):")
+    print(f"{'threshold':>10} | " + " | ".join(f"{label:>12}" for label in ("debug eager", "debug lazy", "debug guard", "info lazy", "error lazy")))
+    for name, level in LEVELS.items():
+        res = bench_level(level, number)
+        print(f"{name:>10} | " + " | ".join(f"{ns:12.1f}" for ns in res.values()))
+
+
+if __name__ == "__main__":
+    bench_gnulog_main(argv[1:])
@@ -0,0 +1,77 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchMonarchPdf.py -- benchmark monarchPdf.py, which builds the records straight from the word coordinates of the
+#                       Monarch pdf reports, against the text path: ALL the text of the pdf through PdfTxStream
+#
+#   python3 benchMonarchPdf.py [-r repeats] [pdf files...]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import glob
+import time
+from argparse import ArgumentParser
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+from monarchStream import PdfTxStream
+from monarchPdf import PdfLayoutStream, pymupdf
+
+PDF_DIR = os.path.join(BENCH_DIR, "..", "..", "parsePdf", "in")
+
+
+def text_path(p_file:str) -> tuple:
+    """the text of EVERY page, as it was saved to txtFromPdf, then the line-counting parser"""
+    with pymupdf.open(p_file) as doc:
+        lines = ''.join( page.get_text() for page in doc ).splitlines(True)
+        pages = doc.page_count
+    events = list( PdfTxStream().events(lines) )
+    return pages, sum( 1 for evt in events if evt.tx_type == TRADE ), 0
+
+
+def layout_path(p_file:str) -> tuple:
+    stream = PdfLayoutStream()
+    events = list( stream.read_file(p_file) )
+    trades = sum( 1 for evt in events if evt.tx_type == TRADE )
+    return stream.pages, trades, len(events) - trades
+
+
+def measure(p_func, p_file:str, p_repeats:int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(p_repeats):
+        result = p_func(p_file)
+    return (time.perf_counter() - start) / p_repeats, result
+
+
+def bench_monarch_pdf_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the pdf layout parser", prog="python3 benchMonarchPdf.py")
+    arg_parser.add_argument('-r', '--repeats', type=int, default=5, help="runs of each file")
+    arg_parser.add_argument('files', nargs='*', help="Monarch pdf reports, default: all of parsePdf/in")
+    opts = arg_parser.parse_args(args)
+
+    if pymupdf is None:
+        print("Package pymupdf is needed to read the pdf reports!")
+        exit(62)
+    GNULOG.set_level(LOG_OFF)
+    files = opts.files or sorted( glob.glob(os.path.join(PDF_DIR, "*.pdf")) )
+    totals = [0.0, 0, 0.0, 0]
+    for pdf_file in files:
+        text_secs, (pages, text_trades, _) = measure(text_path, pdf_file, opts.repeats)
+        layout_secs, (decoded, trades, prices) = measure(layout_path, pdf_file, opts.repeats)
+        print(f"{os.path.basename(pdf_file)[:36]:36s} {pages:3d} pages: text {text_secs * 1000:7.1f} ms, {text_trades:4d} trades"
+              f" | layout {layout_secs * 1000:7.1f} ms, {decoded:3d} pages decoded, {trades:4d} trades, {prices:3d} prices")
+        totals = [ totals[0] + text_secs, totals[1] + text_trades, totals[2] + layout_secs, totals[3] + trades ]
+    print(f"{'TOTAL':36s}            text {totals[0] * 1000:7.1f} ms, {totals[1]:4d} trades"
+          f" | layout {totals[2] * 1000:7.1f} ms, {totals[3]:25d} trades")
+
+
+if __name__ == "__main__":
+    bench_monarch_pdf_main(sys.argv[1:])
@@ -0,0 +1,106 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchOds.py -- benchmark the streaming ODS reader of parseOds.py on synthetic multi-year statement workbooks:
+#                time and peak memory against parsing the whole content.xml into a tree first
+#
+#   python3 benchOds.py [-n 10000 100000]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import time
+import random
+import zipfile
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import date, timedelta
+from xml.etree.ElementTree import parse as parse_tree
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+from parseOds import OdsStream, ODS_CONTENT, ODS_ROW, cell_value
+
+CONTENT_HEAD = '<?xml version="1.0" encoding="UTF-8"?>\n<office:document-content' \
+               ' xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0"' \
+               ' xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"' \
+               ' xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0"><office:body><office:spreadsheet>'
+CONTENT_TAIL = '</office:spreadsheet></office:body></office:document-content>'
+ROW = '<table:table-row><table:table-cell office:value-type="date" office:date-value="{}"><text:p>{}</text:p>' \
+      '</table:table-cell><table:table-cell office:value-type="string"><text:p>LOBLAWS #{} <text:s text:c="12"/>' \
+      'OTTAWA <text:s text:c="6"/>ON </text:p></table:table-cell><table:table-cell office:value-type="currency"' \
+      ' office:currency="CAD" office:value="{}"><text:p>${}</text:p></table:table-cell>' \
+      '<table:table-cell table:number-columns-repeated="1021"/></table:table-row>'
+
+
+def write_ods(p_file:str, p_rows:int, p_rows_per_sheet:int = 5000):
+    """one sheet per statement of p_rows_per_sheet rows, each followed by the usual huge empty repeated row"""
+    rand = random.Random(p_rows)
+    start = date(2010, 1, 1)
+    with zipfile.ZipFile(p_file, 'w', zipfile.ZIP_DEFLATED) as zfile:
+        zfile.writestr("mimetype", "application/vnd.oasis.opendocument.spreadsheet", zipfile.ZIP_STORED)
+        with zfile.open(ODS_CONTENT, 'w') as content:
+            content.write(CONTENT_HEAD.encode())
+            for num in range(p_rows):
+                if num % p_rows_per_sheet == 0:
+                    if num:
+                        content.write(b'<table:table-row table:number-rows-repeated="1048000"><table:table-cell'
+                                      b' table:number-columns-repeated="1024"/></table:table-row></table:table>')
+                    content.write('<table:table table:name="Statement {}">'.format(num // p_rows_per_sheet).encode())
+                tx_date = start + timedelta(days=num // 30)
+                value = "{:.2f}".format(-rand.randint(100, 40000) / 100).rstrip('0').rstrip('.')
+                content.write( ROW.format(tx_date.isoformat(), tx_date.strftime("%b %d, %Y"), rand.randint(1, 500),
+                                          value, value).encode() )
+            content.write(b'</table:table>' + CONTENT_TAIL.encode())
+
+
+def stream_txs(p_file:str) -> int:
+    return sum( 1 for _ in OdsStream(SCOTIA_VISA).read_file(p_file) )
+
+
+def tree_txs(p_file:str) -> int:
+    """the same rows from a tree of the WHOLE content.xml, as a spreadsheet library would build it"""
+    with zipfile.ZipFile(p_file) as zfile, zfile.open(ODS_CONTENT) as content:
+        root = parse_tree(content).getroot()
+    stream = OdsStream(SCOTIA_VISA)
+    return sum( 1 for row in root.iter(ODS_ROW) if cell_value(row[0]) is not None
+                and stream.make_record([cell_value(cell) for cell in row[:3]]) )
+
+
+def measure(p_func, p_file:str) -> tuple:
+    start = time.perf_counter()
+    num = p_func(p_file)
+    secs = time.perf_counter() - start
+    tracemalloc.start()
+    p_func(p_file)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return num, secs, peak
+
+
+def bench_ods_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the streaming ODS reader", prog="python3 benchOds.py")
+    arg_parser.add_argument('-n', '--rows', nargs='+', type=int, default=[10000, 100000], help="rows per workbook")
+    opts = arg_parser.parse_args(args)
+
+    GNULOG.set_level(LOG_OFF)
+    for num_rows in opts.rows:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            ods_file = os.path.join(tmp_dir, "statements.ods")
+            write_ods(ods_file, num_rows)
+            for name, func in ( ("iterparse", stream_txs), ("whole tree", tree_txs) ):
+                num, secs, peak = measure(func, ods_file)
+                print(f"{num_rows:7d} rows, {name:10s}: {secs:7.3f} s = {num_rows / secs:8.0f} rows/s ;"
+                      f" peak {peak / 1e6:7.1f} MB ; {num} txs")
+
+
+if __name__ == "__main__":
+    bench_ods_main(sys.argv[1:])
@@ -0,0 +1,95 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchOfx.py -- benchmark the streaming OFX parser of parseOfx.py on synthetic QFX statements,
+#                then import a second statement that overlaps the first and count the txs skipped by FITID
+#
+#   python3 benchOfx.py [-n 10000 100000] [-o overlap %]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from datetime import date, timedelta
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+from parseOfx import OfxStream, FitidStore
+
+OFX_HEAD = "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nENCODING:USASCII\nCHARSET:1252\n\n<OFX>" \
+           "<CREDITCARDMSGSRSV1><CCSTMTTRNRS><CCSTMTRS><CURDEF>CAD<CCACCTFROM><ACCTID>4500000000001234" \
+           "<ACCTTYPE>CREDITLINE</CCACCTFROM>\n<BANKTRANLIST>\n"
+OFX_TAIL = "</BANKTRANLIST></CCSTMTRS></CCSTMTTRNRS></CREDITCARDMSGSRSV1></OFX>\n"
+
+
+def write_qfx(p_file:str, p_first:int, p_num:int):
+    """txs number p_first to p_first + p_num, 50 per day: the same number ALWAYS gives the same tx and FITID"""
+    start = date(2015, 1, 1)
+    with open(p_file, 'w') as fp:
+        fp.write(OFX_HEAD)
+        for num in range(p_first, p_first + p_num):
+            rand = random.Random(num)
+            cents = rand.randint(100, 40000)
+            posted = (start + timedelta(days=num // 50)).strftime("%Y%m%d")
+            fp.write("<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>{}120000.000[-5:EST]<TRNAMT>-{}.{:02d}<FITID>{:015d}"
+                     "<NAME>MERCHANT #{}<MEMO>OTTAWA, ON;CC#4500********1234</STMTTRN>\n"
+                     .format(posted, cents // 100, cents % 100, 201500000000000 + num, rand.randint(1, 500)))
+        fp.write(OFX_TAIL)
+
+
+def parse(p_file:str, p_seen:FitidStore) -> tuple:
+    stream = OfxStream(CIBC_VISA, p_seen)
+    start = time.perf_counter()
+    num = sum( 1 for _ in stream.read_file(p_file) )
+    return num, time.perf_counter() - start, stream
+
+
+def peak_memory(p_file:str) -> int:
+    """
+    peak bytes allocated while streaming the statement, in a separate run as tracemalloc slows it down:
+    nearly all of it is the set of the FITIDs seen in the statement
+    """
+    tracemalloc.start()
+    for _ in OfxStream(CIBC_VISA).read_file(p_file):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def bench_ofx_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the streaming OFX parser", prog="python3 benchOfx.py")
+    arg_parser.add_argument('-n', '--txs', nargs='+', type=int, default=[10000, 100000], help="txs per statement")
+    arg_parser.add_argument('-o', '--overlap', type=int, default=50, help="percent of the 2nd statement in the 1st")
+    opts = arg_parser.parse_args(args)
+
+    GNULOG.set_level(LOG_OFF)
+    for num_txs in opts.txs:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            first, second = os.path.join(tmp_dir, "first.qfx"), os.path.join(tmp_dir, "second.qfx")
+            write_qfx(first, 0, num_txs)
+            write_qfx(second, num_txs - num_txs * opts.overlap // 100, num_txs)
+            seen = FitidStore(os.path.join(tmp_dir, "bench" + ".fitids"))
+            mbytes = os.path.getsize(first) / 1e6
+
+            for name, qfx_file in ( ("first", first), ("overlapping", second) ):
+                num, secs, stream = parse(qfx_file, seen)
+                saved = seen.save()
+                peak = peak_memory(qfx_file)
+                print(f"{num_txs:7d} txs = {mbytes:6.1f} MB, {name:11s}: {secs:7.3f} s = {num_txs / secs:9.0f} txs/s ;"
+                      f" peak {peak / 1e6:5.1f} MB with the FITID set ; {num} new, {stream.skipped} skipped ; saved {saved} FITIDs")
+
+
+if __name__ == "__main__":
+    bench_ofx_main(sys.argv[1:])
@@ -0,0 +1,68 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchParallel.py -- benchmark the process-pool parsing of Monarch reports against the serial parse,
+#                     over the txtFromPdf corpus replicated many times
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import glob
+import time
+from sys import path, argv
+path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from Configuration import GNULOG, LOG_OFF
+from parallelParse import parse_reports, merge_by_owner, report_failures, default_jobs
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "txtFromPdf")
+
+
+def bench_parallel_main(args:list):
+    """
+    usage: benchParallel.py [replicas = 100] [max jobs = cpu count]
+    some corpus files have txs that can NOT be read: the partial parse times the rest of each file
+    """
+    replicas = int(args[0]) if args else 100
+    max_jobs = int(args[1]) if len(args) > 1 else default_jobs()
+    GNULOG.set_level(LOG_OFF)
+
+    corpus = sorted( glob.glob(os.path.join(CORPUS_DIR, "*.txt")) )
+    files = corpus * replicas
+    print(f"corpus: {len(corpus)} files x {replicas} = {len(files)} files")
+
+    jobs_list = [1]
+    while jobs_list[-1] * 2 <= max_jobs:
+        jobs_list.append(jobs_list[-1] * 2)
+    if jobs_list[-1] != max_jobs:
+        jobs_list.append(max_jobs)
+
+    base_secs = None
+    base_sizes = None
+    for jobs in jobs_list:
+        start = time.perf_counter()
+        results = parse_reports(files, "pdf-partial", jobs, LOG_OFF)
+        merged = merge_by_owner(results)
+        secs = time.perf_counter() - start
+
+        # the merge MUST be the same whatever the number of jobs
+        sizes = { owner: rec.get_size_str() for owner, rec in merged.items() }
+        failed = report_failures(results)
+        if base_sizes is None:
+            base_secs, base_sizes = secs, sizes
+            if failed:
+                print(f"{len(failed)} file(s) failed to parse, e.g. {failed[0]}")
+        elif sizes != base_sizes:
+            raise Exception(f"jobs = {jobs} merged {sizes} but the serial parse merged {base_sizes}!")
+
+        print(f"jobs = {jobs:3d} : {secs:8.2f} s = {len(files) / secs:10.0f} files/sec ; speedup {base_secs / secs:6.2f}x ;"
+              f" {len(failed)} file(s) failed")
+
+
+if __name__ == "__main__":
+    bench_parallel_main(argv[1:])
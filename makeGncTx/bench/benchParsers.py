@@ -0,0 +1,240 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchParsers.py -- benchmark suite for the Monarch parsers at 1x, 10x and 100x scale:
+#                    lines/sec, txs/sec and peak RSS for each parser, saved as JSON to compare between commits
+#                    the input at each scale is generated that many times LARGER, so the peak RSS follows the scale
+#
+#   standalone:        python3 benchParsers.py [-s 1 10 100] [-c CASE ...] [-o results.json]
+#   pytest-benchmark:  pytest bench/benchParsers.py
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import tempfile
+import subprocess
+from argparse import ArgumentParser, SUPPRESS
+from contextlib import redirect_stdout
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+# the quarterly parser imports the Gnucash bindings: use the in-memory stand-in so it runs WITHOUT gnucash
+os.environ[GNC_BINDINGS_ENV] = MOCK_BINDINGS
+
+from genMonarchReports import generate
+
+DEFAULT_SCALES = [1, 10, 100]
+# trades in the synthetic reports at 1x
+SYNTH_TRADES = 60
+
+
+def synth_reports(p_dir:str, p_format:str, p_scale:int, p_plan_ids:dict = None) -> list:
+    """a synthetic report of the format with p_scale times SYNTH_TRADES, from genMonarchReports, for ONE owner"""
+    manifest = generate(p_dir, SYNTH_TRADES * p_scale, p_formats=[p_format], p_owners=[MON_MARK],
+                        p_plan_ids=p_plan_ids)
+    return [os.path.join(p_dir, fname) for fname in manifest["files"]]
+
+
+class BenchCase:
+    """
+    One parser to time: prepare() writes the input files at a scale, run() parses ONE file and returns the number of txs
+    """
+    def __init__(self, p_name:str):
+        self.name = p_name
+
+    def prepare(self, p_dir:str, p_scale:int) -> list:
+        raise NotImplementedError
+
+    def run(self, p_file:str) -> int:
+        raise NotImplementedError
+
+
+class PdfTxsCase(BenchCase):
+    def prepare(self, p_dir, p_scale):
+        return synth_reports(p_dir, "pdf", p_scale)
+
+    def run(self, p_file):
+        from parseMonarchTxRep import parse_pdf_txs
+        return parse_pdf_txs(p_file, strnow).get_size()
+
+
+class CopyTxsCase(BenchCase):
+    def prepare(self, p_dir, p_scale):
+        return synth_reports(p_dir, "copy", p_scale)
+
+    def run(self, p_file):
+        from parseMonarchTxRep import parse_copy_txs
+        return parse_copy_txs(p_file, strnow).get_size()
+
+
+class FundsCase(BenchCase):
+    def prepare(self, p_dir, p_scale):
+        return synth_reports(p_dir, "funds", p_scale)
+
+    def run(self, p_file):
+        from parseMonarchFundsRep import ParseMonarchFundsReport
+        return ParseMonarchFundsReport().parse_funds_info(p_file, strnow).get_size()
+
+
+class QtrepCase(BenchCase):
+    """imports the module with the mock gnucash bindings, but the Gnucash session itself is NOT opened"""
+    def prepare(self, p_dir, p_scale):
+        import parseMonarchQtrRep
+        return synth_reports(p_dir, "qtrep", p_scale)
+
+    def run(self, p_file):
+        from parseMonarchQtrRep import MonarchQrepToGncPrices
+        # skip __init__ so that NO Gnucash session is opened: parsing only needs the file name
+        parser = MonarchQrepToGncPrices.__new__(MonarchQrepToGncPrices)
+        parser.mon_file = p_file
+        return parser.parse_monarch_qtrep().get_size()
+
+
+class MonarchInfoCase(BenchCase):
+    """needs the utils and gnucash common packages that parseMonarchCopyRep imports"""
+    def prepare(self, p_dir, p_scale):
+        sys.path.append(os.path.join(BENCH_DIR, ".."))
+        import parseMonarchCopyRep
+        # plan type -> an id that parseMonarchCopyRep knows
+        plan_ids = { info[0]: plan_id for plan_id, info in parseMonarchCopyRep.PLAN_IDS.items() }
+        return synth_reports(p_dir, "monarch", p_scale, plan_ids)
+
+    def run(self, p_file):
+        import logging
+        from parseMonarchCopyRep import ParseMonarchInput
+        parser = ParseMonarchInput( logging.getLogger("benchParsers") )
+        parser.in_file = p_file
+        parser.parse_monarch_info()
+        data = parser.get_input_record().get_data()
+        return sum( len(txs) for plan in data.values() for txs in plan.values() )
+
+
+CASES = { case.name: case for case in (PdfTxsCase("parse_pdf_txs"), CopyTxsCase("parse_copy_txs"),
+          FundsCase("parse_funds_info"), QtrepCase("parse_monarch_qtrep"), MonarchInfoCase("parse_monarch_info")) }
+
+
+def count_lines(p_files:list) -> int:
+    total = 0
+    for fname in p_files:
+        with open(fname) as fp:
+            total += sum(1 for _ in fp)
+    return total
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_case(p_name:str, p_scale:int) -> dict:
+    """Time ONE case at ONE scale: the input files are generated p_scale times as large and each parsed ONCE."""
+    case = CASES[p_name]
+    GNULOG.set_level(LOG_OFF)
+    result = { "case": p_name, "scale": p_scale }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        try:
+            files = case.prepare(tmp_dir, p_scale)
+        except ImportError as ie:
+            result["skipped"] = repr(ie)
+            return result
+        lines = count_lines(files)
+        txs = 0
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            start = time.perf_counter()
+            for fname in files:
+                txs += case.run(fname)
+            secs = time.perf_counter() - start
+    result.update({ "files": len(files), "lines": lines, "txs": txs, "secs": round(secs, 6),
+                    "lines_per_sec": round(lines / secs), "txs_per_sec": round(txs / secs),
+                    "peak_rss_kb": peak_rss_kb() })
+    return result
+
+
+def run_in_child(p_name:str, p_scale:int) -> dict:
+    """Run a case in a NEW process so that its peak RSS is not hidden by the other cases."""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", p_name, str(p_scale)],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return { "case": p_name, "scale": p_scale, "error": proc.stderr.strip().splitlines()[-1:] }
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return UNKNOWN
+
+
+def bench_parsers_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the Monarch parsers", prog="python3 benchParsers.py")
+    arg_parser.add_argument('-c', '--cases', nargs='+', choices=list(CASES), default=list(CASES), help="parsers to time")
+    arg_parser.add_argument('-s', '--scales', nargs='+', type=int, default=DEFAULT_SCALES, help="scale factors")
+    arg_parser.add_argument('-o', '--output', help="save the results to this JSON file")
+    arg_parser.add_argument('--child', nargs=2, metavar=("CASE", "SCALE"), help=SUPPRESS)
+    opts = arg_parser.parse_args(args)
+
+    if opts.child:
+        print( json.dumps(run_case(opts.child[0], int(opts.child[1]))) )
+        return
+
+    report = { "revision": git_revision(), "python": platform.python_version(), "machine": platform.machine(),
+               "run_time": dt.now().strftime(DATE_STR_FORMAT), "results": [] }
+    for name in opts.cases:
+        for scale in opts.scales:
+            res = run_in_child(name, scale)
+            report["results"].append(res)
+            if "lines_per_sec" in res:
+                print(f"{name:>20} x{scale:<4}: {res['lines']:9d} lines {res['txs']:8d} txs {res['secs']:9.3f} s "
+                      f"= {res['lines_per_sec']:9d} lines/s {res['txs_per_sec']:8d} txs/s ; peak RSS {res['peak_rss_kb']} kB")
+            else:
+                print(f"{name:>20} x{scale:<4}: {res.get('skipped') or res.get('error')}")
+
+    if opts.output:
+        with open(opts.output, 'w') as fp:
+            json.dump(report, fp, indent=4)
+        print(f"saved results to {opts.output}")
+    else:
+        print( json.dumps(report, indent=4) )
+
+
+# pytest-benchmark: one test per case at 1x, ONLY if the plugin is installed
+try:
+    import pytest
+    import pytest_benchmark
+except ImportError:
+    pytest = None
+
+if pytest is not None:
+    @pytest.mark.parametrize("p_name", list(CASES))
+    def test_parser(benchmark, p_name, tmp_path):
+        case = CASES[p_name]
+        GNULOG.set_level(LOG_OFF)
+        try:
+            files = case.prepare(str(tmp_path), 1)
+        except ImportError as ie:
+            pytest.skip(repr(ie))
+        benchmark.extra_info["lines"] = count_lines(files)
+
+        def parse_all():
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                return sum(case.run(fname) for fname in files)
+
+        benchmark.extra_info["txs"] = benchmark(parse_all)
+
+
+if __name__ == "__main__":
+    bench_parsers_main(sys.argv[1:])
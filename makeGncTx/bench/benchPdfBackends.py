@@ -0,0 +1,139 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchPdfBackends.py -- run EVERY available backend of pdfBackends.py over the same Monarch pdf reports in parsePdf/in
+#                        and report pages/s, peak memory, the trades found by PdfTxStream and how much the text
+#                        differs from that of a reference backend
+#
+#   python3 benchPdfBackends.py [-b backends...] [-r reference] [--tika-stand-in] [pdf files...]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import glob
+import json
+import time
+import difflib
+import resource
+import subprocess
+from argparse import ArgumentParser, SUPPRESS
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+from monarchStream import PdfTxStream
+from pdfBackends import BACKENDS, TIKA_ENDPOINT_ENV, available_backends, get_backend
+
+PDF_DIR = os.path.join(BENCH_DIR, "..", "..", "parsePdf", "in")
+
+
+def peak_rss_kb(p_who) -> int:
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    rss = resource.getrusage(p_who).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_backend(p_name:str, p_files:list) -> dict:
+    """extract ALL the pages of the files with ONE backend, in THIS process"""
+    GNULOG.set_level(LOG_OFF)
+    backend = get_backend(p_name)
+    start = time.perf_counter()
+    texts = [ list(backend.extract(pdf_file)) for pdf_file in p_files ]
+    secs = time.perf_counter() - start
+    pages = sum( len(file_texts) for file_texts in texts )
+    # a program run by the backend, e.g. pdftotext, is counted as well
+    return { "backend": p_name, "pages": pages, "secs": round(secs, 6), "pages_per_sec": round(pages / secs, 1),
+             "peak_rss_kb": peak_rss_kb(resource.RUSAGE_SELF), "child_rss_kb": peak_rss_kb(resource.RUSAGE_CHILDREN),
+             "texts": texts }
+
+
+def run_in_child(p_name:str, p_files:list) -> dict:
+    """Run a backend in a NEW process so that its peak memory is not hidden by the other backends."""
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", p_name] + p_files,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        return { "backend": p_name, "error": proc.stderr.strip().splitlines()[-1:] }
+    return json.loads(proc.stdout)
+
+
+def count_trades(p_texts:list) -> int:
+    trades = 0
+    for file_texts in p_texts:
+        lines = ''.join(file_texts).splitlines(True)
+        trades += sum( 1 for evt in PdfTxStream().events(lines) if evt.tx_type == TRADE )
+    return trades
+
+
+def compare(p_texts:list, p_reference:list) -> tuple:
+    """:return: (% similarity of the words of each page to the reference, number of pages with different words)"""
+    ratios = []
+    changed = 0
+    for file_texts, ref_texts in zip(p_texts, p_reference):
+        for num in range( max(len(file_texts), len(ref_texts)) ):
+            words = file_texts[num].split() if num < len(file_texts) else []
+            ref_words = ref_texts[num].split() if num < len(ref_texts) else []
+            if words == ref_words:
+                ratios.append(1.0)
+                continue
+            changed += 1
+            ratios.append( difflib.SequenceMatcher(None, ref_words, words, autojunk=False).ratio() )
+    return 100.0 * sum(ratios) / max(len(ratios), 1), changed
+
+
+def bench_pdf_backends_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the pdf backends", prog="python3 benchPdfBackends.py")
+    arg_parser.add_argument('-b', '--backends', nargs='+', choices=list(BACKENDS), help="default: ALL available")
+    arg_parser.add_argument('-r', '--reference', choices=list(BACKENDS), help="default: the first backend run")
+    arg_parser.add_argument('--tika-stand-in', action="store_true", help="serve tika from tikaStandIn.py")
+    arg_parser.add_argument('--child', help=SUPPRESS)
+    arg_parser.add_argument('files', nargs='*', help="Monarch pdf reports, default: all of parsePdf/in")
+    opts = arg_parser.parse_args(args)
+
+    if opts.child:
+        print( json.dumps(run_backend(opts.child, opts.files)) )
+        return
+
+    GNULOG.set_level(LOG_OFF)
+    server = None
+    if opts.tika_stand_in:
+        from tikaStandIn import start_stand_in
+        server, os.environ[TIKA_ENDPOINT_ENV] = start_stand_in()
+    try:
+        files = opts.files or sorted( glob.glob(os.path.join(PDF_DIR, "*.pdf")) )
+        names = opts.backends or available_backends()
+        if opts.reference and opts.reference not in names:
+            names.insert(0, opts.reference)
+        print(f"{len(files)} files ; backends: {', '.join(names)}")
+
+        results = { name: run_in_child(name, files) for name in names }
+        good = [ name for name in names if "texts" in results[name] ]
+        if not good:
+            print("NO backend could run!")
+            exit(116)
+        reference = opts.reference or good[0]
+        ref_texts = results[reference].get("texts")
+        for name in names:
+            res = results[name]
+            if "texts" not in res:
+                print(f"{name:>10}: {res['error']}")
+                continue
+            line = (f"{name:>10}: {res['pages']:4d} pages {res['secs']:8.3f} s = {res['pages_per_sec']:7.1f} pages/s ;"
+                    f" peak RSS {res['peak_rss_kb']:7d} kB, programs {res['child_rss_kb']:7d} kB ;"
+                    f" {count_trades(res['texts']):4d} trades")
+            if ref_texts is not None and name != reference:
+                similar, changed = compare(res["texts"], ref_texts)
+                line += f" ; vs {reference}: {similar:5.1f}% same words, {changed} page(s) differ"
+            print(line)
+    finally:
+        if server:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    bench_pdf_backends_main(sys.argv[1:])
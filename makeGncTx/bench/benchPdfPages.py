@@ -0,0 +1,65 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchPdfPages.py -- benchmark the page extraction of pdfPages.py over the Monarch pdf reports in parsePdf/in:
+#                     serial against a pool of processes, with an EMPTY page cache then with a warm one
+#
+#   python3 benchPdfPages.py [-j 1 2 4] [-x extractor]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import glob
+import time
+import tempfile
+from argparse import ArgumentParser
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+from pdfPages import PageCache, extract_files, EXTRACTORS, pymupdf
+
+PDF_DIR = os.path.join(BENCH_DIR, "..", "..", "parsePdf", "in")
+
+
+def run(p_files:list, p_extractor:str, p_jobs:int, p_cache) -> tuple:
+    start = time.perf_counter()
+    texts = extract_files(p_files, p_extractor, p_jobs, p_cache, LOG_OFF)
+    return time.perf_counter() - start, texts
+
+
+def bench_pdf_pages_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the pdf page extraction", prog="python3 benchPdfPages.py")
+    arg_parser.add_argument('-j', '--jobs', nargs='+', type=int, default=[1, 2, 4], help="worker processes")
+    arg_parser.add_argument('-x', '--extractor', default="text", choices=list(EXTRACTORS), help="page extractor")
+    opts = arg_parser.parse_args(args)
+
+    if pymupdf is None:
+        print("Package pymupdf is needed to read the pdf reports!")
+        exit(44)
+    GNULOG.set_level(LOG_OFF)
+    files = sorted( glob.glob(os.path.join(PDF_DIR, "*.pdf")) )
+    base_secs, base_texts = run(files, opts.extractor, 1, None)
+    pages = sum( len(texts) for texts in base_texts )
+    print(f"{len(files)} files, {pages} pages, {os.cpu_count()} cpu(s) ; NO cache, serial: {base_secs:7.3f} s"
+          f" = {pages / base_secs:6.0f} pages/s")
+
+    for jobs in opts.jobs:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for run_name in ("cold cache", "warm cache"):
+                cache = PageCache(cache_dir)
+                secs, texts = run(files, opts.extractor, jobs, cache)
+                if texts != base_texts:
+                    raise Exception(f"jobs = {jobs}, {run_name}: the text is NOT the same as the serial extraction!")
+                print(f"jobs = {jobs:2d}, {run_name}: {secs:7.3f} s = {pages / secs:7.0f} pages/s ;"
+                      f" {cache.hits:4d} hits, {cache.misses:4d} misses")
+
+
+if __name__ == "__main__":
+    bench_pdf_pages_main(sys.argv[1:])
@@ -0,0 +1,82 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchPdfToTextPool.py -- benchmark pdfToTextPool.py over the Monarch pdf reports in parsePdf/in against the way of
+#                          callPdfToText.py: ONE subprocess.run of pdftotext after another, the whole stdout decoded
+#                          then parsed
+#
+#   python3 benchPdfToTextPool.py [-j 1 2 4] [-r repeats] [-p pdftotext]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import glob
+import time
+import subprocess
+from contextlib import redirect_stdout
+from argparse import ArgumentParser
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+from monarchStream import PdfTxStream, collect_record
+from pdfBackends import PAGE_BREAK, PdftotextBackend, pdftotext_path
+from pdfToTextPool import convert_files
+
+PDF_DIR = os.path.join(BENCH_DIR, "..", "..", "parsePdf", "in")
+
+
+def serial_run(p_files:list, p_program:str) -> int:
+    """:return: the size of ALL the records"""
+    backend = PdftotextBackend(p_program)
+    size = 0
+    for pdf_file in p_files:
+        res = subprocess.run(backend.command(pdf_file), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        output = res.stdout.decode("utf-8").replace(PAGE_BREAK, '')
+        size += collect_record( PdfTxStream(), output.splitlines(True) ).get_size()
+    return size
+
+
+def pool_run(p_files:list, p_program:str, p_jobs:int) -> int:
+    return sum( res.record.get_size() for res in convert_files(p_files, p_jobs, p_program) if res.ok() )
+
+
+def measure(p_func, p_repeats:int, *args) -> tuple:
+    start = time.perf_counter()
+    for _ in range(p_repeats):
+        result = p_func(*args)
+    return (time.perf_counter() - start) / p_repeats, result
+
+
+def bench_pdf_to_text_pool_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the pdftotext pool", prog="python3 benchPdfToTextPool.py")
+    arg_parser.add_argument('-j', '--jobs', nargs='+', type=int, default=[1, 2, 4], help="concurrent pdftotext")
+    arg_parser.add_argument('-r', '--repeats', type=int, default=3, help="runs of each case")
+    arg_parser.add_argument('-p', '--program', default=pdftotext_path(), help="path of pdftotext")
+    opts = arg_parser.parse_args(args)
+
+    if opts.program is None:
+        print("Program pdftotext is needed to convert the pdf reports!")
+        exit(67)
+    GNULOG.set_level(LOG_OFF)
+    files = sorted( glob.glob(os.path.join(PDF_DIR, "*.pdf")) )
+    # the record of each report prints its runtime
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        results = [ ("serial subprocess.run", measure(serial_run, opts.repeats, files, opts.program)) ]
+        for jobs in opts.jobs:
+            results.append( (f"pool, jobs = {jobs}", measure(pool_run, opts.repeats, files, opts.program, jobs)) )
+
+    print(f"{len(files)} files, {os.cpu_count()} cpu(s), pdftotext = {opts.program}")
+    base_secs = results[0][1][0]
+    for name, (secs, size) in results:
+        print(f"{name:>22}: {secs:7.3f} s = {len(files) / secs:6.1f} files/s, x{base_secs / secs:4.2f} ; record size {size}")
+
+
+if __name__ == "__main__":
+    bench_pdf_to_text_pool_main(sys.argv[1:])
@@ -0,0 +1,113 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchPriceLoad.py -- benchmark the bulk PriceLoader against adding the prices one at a time,
+#                      on the in-memory Gnucash bindings of mockGnucash.py
+#
+#   python3 benchPriceLoad.py [-n days ...] [-p duplicate %]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import time
+import random
+from argparse import ArgumentParser
+from datetime import timedelta
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BENCH_DIR, "..", "src"))
+from Configuration import *
+# MUST be set before gncBindings is first imported
+os.environ[GNC_BINDINGS_ENV] = MOCK_BINDINGS
+from gncBindings import Session, GncNumeric, GncPrice
+from priceLoader import PriceLoader
+
+
+def synth_prices(p_days:int, p_dup_pct:int, p_seed:int = 1) -> list:
+    """(plan asset parent path, PriceRecord) for EVERY fund in EVERY plan on each day, plus p_dup_pct % repeated prices"""
+    rand = random.Random(p_seed)
+    parents = [ ACCT_PATHS[ASSET] + [PL_OPEN] ] + \
+              [ ACCT_PATHS[ASSET] + [plan, ACCT_PATHS[MON_MARK]] for plan in (PL_TFSA, PL_RRSP) ]
+    start = dt(2019, 1, 2)
+    prices = []
+    for day in range(p_days):
+        pr_date = start + timedelta(days=day)
+        for fund in FUNDS_LIST:
+            # a fund has ONE commodity, so the same price shows up in each plan that holds the fund
+            price = "${:.4f}".format(rand.uniform(5, 30))
+            for path in parents:
+                prices.append( (path, PriceRecord(pr_date, fund, '', price)) )
+    prices += rand.sample(prices, len(prices) * p_dup_pct // 100)
+    return prices
+
+
+def open_book(p_name:str):
+    book = Session(p_name).book
+    root = book.get_root_account()
+    acct_index = AccountIndex(root)
+    return book, book.get_price_db(), book.get_table().lookup("ISO4217", "CAD"), acct_index
+
+
+def per_price(p_name:str, p_prices:list) -> int:
+    """the previous path: find the account and build and add a GncPrice for EACH price"""
+    book, price_db, currency, acct_index = open_book(p_name)
+    price_db.begin_edit()
+    for path, prec in p_prices:
+        asset_acct = acct_index.lookup(acct_index.from_path(path), prec.fund)
+        pr = GncPrice(book)
+        pr.begin_edit()
+        pr.set_time64( dt(prec.date.year, prec.date.month, prec.date.day) )
+        pr.set_commodity(asset_acct.GetCommodity())
+        pr.set_currency(currency)
+        pr.set_value(GncNumeric(prec.price, 10000))
+        pr.set_source_string("user:price")
+        pr.set_typestr('nav')
+        pr.commit_edit()
+        price_db.add_price(pr)
+    price_db.commit_edit()
+    return price_db.get_num_prices()
+
+
+def bulk(p_name:str, p_prices:list) -> tuple:
+    book, price_db, currency, acct_index = open_book(p_name)
+    loader = PriceLoader(book, price_db, currency, acct_index)
+    for path, prec in p_prices:
+        loader.add_record(prec, acct_index.from_path(path))
+    loader.load(True)
+    return price_db.get_num_prices(), loader.get_report()
+
+
+def bench_price_load_main(args:list):
+    arg_parser = ArgumentParser(description="Benchmark the bulk price loader", prog="python3 benchPriceLoad.py")
+    arg_parser.add_argument('-n', '--days', nargs='+', type=int, default=[50, 500], help="days of prices for ALL the funds")
+    arg_parser.add_argument('-p', '--duplicates', type=int, default=10, help="percent of the prices to repeat")
+    opts = arg_parser.parse_args(args)
+    dup_pct = opts.duplicates
+
+    GNULOG.set_level(LOG_OFF)
+    for days in opts.days:
+        prices = synth_prices(days, dup_pct)
+        print(f"{len(prices)} prices over {days} days with {dup_pct}% duplicates:")
+
+        start = time.perf_counter()
+        num = per_price("per-price-" + str(days), prices)
+        secs = time.perf_counter() - start
+        print(f"  per price : {secs:8.3f} s = {len(prices) / secs:10.0f} prices/s ; {num} prices in the PriceDB")
+
+        # a second bulk load of the same prices into the same book should skip them ALL
+        for run in ("new book", "re-load"):
+            start = time.perf_counter()
+            num, report = bulk("bulk-" + str(days), prices)
+            secs = time.perf_counter() - start
+            print(f"  bulk {run:8s}: {secs:8.3f} s = {len(prices) / secs:10.0f} prices/s ; {num} prices in the PriceDB"
+                  f"\n      {report}")
+
+
+if __name__ == "__main__":
+    bench_price_load_main(sys.argv[1:])
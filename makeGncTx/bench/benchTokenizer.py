@@ -0,0 +1,80 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# benchTokenizer.py -- benchmark the shared first-word LineTokenizer against the previous per-line sequence of regex matches,
+#                      over all the text files in the txtFromPdf corpus
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import re
+import glob
+import timeit
+from sys import path, argv
+path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from Configuration import FUND, FUND_NAME_CODE, TXS
+from monarchTokens import LineTokenizer, TOK_DATE, TOK_FUND, TOK_COMPANY, TOK_TXS
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "txtFromPdf")
+
+
+def classify_sequential(p_lines:list) -> int:
+    """the previous way: compile in the parse call, then try each check in turn on every line"""
+    re_date = re.compile(r"([0-9]{2}-\w{3}-[0-9]{4})")
+    found = 0
+    for line in p_lines:
+        words = line.split()
+        if len(words) <= 0:
+            continue
+        if words[0] == TXS:
+            found += 1
+            continue
+        if words[0] == FUND.upper():
+            found += 1
+            continue
+        if words[0] in FUND_NAME_CODE:
+            found += 1
+            continue
+        if re.match(re_date, words[0]):
+            found += 1
+    return found
+
+
+def classify_tokenizer(p_lines:list, p_tokenizer:LineTokenizer) -> int:
+    found = 0
+    for line in p_lines:
+        kind = p_tokenizer.tokenize(line)[0]
+        if kind == TOK_TXS or kind == TOK_FUND or kind == TOK_COMPANY or kind == TOK_DATE:
+            found += 1
+    return found
+
+
+def bench_tokenizer_main(args:list):
+    repeat = int(args[0]) if args else 10
+    lines = []
+    for fname in sorted( glob.glob(os.path.join(CORPUS_DIR, "*.txt")) ):
+        with open(fname) as fp:
+            lines.extend( fp.readlines() )
+    tokenizer = LineTokenizer(FUND_NAME_CODE)
+
+    seq_found = classify_sequential(lines)
+    tok_found = classify_tokenizer(lines, tokenizer)
+    if seq_found != tok_found:
+        raise Exception(f"Tokenizer found {tok_found} lines but the sequential matches found {seq_found}!")
+
+    seq_secs = min( timeit.repeat(lambda: classify_sequential(lines), number = repeat, repeat = 3) ) / repeat
+    tok_secs = min( timeit.repeat(lambda: classify_tokenizer(lines, tokenizer), number = repeat, repeat = 3) ) / repeat
+    print(f"corpus: {len(lines)} lines ; {tok_found} date/FUND/company/TRANSACTIONS lines")
+    print(f"sequential regex : {seq_secs * 1000:8.2f} ms  = {len(lines) / seq_secs:12.0f} lines/sec")
+    print(f"LineTokenizer    : {tok_secs * 1000:8.2f} ms  = {len(lines) / tok_secs:12.0f} lines/sec")
+    print(f"speedup          : {seq_secs / tok_secs:8.2f}x")
+
+
+if __name__ == "__main__":
+    bench_tokenizer_main(argv[1:])
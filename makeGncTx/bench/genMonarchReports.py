@@ -0,0 +1,394 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# genMonarchReports.py -- generate large synthetic Monarch reports, in the formats read by the parsers,
+#                         plus a manifest of the expected counts, to benchmark and stress the parsers and the Gnucash writer
+#
+#   formats:  pdf     = text extracted from a pdf Transaction Report  (parse_pdf_txs)
+#             copy    = Transaction Report copied from the web page   (parse_copy_txs)
+#             funds   = Funds Report copied from the web page         (parse_funds_info)
+#             monarch = .monarch copied report                        (ParseMonarchInput.parse_monarch_info)
+#             qtrep   = text extracted from a pdf Quarterly Report    (MonarchQrepToGncPrices.parse_monarch_qtrep)
+#
+#   the price-only formats, funds and qtrep, have a price line for each trade of a section, with at least one per fund
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import sys
+import json
+import random
+from datetime import date, timedelta
+from argparse import ArgumentParser
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from Configuration import *
+
+FORMATS = ("pdf", "copy", "funds", "monarch", "qtrep")
+PLANS = (PL_OPEN, PL_TFSA, PL_RRSP)
+OWNERS = (MON_MARK, MON_LULU)
+# plan ids as found in the Monarch reports
+DEFAULT_PLAN_IDS = { PL_OPEN: JOINT_PLAN_ID, PL_TFSA: "278826", PL_RRSP: "278827" }
+
+# kinds of trade and their share of the trades: the pairs produce TWO trades each
+DIST: str    = "distribution"
+FEES: str    = "fee"
+SWITCH_PAIR  = "switch"
+INTRCL_PAIR  = "interclass"
+KIND_WEIGHTS = { DIST: 55, FEES: 10, SWITCH_PAIR: 20, INTRCL_PAIR: 15 }
+PAIR_KINDS   = (SWITCH_PAIR, INTRCL_PAIR)
+
+# a word from the fund name that starts the price lines of the copied reports, for each fund company
+COMPANY_WORD = { code: name for name, code in FUND_NAME_CODE.items() }
+START_DATE = date(2019, 1, 2)
+
+
+def money(cents:int) -> str:
+    """Monarch dollar string, e.g. '$1,234.56' or '-$228.58'"""
+    text = "${:,}.{:02d}".format(abs(cents) // 100, abs(cents) % 100)
+    return '-' + text if cents < 0 else text
+
+
+def pdf_money(cents:int) -> str:
+    """negative amounts are in parentheses in the pdf reports"""
+    text = money(abs(cents))
+    return '(' + text + ')' if cents < 0 else text
+
+
+def fixed4(value:int) -> str:
+    """1/10000 ths as a string with 4 decimal places"""
+    sign = '-' if value < 0 else ''
+    return "{}{}.{:04d}".format(sign, abs(value) // 10000, abs(value) % 10000)
+
+
+def price4(value:int) -> str:
+    """price in 1/10000 ths, e.g. '$9.1759'"""
+    return '$' + fixed4(value)
+
+
+class SynthTrade:
+    __slots__ = ('date', 'fund', 'kind', 'leg', 'gross', 'units', 'price')
+
+    def __init__(self, p_date:date, p_fund:str, p_kind:str, p_leg:str, p_gross:int, p_price:int):
+        self.date = p_date
+        self.fund = p_fund
+        self.kind = p_kind
+        # 'in' or 'out' for the legs of a pair, else None
+        self.leg = p_leg
+        self.gross = p_gross
+        self.price = p_price
+        # units in 1/10000 ths with the same sign as the gross: gross is in cents and price in 1/10000 ths
+        self.units = int(round(p_gross * 1000000 / p_price))
+
+
+class ReportGenerator:
+    """
+    Emit the trades of each (owner, plan) as a stream, so the size of a report is limited only by the disk.
+    The same seed ALWAYS gives the same reports.
+    """
+    def __init__(self, p_seed:int, p_trades:int, p_owners=OWNERS, p_plans=PLANS, p_plan_ids:dict = None):
+        self.seed = p_seed
+        self.trades = p_trades
+        self.owners = list(p_owners)
+        self.plans = list(p_plans)
+        self.plan_ids = dict(DEFAULT_PLAN_IDS if p_plan_ids is None else p_plan_ids)
+        # funds of each company, to find the other fund of a pair
+        self.company_funds = {}
+        for fund in FUNDS_LIST:
+            self.company_funds.setdefault(fund.split()[0], []).append(fund)
+
+    def section_size(self, p_index:int) -> int:
+        """the trades are shared out evenly over the (owner, plan) sections"""
+        num_sections = len(self.owners) * len(self.plans)
+        return self.trades // num_sections + (1 if p_index < self.trades % num_sections else 0)
+
+    def section_trades(self, p_owner:str, p_plan:str, p_size:int):
+        """
+        Generator of the SynthTrades of one (owner, plan) section, in date order.
+        Every fund in FUNDS_LIST is used in turn; the two legs of a pair are in different funds of the same company.
+        """
+        rng = random.Random( "{}:{}:{}".format(self.seed, p_owner, p_plan) )
+        kinds = list(KIND_WEIGHTS)
+        weights = [KIND_WEIGHTS[k] for k in kinds]
+        span = max(1, p_size)
+        count = 0
+        fund_index = 0
+        while count < p_size:
+            tx_date = START_DATE + timedelta(days = count * 365 // span)
+            fund = FUNDS_LIST[fund_index % len(FUNDS_LIST)]
+            fund_index += 1
+            kind = rng.choices(kinds, weights)[0]
+            if kind in PAIR_KINDS and count + 2 > p_size:
+                kind = DIST
+            price = rng.randint(50000, 500000)
+            gross = rng.randint(1000, 500000)
+            if kind == DIST:
+                yield SynthTrade(tx_date, fund, kind, None, gross, price)
+                count += 1
+            elif kind == FEES:
+                yield SynthTrade(tx_date, fund, kind, None, -(gross // 20 + 100), price)
+                count += 1
+            else:
+                siblings = self.company_funds[fund.split()[0]]
+                partner = siblings[(siblings.index(fund) + 1) % len(siblings)]
+                yield SynthTrade(tx_date, fund, kind, "out", -gross, price)
+                yield SynthTrade(tx_date, partner, kind, "in", gross, rng.randint(50000, 500000))
+                count += 2
+
+    def sections(self, p_owner:str):
+        """:return generator of (plan, generator of SynthTrades) for one owner"""
+        base = self.owners.index(p_owner) * len(self.plans)
+        for i, plan in enumerate(self.plans):
+            yield plan, self.section_trades(p_owner, plan, self.section_size(base + i))
+
+    def price_of(self, p_owner:str, p_plan:str, p_fund:str, p_row:int = 0) -> tuple:
+        """:return (unit balance, price) in 1/10000 ths for the price lines ; p_row > 0 for the repeats of a fund"""
+        key = "{}:{}:{}:{}:price".format(self.seed, p_owner, p_plan, p_fund)
+        rng = random.Random( key + ":{}".format(p_row) if p_row else key )
+        return rng.randint(10000, 50000000), rng.randint(50000, 500000)
+
+    def price_funds(self, p_owner:str, p_plan:str):
+        """
+        Generator of (fund, row) for the price lines of one (owner, plan) section of a price-only report:
+        every fund in FUNDS_LIST in turn, as many times as needed to have a line for each trade of the section
+        """
+        size = self.section_size( self.owners.index(p_owner) * len(self.plans) + self.plans.index(p_plan) )
+        for i in range( max(len(FUNDS_LIST), size) ):
+            yield FUNDS_LIST[i % len(FUNDS_LIST)], i // len(FUNDS_LIST)
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # copy-text trade lines, as read by parse_copy_txs and parse_monarch_info
+
+    @staticmethod
+    def copy_type_words(p_trade:SynthTrade) -> str:
+        if p_trade.kind == DIST:
+            return REINV + " Distribution"
+        if p_trade.kind == FEES:
+            return FEE + " Redemption"
+        switch = SW_IN if p_trade.leg == "in" else SW_OUT
+        if p_trade.kind == INTRCL_PAIR:
+            return INTRCL + " " + switch
+        return switch + " Order"
+
+    def copy_trade_line(self, p_trade:SynthTrade) -> str:
+        cmpy, code = p_trade.fund.split()
+        return "{} {} {} {} A FE {} {} {} {}".format(p_trade.date.strftime("%d-%b-%Y"), self.copy_type_words(p_trade),
+                                                    cmpy, code, money(p_trade.gross), money(p_trade.gross),
+                                                    price4(p_trade.price), fixed4(p_trade.units))
+
+    def price_tail(self, p_owner:str, p_plan:str, p_fund:str, p_columns:int, p_row:int = 0) -> str:
+        """fund, series, balance, price and the LAST p_columns summary columns of a price line"""
+        bal, price = self.price_of(p_owner, p_plan, p_fund, p_row)
+        value = bal * price // 1000000
+        summary = [money(value), "100.0%", money(value), money(0), "0.0%", "Y", "N"]
+        return " ".join([p_fund.replace(' ', '-'), 'A', fixed4(bal), price4(price)] + summary[-p_columns:])
+
+    # ---------------------------------------------------------------------------------------------------------------------
+    # the report formats: each write_* returns the manifest entry for the file
+
+    @staticmethod
+    def new_counts() -> dict:
+        return { "trades": 0, "prices": 0, "kinds": { DIST: 0, FEES: 0, SWITCH_PAIR: 0, INTRCL_PAIR: 0 }, "plans": {} }
+
+    @staticmethod
+    def count_trade(p_counts:dict, p_plan:str, p_trade:SynthTrade):
+        p_counts["trades"] += 1
+        p_counts["plans"].setdefault(p_plan, {"trades": 0, "prices": 0})["trades"] += 1
+        # count the pairs once, at their first leg
+        if p_trade.leg != "in":
+            p_counts["kinds"][p_trade.kind] += 1
+
+    @staticmethod
+    def count_price(p_counts:dict, p_plan:str):
+        p_counts["prices"] += 1
+        p_counts["plans"].setdefault(p_plan, {"trades": 0, "prices": 0})["prices"] += 1
+
+    def write_copy(self, fp, p_owner:str) -> dict:
+        counts = self.new_counts()
+        fp.write(p_owner + '\n')
+        for plan, trades in self.sections(p_owner):
+            fp.write("{} {}\n".format(TXS, plan))
+            for trd in trades:
+                fp.write(self.copy_trade_line(trd) + '\n')
+                self.count_trade(counts, plan, trd)
+        return counts
+
+    def write_monarch(self, fp, p_owner:str) -> dict:
+        counts = self.new_counts()
+        fp.write("{} Account Summary\n".format(START_DATE.strftime("%d-%b-%Y")))
+        # the parser takes the owner as LULU if this line starts with OPEN
+        fp.write( ("OPEN Accounts " + p_owner if p_owner == MON_LULU else p_owner) + '\n' )
+        for plan, trades in self.sections(p_owner):
+            fp.write("FUND {} {} Account\n".format(self.plan_ids[plan], plan))
+            for fund in FUNDS_LIST:
+                fp.write("{} {}\n".format(COMPANY_WORD[fund.split()[0]], self.price_tail(p_owner, plan, fund, 7)))
+                self.count_price(counts, plan)
+            for trd in trades:
+                fp.write(self.copy_trade_line(trd) + '\n')
+                self.count_trade(counts, plan, trd)
+        return counts
+
+    def write_funds(self, fp, p_owner:str) -> dict:
+        counts = self.new_counts()
+        fp.write(p_owner + '\n')
+        fp.write("{} Funds Summary\n".format(START_DATE.strftime("%d-%b-%Y")))
+        for plan in self.plans:
+            fp.write("FUND CODE {} Balance\n".format(plan))
+            for fund, row in self.price_funds(p_owner, plan):
+                # the funds report has one summary column less than the .monarch report
+                fp.write("{} {}\n".format(COMPANY_WORD[fund.split()[0]], self.price_tail(p_owner, plan, fund, 6, row)))
+                self.count_price(counts, plan)
+        return counts
+
+    def write_qtrep(self, fp, p_owner:str) -> dict:
+        counts = self.new_counts()
+        end_date = START_DATE + timedelta(days = 364)
+        period = "{} {}, {} to {} {}, {}".format(START_DATE.strftime("%b"), START_DATE.day, START_DATE.year,
+                                                 end_date.strftime("%b"), end_date.day, end_date.year)
+        fp.write("{}\nPage 1 of 1\nFor the period {}\n".format(p_owner, period))
+        for plan in self.plans:
+            fp.write("{} {}  ({}) Client Name\n".format(plan, self.plan_ids[plan], "Joint" if plan == PL_OPEN else "Individual"))
+            fp.write("Owner(s):\n{}\nInvestments\n".format(p_owner))
+            for fund, row in self.price_funds(p_owner, plan):
+                cmpy, code = fund.split()
+                bal, price = self.price_of(p_owner, plan, fund, row)
+                value = bal * price // 1000000
+                fp.write("{} - {} - \n{} Fund Series A\n{}\n".format(COMPANY_NAME[cmpy], code, COMPANY_WORD[cmpy],
+                                                                     self.plan_ids[plan]))
+                fp.write("{}\n{}\n{}\n{}\n{}\n".format(price4(price), fixed4(bal), money(value), money(value), money(value)))
+                self.count_price(counts, plan)
+            fp.write("Transaction Details for the Period {}\n".format(period))
+        fp.write("Disclosure\n")
+        return counts
+
+    @staticmethod
+    def pdf_desc_lines(p_trade:SynthTrade) -> list:
+        """the description lines that parse_pdf_txs expects for each kind of trade"""
+        if p_trade.kind == DIST:
+            return [REINV + " ", "Distribution/Interest"]
+        if p_trade.kind == FEES:
+            return [FEE]
+        if p_trade.kind == SWITCH_PAIR:
+            return [SW_IN if p_trade.leg == "in" else SW_OUT]
+        if p_trade.leg == "in":
+            return [INTRF_IN + " ", "(Change Account-Same ", "Dealer)"]
+        return [INTRF_OUT + " ", "(Change Account)"]
+
+    def write_pdf(self, fp, p_owner:str) -> dict:
+        counts = self.new_counts()
+        for plan, trades in self.sections(p_owner):
+            fp.write("Plan Type:\n{} ({})\nPlan ID:\n{}\n".format(plan, "Joint" if plan == PL_OPEN else "Individual",
+                                                                   self.plan_ids[plan]))
+            fp.write("Owner(s):\n{}\n".format(p_owner))
+            curr_fund = None
+            balance = {}
+            for trd in trades:
+                if trd.fund != curr_fund:
+                    curr_fund = trd.fund
+                    cmpy = trd.fund.split()[0]
+                    fp.write("{}/{}-{} Fund Series A\n".format(COMPANY_NAME[cmpy], trd.fund, COMPANY_WORD[cmpy]))
+                    fp.write("Trade Date\nDescription\nGross\nNet\nUnits\nPrice\nUnit Balance\n")
+                balance[trd.fund] = balance.get(trd.fund, 10000000) + trd.units
+                fp.write(trd.date.strftime("%m/%d/%Y") + '\n')
+                for line in self.pdf_desc_lines(trd):
+                    fp.write(line + '\n')
+                fp.write("{0}\n{0}\n{1}\n{2}\n{3}\n".format(pdf_money(trd.gross), fixed4(trd.units),
+                                                            price4(trd.price), fixed4(balance[trd.fund])))
+                self.count_trade(counts, plan, trd)
+        return counts
+
+    def write_report(self, p_format:str, p_owner:str, p_fname:str) -> dict:
+        with open(p_fname, 'w') as fp:
+            counts = getattr(self, "write_" + p_format)(fp, p_owner)
+        counts.update({ "format": p_format, "owner": p_owner })
+        return counts
+
+# END class ReportGenerator
+
+
+def report_name(p_format:str, p_owner:str, p_trades:int, p_seed:int) -> str:
+    ext = ".monarch" if p_format == "monarch" else ".txt"
+    return "synth-{}_{}_{}tx_s{}{}".format(p_format, p_owner.split()[0], p_trades, p_seed, ext)
+
+
+def generate(p_dir:str, p_trades:int, p_seed:int = 1, p_formats=FORMATS, p_owners=OWNERS, p_plans=PLANS,
+             p_plan_ids:dict = None) -> dict:
+    """
+    Write one report per format and owner into p_dir, plus manifest.json with the expected counts
+    :return the manifest
+    """
+    os.makedirs(p_dir, exist_ok=True)
+    gen = ReportGenerator(p_seed, p_trades, p_owners, p_plans, p_plan_ids)
+    manifest = { "seed": p_seed, "trades": p_trades, "plans": list(p_plans), "plan_ids": gen.plan_ids, "files": {} }
+    for fmt in p_formats:
+        for owner in p_owners:
+            fname = report_name(fmt, owner, p_trades, p_seed)
+            manifest["files"][fname] = gen.write_report(fmt, owner, os.path.join(p_dir, fname))
+    with open(os.path.join(p_dir, "manifest.json"), 'w') as fp:
+        json.dump(manifest, fp, indent=4)
+    return manifest
+
+
+def verify(p_dir:str, p_manifest:dict) -> list:
+    """
+    Parse the pdf, copy and funds reports with the streaming parsers and compare with the manifest
+    :return list of the differences, empty if all the counts match
+    """
+    from monarchStream import PdfTxStream, CopyTxStream, FundsStream
+    streams = { "pdf": PdfTxStream, "copy": CopyTxStream, "funds": FundsStream }
+    problems = []
+    for fname, expected in p_manifest["files"].items():
+        if expected["format"] not in streams:
+            continue
+        stream = streams[expected["format"]]()
+        found = { TRADE: 0, PRICE: 0 }
+        for evt in stream.read_file(os.path.join(p_dir, fname)):
+            found[evt.tx_type] += 1
+        if found[TRADE] != expected["trades"] or found[PRICE] != expected["prices"]:
+            problems.append("{}: expected {} trades & {} prices but parsed {} & {}"
+                            .format(fname, expected["trades"], expected["prices"], found[TRADE], found[PRICE]))
+        if stream.owner != expected["owner"]:
+            problems.append("{}: expected owner {} but parsed {}".format(fname, expected["owner"], stream.owner))
+    return problems
+
+
+def gen_monarch_reports_main(args:list):
+    arg_parser = ArgumentParser(description="Generate synthetic Monarch reports and a manifest of the expected counts",
+                                prog="python3 genMonarchReports.py")
+    arg_parser.add_argument('-d', '--outdir', required=True, help="folder for the reports and manifest.json")
+    arg_parser.add_argument('-n', '--trades', type=int, default=1000, help="number of trades in each format, shared over the owners and plans")
+    arg_parser.add_argument('-s', '--seed', type=int, default=1, help="random seed")
+    arg_parser.add_argument('-f', '--formats', nargs='+', choices=FORMATS, default=list(FORMATS))
+    arg_parser.add_argument('-o', '--owners', nargs='+', choices=OWNERS, default=list(OWNERS))
+    arg_parser.add_argument('-p', '--plans', nargs='+', choices=PLANS, default=list(PLANS))
+    arg_parser.add_argument('--plan-id', nargs='+', default=[], metavar="PLAN=ID",
+                            help="plan ids for the FUND lines of the .monarch reports, e.g. OPEN=78514")
+    arg_parser.add_argument('--verify', action="store_true", help="parse the reports and check them against the manifest")
+    opts = arg_parser.parse_args(args)
+
+    plan_ids = dict(DEFAULT_PLAN_IDS)
+    for item in opts.plan_id:
+        plan, _, plan_id = item.partition('=')
+        plan_ids[plan] = plan_id
+
+    GNULOG.set_level(LOG_OFF)
+    manifest = generate(opts.outdir, opts.trades, opts.seed, opts.formats, opts.owners, opts.plans, plan_ids)
+    for fname, entry in manifest["files"].items():
+        print(f"{fname}: {entry['trades']} trades ; {entry['prices']} prices ; {entry['kinds']}")
+
+    if opts.verify:
+        problems = verify(opts.outdir, manifest)
+        for prob in problems:
+            print("MISMATCH: " + prob)
+        print("verify: " + ("FAILED" if problems else "all counts match"))
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit( gen_monarch_reports_main(sys.argv[1:]) )
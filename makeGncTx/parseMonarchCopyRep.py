@@ -15,8 +15,10 @@ __created__ = "2019-06-22"
 __updated__ = "2025-07-20"
 
 from sys import path, argv
-import re
 import json
+import glob
+import time
+import threading
 from argparse import ArgumentParser
 path.append("/home/marksa/git/Python/utils")
 from mhsUtils import *
@@ -26,6 +28,13 @@ path.append("/home/marksa/git/Python/gnucash/common")
 from gncUtils import *
 path.append("/home/marksa/git/Python/google/sheets")
 from sheetAccess import *
+path.append(osp.join(osp.dirname(osp.abspath(__file__)), "src"))
+from tradePairs import PendingPairs
+from monarchTokens import LineTokenizer, RE_DOLLARS, RE_UNITS, TOK_DATE, TOK_FUND, TOK_COMPANY
+from parallelParse import parse_in_pool
+from monarchStream import MonarchStream, collect_record
+from amountColumns import scale_columns
+from Configuration import BookFingerprints
 
 RECORD_SHEET = "Gnc Txs"
 RECORD_RANGE = f"'{RECORD_SHEET}'!A1"
@@ -35,21 +44,209 @@ RECORD_INPUTFILE_COL = 'C'
 RECORD_MODE_COL      = 'D'
 RECORD_GNCFILE_COL   = 'E'
 
+# first-word dispatch for the lines of a copied Monarch report
+TOKENIZER = LineTokenizer(FUND_NAME_CODE)
+
+# decimal places of the trade amounts converted by amountColumns: cents and 1/10000 units
+TRADE_AMOUNT_PLACES = { GROSS: 2, NET: 2, UNITS: 4 }
+
+# progress counts of a run
+LINES_PARSED = "lines parsed"
+TRADES_WRITTEN = "trades written"
+PRICES_ADDED = "prices added"
+
+
+class RunCancelled(Exception):
+    """The run was cancelled through its RunMonitor."""
+
+
+class RunMonitor:
+    """
+    Follow a run from another thread, e.g. a UI:
+      progress counts are sent to the callback at most once per interval, and at the end of each step
+      cancel() stops the run at the next line or tx, BEFORE anything is written to the Gnucash book:
+      once the writing has started the run ALWAYS finishes, with the save and the update of the Google sheet
+    """
+    def __init__(self, p_callback=None, p_interval:float = 0.25):
+        self.counts = { LINES_PARSED: 0, TRADES_WRITTEN: 0, PRICES_ADDED: 0 }
+        self._callback = p_callback
+        self._interval = p_interval
+        self._last_report = 0.0
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check(self):
+        if self._cancel.is_set():
+            raise RunCancelled("Run CANCELLED!")
+
+    def add(self, p_name:str, p_num:int = 1, p_check:bool = True):
+        self.counts[p_name] += p_num
+        if p_check:
+            self.check()
+        if self._callback and time.monotonic() - self._last_report >= self._interval:
+            self.report()
+
+    def report(self):
+        self._last_report = time.monotonic()
+        if self._callback:
+            self._callback( dict(self.counts) )
+
+    def watch_lines(self, p_lines, p_every:int = 100):
+        """pass the lines through, counting them and checking for a cancel every p_every lines"""
+        num = 0
+        for num, line in enumerate(p_lines, start=1):
+            if num % p_every == 0:
+                self.add(LINES_PARSED, p_every)
+            yield line
+        self.add(LINES_PARSED, num % p_every)
+        self.report()
+# END class RunMonitor
+
+
+class MonarchCopyStream(MonarchStream):
+    """
+    Prices and trades from a Monarch report COPIED from the Monarch web page, yielded as each line is read:
+      the document date, then the owner, then FUND lines with the plan id, price lines and trade lines.
+    """
+    def __init__(self, p_lgr:lg.Logger):
+        super().__init__()
+        self._lgr = p_lgr
+        self.state = FIND_DATE
+        self.doc_date = None
+
+    def parse_line(self, line:str):
+        kind, words, date_match = TOKENIZER.tokenize(line)
+        if len(words) <= 1:
+            return ()
+
+        if self.state == FIND_DATE:
+            if kind == TOK_DATE:
+                self.doc_date = date_match.group(1)
+                self._lgr.debug(f"Document date: {self.doc_date}")
+                self.state = FIND_OWNER
+                return ()
+
+        if self.state == FIND_OWNER:
+            # update 2023-03-04 after redemption of all JOINT OWNER assets:
+            # owner is LULU if file contains an OPEN account, else MARK
+            self.owner = MON_MARK
+            if words[0] == OPEN:
+                self.owner = MON_LULU
+            self._lgr.info(f"\u0022Current owner: {self.owner}\u0022")
+            self.state = STATE_SEARCH
+            return ()
+
+        if kind == TOK_FUND:
+            for word in words:
+                if word in PLAN_IDS:
+                    self.plan_type = PLAN_IDS[word][0]
+                    self._lgr.debug(f"\u0022Current plan: type = '{self.plan_type}' ; id = '{word}'\u0022")
+
+        # PRICES
+        if kind == TOK_COMPANY:
+            # NOTE: price lines start with a fund name and have enough words to match the accounts header
+            if len(words) >= 11:
+                return ( self.event(PRICE, self.get_price(words)), )
+            return ()
+
+        # TRADES
+        # NOTE: trade lines start with a date and have enough words to match the tx header
+        if kind == TOK_DATE and len(words) >= 8:
+            return ( self.event(TRADE, self.get_trade(words, date_match.group(1))), )
+
+        return ()
+
+    def get_price(self, words:list) -> dict:
+        fd_cpy = words[0]
+        self._lgr.debug(f"FOUND a NEW Price: {fd_cpy}")
+        pfund = words[-11]
+        if '-' in pfund:
+            pfund = pfund.replace('-', ' ')
+        else:
+            raise Exception(f"Did NOT find proper fund name: {pfund}!")
+        bal = words[-9]
+        if '.' not in bal or '$' in bal:
+            raise Exception(f"Did NOT find proper balance: {bal}!")
+        price = words[-8]
+        if '.' not in price or '$' not in price:
+            raise Exception(f"Did NOT find proper price: {price}!")
+        price_info = { DATE:self.doc_date, DESC:PRICE, FUND_CMPY:fd_cpy, FUND:pfund, UNIT_BAL:bal, PRICE:price }
+        self._lgr.debug(f"ADD current Price tx: {price_info}")
+        return price_info
+
+    def get_trade(self, words:list, tx_date:str) -> dict:
+        self._lgr.debug(f"FOUND a NEW Tx! Date: {tx_date}")
+        fund_cpy = words[-8]
+        if fund_cpy not in FUND_NAME_CODE.values():
+            raise Exception(f"Did NOT find proper Fund company: {fund_cpy}!")
+        fund_code = words[-7]
+        if not fund_code.isnumeric():
+            raise Exception(f"Did NOT find proper Fund code: {fund_code}!")
+        tfund = fund_cpy + " " + fund_code
+        self._lgr.debug(f"fund is: {tfund}")
+
+        # set the DESCRIPTION based on the different TYPES
+        tx_type = words[1]
+        if tx_type == "In" and words[2] == CASH:
+            desc = INCASH_TRIN if words[3] == TRANS_IN else INCASH_TROUT
+        elif tx_type == DOLLAR:
+            desc = DCA_IN if words[4] == SW_IN else DCA_OUT
+        elif tx_type == INTRCL or tx_type == INTRLD:
+            desc = words[2]
+        elif tx_type == REINV and words[2] == MGMT:
+            desc = RMFR
+        else:
+            desc = TX_TYPES[tx_type]
+        if not desc.isprintable():
+            raise Exception(f"Did NOT find proper Description: {desc}!")
+        self._lgr.debug(f"description = '{desc}'")
+
+        # noinspection PyDictCreation
+        trade_info = { TRADE_DATE:tx_date, FUND:tfund, TYPE:desc, CMPY:COMPANY_NAME[fund_cpy] }
+        trade_info[DESC] = trade_info[CMPY] + ": " + desc
+        trade_info[UNITS] = words[-1]
+        if '.' not in trade_info[UNITS] or '$' in trade_info[UNITS]:
+            raise Exception(f"Did NOT find proper Units!: {trade_info[UNITS]}")
+        trade_info[PRICE] = words[-2]
+        if '.' not in trade_info[PRICE] or '$' not in trade_info[PRICE]:
+            raise Exception(f"Did NOT find proper Price: {trade_info[PRICE]}!")
+        trade_info[NET] = words[-3]
+        if '.' not in trade_info[NET] or '$' not in trade_info[NET]:
+            raise Exception(f"Did NOT find proper Net amount: {trade_info[NET]}!")
+        trade_info[GROSS] = words[-4]
+        if '.' not in trade_info[GROSS] or '$' not in trade_info[GROSS]:
+            raise Exception(f"Did NOT find proper Gross amount: {trade_info[GROSS]}!")
+        load = words[-5]
+        if not load.isalpha():
+            raise Exception(f"Did NOT find proper Load: {load}!")
+        trade_info[LOAD] = load
+
+        self._lgr.debug(f"ADD current Trade tx:\n\t\t\t{trade_info}")
+        return trade_info
+# END class MonarchCopyStream
+
 
 # noinspection PyAttributeOutsideInit
 class ParseMonarchInput:
-    def __init__(self, p_lgr:lg.Logger):
+    def __init__(self, p_lgr:lg.Logger, p_monitor:RunMonitor = None):
         # store the information from the input file
         self._input_txs = InvestmentRecord(p_lgr)
         # temp storage of txs while looking to match pairs
-        self._gnucash_txs = InvestmentRecord(p_lgr)
+        self._pending_pairs = PendingPairs()
         self._lgr = p_lgr
+        # progress and cancel of the run, if followed by a UI
+        self._monitor = p_monitor
 
     def get_input_record(self) -> InvestmentRecord:
         return self._input_txs
 
-    def get_gnucash_record(self) -> InvestmentRecord:
-        return self._gnucash_txs
+    def get_pending_pairs(self) -> PendingPairs:
+        return self._pending_pairs
 
     def parse_file(self, p_file:str):
         if not osp.isfile(p_file):
@@ -95,125 +292,19 @@ class ParseMonarchInput:
              6: Trades ->
                   match date at [0]:
                     record: fund, desc, gross, units, price, load, trade date
+        see MonarchCopyStream, which does the parsing one line at a time
         """
         self._lgr.debug( get_current_time() )
-
-        re_date = re.compile(r"([0-9]{2}-\w{3}-[0-9]{4})")
-
-        mon_state = FIND_DATE
-        plan_type = UNKNOWN
         with open(self.in_file) as mfp:
-            ct = 0
-            for line in mfp:
-                ct += 1
-                words = line.split()
-                if len(words) <= 1:
-                    continue
-
-                if mon_state == FIND_DATE:
-                    re_match = re.match(re_date, words[0])
-                    if re_match:
-                        doc_date = re_match.group(1)
-                        self._lgr.debug(f"Document date: {doc_date}")
-                        mon_state = FIND_OWNER
-                        continue
+            lines = mfp if self._monitor is None else self._monitor.watch_lines(mfp)
+            collect_record(MonarchCopyStream(self._lgr), lines, self._input_txs)
 
-                if mon_state == FIND_OWNER:
-                    # update 2023-03-04 after redemption of all JOINT OWNER assets:
-                    # owner is LULU if file contains an OPEN account, else MARK
-                    owner = MON_MARK
-                    if words[0] == OPEN:
-                        owner = MON_LULU
-                    self._input_txs.set_owner(owner)
-                    self._lgr.info(f"\u0022Current owner: {owner}\u0022")
-                    mon_state = STATE_SEARCH
-                    continue
-
-                if words[0] == FUND.upper():
-                    for word in words:
-                        if word in PLAN_IDS:
-                            plan_type = PLAN_IDS[word][0]
-                            plan_id = word
-                            self._lgr.debug(f"\u0022Current plan: type = '{plan_type}' ; id = '{plan_id}'\u0022")
-                            continue
+    def stream_monarch_info(self):
+        """Generator of a MonarchEvent for each price or trade in the input file, as soon as it is read."""
+        return MonarchCopyStream(self._lgr).read_file(self.in_file)
 
-                # PRICES
-                if words[0] in FUND_NAME_CODE:
-                    # NOTE: price lines start with a fund name and have enough words to match the accounts header
-                    if len(words) >= 11:
-                        fd_cpy = words[0]
-                        self._lgr.debug(f"FOUND a NEW Price: {fd_cpy}")
-                        pfund = words[-11]
-                        if '-' in pfund:
-                            pfund = pfund.replace('-', ' ')
-                        else:
-                            raise Exception(f"Did NOT find proper fund name: {pfund}!")
-                        bal = words[-9]
-                        if '.' not in bal or '$' in bal:
-                            raise Exception(f"Did NOT find proper balance: {bal}!")
-                        price = words[-8]
-                        if '.' not in price or '$' not in price:
-                            raise Exception(f"Did NOT find proper price: {price}!")
-                        price_info = { DATE:doc_date, DESC:PRICE, FUND_CMPY:fd_cpy, FUND:pfund, UNIT_BAL:bal, PRICE:price }
-                        self._input_txs.add_tx(plan_type, PRICE, price_info)
-                        self._lgr.debug(f"ADD current Price tx: {price_info}")
-                    continue
-
-                # TRADES
-                re_match = re.match(re_date, words[0])
-                # NOTE: trade lines start with a date and have enough words to match the tx header
-                if re_match and len(words) >= 8:
-                    tx_date = re_match.group(1)
-                    self._lgr.debug(f"FOUND a NEW Tx! Date: {tx_date}")
-                    fund_cpy = words[-8]
-                    if fund_cpy not in FUND_NAME_CODE.values():
-                        raise Exception(f"Did NOT find proper Fund company: {fund_cpy}!")
-                    fund_code = words[-7]
-                    if not fund_code.isnumeric():
-                        raise Exception(f"Did NOT find proper Fund code: {fund_code}!")
-                    tfund = fund_cpy + " " + fund_code
-                    self._lgr.debug(f"fund is: {tfund}")
-
-                    # set the DESCRIPTION based on the different TYPES
-                    tx_type = words[1]
-                    if tx_type == "In" and words[2] == CASH:
-                        desc = INCASH_TRIN if words[3] == TRANS_IN else INCASH_TROUT
-                    elif tx_type == DOLLAR:
-                        desc = DCA_IN if words[4] == SW_IN else DCA_OUT
-                    elif tx_type == INTRCL or tx_type == INTRLD:
-                        desc = words[2]
-                    elif tx_type == REINV and words[2] == MGMT:
-                        desc = RMFR
-                    else:
-                        desc = TX_TYPES[tx_type]
-                    if not desc.isprintable():
-                        raise Exception(f"Did NOT find proper Description: {desc}!")
-                    self._lgr.debug(f"description = '{desc}'")
-
-                    # noinspection PyDictCreation
-                    trade_info = { TRADE_DATE:tx_date, FUND:tfund, TYPE:desc, CMPY:COMPANY_NAME[fund_cpy] }
-                    trade_info[DESC] = trade_info[CMPY] + ": " + desc
-                    trade_info[UNITS] = words[-1]
-                    if '.' not in trade_info[UNITS] or '$' in trade_info[UNITS]:
-                        raise Exception(f"Did NOT find proper Units!: {trade_info[UNITS]}")
-                    trade_info[PRICE] = words[-2]
-                    if '.' not in trade_info[PRICE] or '$' not in trade_info[PRICE]:
-                        raise Exception(f"Did NOT find proper Price: {trade_info[PRICE]}!")
-                    trade_info[NET] = words[-3]
-                    if '.' not in trade_info[NET] or '$' not in trade_info[NET]:
-                        raise Exception(f"Did NOT find proper Net amount: {trade_info[NET]}!")
-                    trade_info[GROSS] = words[-4]
-                    if '.' not in trade_info[GROSS] or '$' not in trade_info[GROSS]:
-                        raise Exception(f"Did NOT find proper Gross amount: {trade_info[GROSS]}!")
-                    load = words[-5]
-                    if not load.isalpha():
-                        raise Exception(f"Did NOT find proper Load: {load}!")
-                    trade_info[LOAD] = load
-
-                    self._input_txs.add_tx(plan_type, TRADE, trade_info)
-                    self._lgr.debug(f"ADD current Trade tx:\n\t\t\t{trade_info}")
-
-    def get_trade_info(self, mon_tx:dict, plan_type:str, ast_parent:Account, rev_acct:Account) -> (dict,dict):
+    def get_trade_info(self, mon_tx:dict, plan_type:str, ast_parent:Account, rev_acct:Account,
+                       p_amounts:tuple = None) -> (dict,dict):
         """
         Parse a Monarch trade transaction:
           USEFUL to have this intermediate function to obtain a collection of txs with the required Gnucash data
@@ -221,7 +312,8 @@ class ParseMonarchInput:
           BEFORE creating the actual Gnucash.Transaction's
             Asset accounts:   use the proper path to find the parent then search for the Fund Code in the descendants
             Revenue accounts: pick the proper account based on owner and plan type
-            Amounts:          regex match to Gross and Net then use the match groups
+            Amounts:          regex match to Gross and Net then use the match groups,
+                              UNLESS already converted for the whole batch -- see amountColumns
             Date:             convert the date then get day, month and year to form a Gnc date
             Units:            regex match and concatenate the groups on either side of decimal point to create a Gnc Amount
             Description:      use DESC and Fund Company
@@ -229,6 +321,7 @@ class ParseMonarchInput:
         :param   plan_type: from investment.InvestmentRecord
         :param  ast_parent: Asset parent account
         :param    rev_acct: Revenue account
+        :param   p_amounts: (gross cents, net cents, units) if already converted
         :return one trade tx or both txs of a switch, if available
         """
         self._lgr.debug(f"plan type = {plan_type}, asset parent = {ast_parent.GetName()}")
@@ -253,11 +346,43 @@ class ParseMonarchInput:
         init_tx[TYPE] = mon_tx[TYPE]
         init_tx[CMPY] = mon_tx[CMPY]
 
-        # NOTE: re_dollars will match (leading minus sign) OR (amount is in parentheses) if a NEGATIVE number
-        re_dollars = re.compile(r'([-(]?)\$([0-9,]{1,6})\.([0-9]{2}).*')
+        if p_amounts:
+            gross_amt, net_amount, units = p_amounts
+            init_tx[GROSS], init_tx[NET], init_tx[UNITS] = p_amounts
+            self._lgr.debug(f"gross amount = '{gross_amt}'; net amount = '{net_amount}'; units = '{units}'")
+        else:
+            gross_amt, net_amount, units = self.match_trade_amounts(mon_tx, init_tx)
+
+        # assemble the Description string
+        init_tx[DESC] = mon_tx[DESC]
+        self._lgr.debug(f"descr = '{init_tx[DESC]}'")
+
+        # notes field
+        notes = mon_tx[NOTES] if NOTES in mon_tx else f"Load = {mon_tx[LOAD]}"
+        init_tx[NOTES] = notes
+        self._lgr.debug(f"notes = '{init_tx[NOTES]}'")
 
+        pair_tx = None
+        if init_tx[TYPE] in PAIRED_TYPES:
+            self._lgr.debug("Tx is a Switch to ANOTHER account in SAME Fund company.")
+            # in this plan type: look for paired Tx with SAME company and date but OPPOSITE gross value
+            pair_tx = self._pending_pairs.match_or_add(plan_type, init_tx[FUND].split()[0], init_tx[TRADE_DATE],
+                                                       net_amount, init_tx, store_amount = gross_amt)
+            if pair_tx:
+                self._lgr.debug("*** Found the MATCH of a Switch pair ***")
+            else:
+                # the tx is stored until we find the matching tx
+                self._lgr.debug("Found the FIRST of a Switch pair...\n")
+
+        return init_tx, pair_tx
+
+    def match_trade_amounts(self, mon_tx:dict, init_tx:dict) -> tuple:
+        """
+        The per-trade fallback: regex match Gross, Net and Units of a Monarch trade and save them to init_tx
+        :return gross cents, net cents, units
+        """
         # get the GROSS dollar value of the tx
-        re_match = re.match(re_dollars, mon_tx[GROSS])
+        re_match = RE_DOLLARS.match(mon_tx[GROSS])
         if re_match:
             self._lgr.info(f"gross dollars = '{re_match.groups()}'")
             str_gross = re_match.group(2) + re_match.group(3)
@@ -272,7 +397,7 @@ class ParseMonarchInput:
             raise Exception(f"PROBLEM: gross amount DID NOT match with value: {mon_tx[GROSS]}!")
 
         # get the NET dollar value of the tx
-        re_match = re.match(re_dollars, mon_tx[NET])
+        re_match = RE_DOLLARS.match(mon_tx[NET])
         if re_match:
             self._lgr.info(f"net dollars = '{re_match.groups()}'")
             str_net = re_match.group(2) + re_match.group(3)
@@ -287,7 +412,7 @@ class ParseMonarchInput:
             raise Exception(f"PROBLEM: net amount DID NOT match with value: {mon_tx[NET]}!")
 
         # get the number of units for the tx
-        re_match = re.match(r'(-?)([0-9]{1,5})\.([0-9]{4}).*', mon_tx[UNITS])
+        re_match = RE_UNITS.match(mon_tx[UNITS])
         if re_match:
             self._lgr.info(f"tx units = '{re_match.groups()}'")
             units = int(re_match.group(2) + re_match.group(3))
@@ -298,85 +423,36 @@ class ParseMonarchInput:
         else:
             raise Exception(f"PROBLEM: units DID NOT match with value: {mon_tx[UNITS]}!")
 
-        # assemble the Description string
-        init_tx[DESC] = mon_tx[DESC]
-        self._lgr.debug(f"descr = '{init_tx[DESC]}'")
-
-        # notes field
-        notes = mon_tx[NOTES] if NOTES in mon_tx else f"Load = {mon_tx[LOAD]}"
-        init_tx[NOTES] = notes
-        self._lgr.debug(f"notes = '{init_tx[NOTES]}'")
-
-        pair_tx = None
-        have_pair = False
-        if init_tx[TYPE] in PAIRED_TYPES:
-            self._lgr.debug("Tx is a Switch to ANOTHER account in SAME Fund company.")
-            # in this plan type: look for paired Tx with SAME company and date but OPPOSITE gross value
-            for gnc_tx in self._gnucash_txs.get_trades(plan_type):
-                if gnc_tx[TYPE] in PAIRED_TYPES and gnc_tx[FUND].split()[0] == init_tx[FUND].split()[0] \
-                        and gnc_tx[GROSS] == (net_amount * -1) and gnc_tx[TRADE_DATE] == init_tx[TRADE_DATE]:
-                    # FOUND THE MATCHING Tx OF THIS PAIR
-                    have_pair = True
-                    pair_tx = gnc_tx
-                    self._lgr.debug("*** Found the MATCH of a Switch pair ***")
-                    break
-
-            if not have_pair:
-                # store the tx until we find the matching tx
-                self._gnucash_txs.add_tx(plan_type, TRADE, init_tx)
-                self._lgr.debug("Found the FIRST of a Switch pair...\n")
-
-        return init_tx, pair_tx
-
-    def process_monarch_trades(self, mon_tx:dict, plan_type:str, ast_parent:Account, p_owner:str):
-        """
-        Obtain EACH Monarch trade as a transaction item, or pair of transactions where required, and forward to Gnucash processing.
-        :param     mon_tx: Monarch transaction information
-        :param  plan_type: from investment.InvestmentRecord
-        :param ast_parent: Asset parent account
-        :param    p_owner: str name
-        """
-        self._lgr.debug(f"plan type = {plan_type}, asset parent = {ast_parent.GetName()}, owner = {p_owner}")
-        rev_acct = self.gnc_session.get_revenue_account(plan_type, p_owner)
-
-        # get all the tx required information from the Monarch json
-        tx1, tx2 = self.get_trade_info(mon_tx, plan_type, ast_parent, rev_acct)
-
-        # just return if there is a matching tx but we don't have it yet
-        if tx1[TYPE] in PAIRED_TYPES and tx2 is None:
-            return
-
-        # use the Gnucash API to create Transactions and save to a Gnucash file
-        self.gnc_session.create_trade_tx(tx1, tx2)
+        return gross_amt, net_amount, units
 
     def add_balance_to_trade(self):
         """
         Append the current unit balance from the Price list to the latest Trade tx.
         for EACH plan type:
+          go through Trade txs ONCE and keep the index of the latest Trade tx for each fund
           go through Price txs:
-            for each tx, find the latest Trade tx for that fund, if any...
-            if found, add the Unit Balance from the Price tx to the Trade tx
+            if the fund has a latest Trade tx, add the Unit Balance from the Price tx to the Trade tx
         """
         self._lgr.debug( get_current_time() )
         for iplan in self._input_txs.get_data():
             self._lgr.debug(f"plan type = '{repr(iplan)}'")
             plan = self._input_txs.get_plan(iplan)
+
+            # fund -> (latest date, index of the FIRST Trade tx with that date)
+            latest = {}
+            for indx, trd in enumerate(plan[TRADE]):
+                trd_date = dt.strptime(trd[TRADE_DATE], "%d-%b-%Y")
+                fund = trd[FUND]
+                if fund not in latest or trd_date > latest[fund][0]:
+                    latest[fund] = (trd_date, indx)
+                    self._lgr.debug(f"Latest date for {fund} = '{trd_date}'")
+
             for tx in plan[PRICE]:
-                indx = 0
-                latest_indx = -1
-                latest_dte = None
-                for trd in plan[TRADE]:
-                    if trd[FUND] == tx[FUND]:
-                        trd_date = dt.strptime(trd[TRADE_DATE], "%d-%b-%Y")
-                        if latest_dte is None or trd_date > latest_dte:
-                            latest_dte = trd_date
-                            self._lgr.debug(f"Latest date for {tx[FUND]} = '{latest_dte}'")
-                            latest_indx = indx
-                    indx += 1
-                if latest_indx > -1:
-                    plan[TRADE][latest_indx][UNIT_BAL] = tx[UNIT_BAL]
-                    plan[TRADE][latest_indx][NOTES] = f"{tx[FUND]} Balance = {tx[UNIT_BAL]}"
-                    self._lgr.debug(f"Notes for {tx[FUND]} = '{plan[TRADE][latest_indx][NOTES]}'")
+                if tx[FUND] in latest:
+                    latest_trd = plan[TRADE][latest[tx[FUND]][1]]
+                    latest_trd[UNIT_BAL] = tx[UNIT_BAL]
+                    latest_trd[NOTES] = f"{tx[FUND]} Balance = {tx[UNIT_BAL]}"
+                    self._lgr.debug(f"Notes for {tx[FUND]} = '{latest_trd[NOTES]}'")
 
     def insert_txs_to_gnucash_file(self, p_gncs:GnucashSession):
         """
@@ -389,30 +465,298 @@ class ParseMonarchInput:
         self._lgr.debug(f"Owner = {owner}")
 
         self.gnc_session.begin_session()
-        self.create_gnucash_info(owner)
+        try:
+            self.create_gnucash_info(owner, BookFingerprints())
+        except Exception:
+            # a bad input OR a cancel stops the run BEFORE anything is written: close the session WITHOUT saving,
+            # which does NOT undo a write on a SQL book, where each CommitEdit is stored at once
+            self.gnc_session.end_session(False)
+            raise
         self.gnc_session.end_session(True)
 
-    def create_gnucash_info(self, p_owner:str):
-        """Process each transaction from the Monarch input file to get the required Gnucash information."""
+        self.report_unmatched_pairs()
+
+    def report_unmatched_pairs(self):
+        """Log any paired trades that never found their opposite leg."""
+        unmatched = self._pending_pairs.get_unmatched()
+        if not unmatched:
+            return
+        self._lgr.warning(f"{len(unmatched)} paired trade(s) did NOT find a match:")
+        for plan_type, fund_cpy, trade_date, amount, tx in unmatched:
+            self._lgr.warning(f"\t{plan_type}: {tx[FUND]} @ {trade_date} = {amount} ({tx[DESC]})")
+
+    def create_gnucash_info(self, p_owner:str, p_existing:BookFingerprints):
+        """Import ALL the transactions from the Monarch input file, or NONE of them if ANY is bad."""
+        planned = self.prepare_gnucash_info(p_owner, p_existing)
+        self._lgr.info(p_existing.get_report())
+        # the LAST chance to cancel: BEFORE anything is written
+        if self._monitor:
+            self._monitor.check()
+        self.write_gnucash_info(planned)
+
+    def prepare_gnucash_info(self, p_owner:str, p_existing:BookFingerprints) -> list:
+        """
+        Phase ONE of the import: parse EVERY trade, check its splits and find ALL the accounts and price commodities,
+        WITHOUT creating anything in Gnucash: NO edit is begun until ALL the txs are good.
+        The trades and prices ALREADY in the book are dropped here, so a report imported twice adds nothing.
+        :param    p_owner: str name
+        :param p_existing: fingerprints of the book, shared by ALL the owners of a session
+        :return list of (TRADE, tx1, tx2) and (PRICE, price tx, asset parent) to create in phase two
+        :raise Exception if ANY trade is bad, after logging ALL the problems
+        """
         domain = self.gnc_session.get_domain()
         plans = self._input_txs.get_data()
+        planned = []
+        problems = []
         for plan_type in plans:
             self._lgr.debug(f"\n\n\t\t\u0022Plan type = {plan_type}\u0022")
 
             asset_parent = self.gnc_session.get_asset_account(plan_type, p_owner)
-            self._lgr.debug(f"create_gnucash_info(): asset parent = {asset_parent.GetName()}")
+            self._lgr.debug(f"prepare_gnucash_info(): asset parent = {asset_parent.GetName()}")
+            # the splits, and prices, ALREADY in the book for the funds of the plan
+            book = asset_parent.get_book()
+            p_existing.add_parent(asset_parent, book.get_price_db() if domain in (PRICE,BOTH) else None,
+                                  book.get_table().lookup("ISO4217", "CAD"))
 
             if domain in (TRADE,BOTH):
-                # TODO: DO NOT commit txs unless ALL txs are good for this monarch report?
-                for mon_tx in plans[plan_type][TRADE]:
-                    self.process_monarch_trades(mon_tx, plan_type, asset_parent, p_owner)
+                rev_acct = self.gnc_session.get_revenue_account(plan_type, p_owner)
+                trades = plans[plan_type][TRADE]
+                # convert the amounts of ALL the trades of the plan in one pass: the bad rows use the regexes
+                columns = scale_columns(trades, TRADE_AMOUNT_PLACES)
+                for mon_tx, amounts in zip(trades, zip( *(columns[key].to_list() for key in TRADE_AMOUNT_PLACES) )):
+                    try:
+                        # get all the tx required information from the Monarch json
+                        tx1, tx2 = self.get_trade_info(mon_tx, plan_type, asset_parent, rev_acct,
+                                                       None if None in amounts else amounts)
+                        # nothing to create if there is a matching tx but we don't have it yet
+                        if tx1[TYPE] in PAIRED_TYPES and tx2 is None:
+                            continue
+                        self.check_trade_splits(tx1, tx2)
+                    except Exception as gtie:
+                        problems.append(f"{plan_type}: {mon_tx.get(FUND)} @ {mon_tx.get(TRADE_DATE)} = {repr(gtie)}")
+                        continue
+                    split_keys = [ BookFingerprints.split_key(tx[ACCT], tx[TRADE_DATE], tx[GROSS], tx[UNITS])
+                                   for tx in (tx1, tx2) if tx is not None ]
+                    if p_existing.has_trade(*split_keys):
+                        self._lgr.debug(f"SKIP trade ALREADY in the book: {tx1[FUND]} {tx1[DESC]} @ {tx1[TRADE_DATE]}")
+                        continue
+                    planned.append( (TRADE, tx1, tx2) )
 
             if domain in (PRICE,BOTH):
                 for mon_tx in plans[plan_type][PRICE]:
-                    self.gnc_session.create_price(mon_tx, asset_parent)
+                    try:
+                        comm = self.gnc_session.get_account(mon_tx[FUND], asset_parent).GetCommodity()
+                        if comm is None:
+                            raise Exception(f"NO commodity for the account of fund {mon_tx[FUND]}!")
+                    except Exception as gpie:
+                        problems.append(f"{plan_type}: price of {mon_tx.get(FUND)} @ {mon_tx.get(DATE)} = {repr(gpie)}")
+                        continue
+                    if p_existing.has_price( BookFingerprints.price_key(comm, mon_tx[DATE]) ):
+                        self._lgr.debug(f"SKIP price ALREADY in the book: {mon_tx[FUND]} @ {mon_tx[DATE]}")
+                        continue
+                    planned.append( (PRICE, mon_tx, asset_parent) )
+
+        if problems:
+            for problem in problems:
+                self._lgr.error(problem)
+            raise Exception(f"{len(problems)} BAD trade(s) or price(s) for {p_owner}: NOTHING was written to the Gnucash file!")
+        return planned
+
+    @staticmethod
+    def check_trade_splits(tx1:dict, tx2:dict):
+        """
+        Phase ONE check of the splits that the Gnucash session makes for a trade with the Gross amounts:
+        the ASSET split of each tx of a pair, OR the ASSET split and the REVENUE split
+        :raise Exception if a split has NO account or the splits do NOT balance
+        """
+        if tx2 is not None:
+            splits = ( (tx1[ACCT], tx1[GROSS]), (tx2[ACCT], tx2[GROSS]) )
+        else:
+            splits = ( (tx1[ACCT], tx1[GROSS]), (tx1[REV], tx1[GROSS] * -1) )
+        if any(acct is None for acct, _ in splits):
+            raise Exception(f"trade '{tx1[DESC]}' has a split with NO account!")
+        imbalance = sum(value for _, value in splits)
+        if imbalance != 0:
+            raise Exception(f"trade '{tx1[DESC]}' IMBALANCE = {imbalance} cents!")
+
+    def write_gnucash_info(self, p_planned:list):
+        """
+        Phase TWO of the import: use the Gnucash API to create the Transactions and Prices from phase one.
+        Once started it is NOT cancelled: a write can NOT be undone on a SQL book.
+        """
+        self._lgr.info(f"create {len(p_planned)} Gnucash trade(s) and price(s)")
+        for tx_type, mon_tx, other in p_planned:
+            if tx_type == TRADE:
+                self.gnc_session.create_trade_tx(mon_tx, other)
+                if self._monitor:
+                    self._monitor.add(TRADES_WRITTEN, p_check = False)
+            else:
+                self.gnc_session.create_price(mon_tx, other)
+                if self._monitor:
+                    self._monitor.add(PRICES_ADDED, p_check = False)
+
+        if self._monitor:
+            self._monitor.report()
 # END class ParseMonarchInput
 
 
+def parse_monarch_file(p_file:str, p_logger_name:str) -> dict:
+    """
+    Parse ONE Monarch or JSON file, e.g. in a worker process.
+    :return the parsed record in its json form, which pickles back to the main process
+    """
+    parser = ParseMonarchInput( lg.getLogger(p_logger_name) )
+    parser.parse_file(p_file)
+    return parser.get_input_record().to_json()
+
+
+class MonarchBatch:
+    """
+    Parse a set of Monarch and/or JSON input files, merge them into ONE InvestmentRecord per owner
+    with duplicates removed, and write everything to Gnucash inside a SINGLE Gnucash session.
+    """
+    def __init__(self, p_lgr:lg.Logger, p_monitor:RunMonitor = None):
+        self._lgr = p_lgr
+        self._monitor = p_monitor
+        # owner -> ParseMonarchInput holding the merged record for that owner
+        self._owners = {}
+        # owner -> set of dedup keys already in the merged record
+        self._seen = {}
+        # one entry per input file: [file, owner, trades, prices, duplicates, error]
+        self._summary = []
+
+    @staticmethod
+    def collect_files(p_dir:str, p_pattern:str) -> list:
+        """Sorted Monarch and JSON files in the directory that match the glob pattern."""
+        if not osp.isdir(p_dir):
+            raise Exception(f"'{p_dir}' is NOT a valid directory!")
+        files = []
+        for fname in sorted( glob.glob(osp.join(p_dir, p_pattern)) ):
+            ftype = get_filetype(fname)[1:]
+            if osp.isfile(fname) and ftype in (MON, MON.lower(), JSON_LABEL):
+                files.append(fname)
+        return files
+
+    @staticmethod
+    def trade_key(plan_type:str, trd:dict) -> tuple:
+        # NOTES and UNIT_BAL are added by add_balance_to_trade() so are NOT part of the key
+        return TRADE, plan_type, trd[TRADE_DATE], trd[FUND], trd[DESC], trd[GROSS], trd[NET], trd[UNITS]
+
+    @staticmethod
+    def price_key(plan_type:str, prc:dict) -> tuple:
+        return PRICE, plan_type, prc[DATE], prc[FUND], prc[PRICE]
+
+    def get_parsers(self) -> dict:
+        return self._owners
+
+    def parse_files(self, p_files:list, p_jobs:int = 1):
+        """
+        Parse the files with up to p_jobs processes, then merge them in the given file order.
+        A file that fails to parse is reported in the summary and does NOT stop the batch.
+        """
+        for res in parse_in_pool(p_files, parse_monarch_file, p_jobs, (self._lgr.name,)):
+            if self._monitor:
+                self._monitor.check()
+            if not res.ok():
+                self._summary.append([res.filename, UNKNOWN, 0, 0, 0, res.error])
+                self._lgr.error(f"FAILED to parse '{res.filename}': {res.error}")
+                continue
+            record = InvestmentRecord(self._lgr)
+            record.set_filename(res.filename)
+            record.set_data( res.record[PLAN_DATA] )
+            record.set_owner( res.record[OWNER] )
+            self.merge(res.filename, record)
+        self.order_trades()
+
+    def get_failures(self) -> list:
+        return [entry[0] for entry in self._summary if entry[5]]
+
+    def merge(self, p_file:str, p_record:InvestmentRecord):
+        """
+        Add the txs of one input file to the merged record of its owner.
+        A tx is a duplicate only if an EARLIER file had it -- identical txs inside ONE file are kept.
+        """
+        owner = p_record.get_owner()
+        if owner not in self._owners:
+            merged = ParseMonarchInput(self._lgr, self._monitor)
+            merged.get_input_record().set_owner(owner)
+            self._owners[owner] = merged
+            self._seen[owner] = set()
+        merged_rec = self._owners[owner].get_input_record()
+        seen = self._seen[owner]
+
+        file_keys = set()
+        num_trades = num_prices = num_dups = 0
+        data = p_record.get_data()
+        for plan_type in data:
+            for tx_type, make_key in ((TRADE, self.trade_key), (PRICE, self.price_key)):
+                for tx in data[plan_type].get(tx_type, []):
+                    key = make_key(plan_type, tx)
+                    if key in seen:
+                        num_dups += 1
+                        continue
+                    file_keys.add(key)
+                    merged_rec.add_tx(plan_type, tx_type, tx)
+                    if tx_type == TRADE:
+                        num_trades += 1
+                    else:
+                        num_prices += 1
+        seen.update(file_keys)
+
+        self._summary.append([p_file, owner, num_trades, num_prices, num_dups, None])
+        self._lgr.info(f"merged '{osp.basename(p_file)}': owner = {owner}; trades = {num_trades}; "
+                       f"prices = {num_prices}; duplicates = {num_dups}")
+
+    def order_trades(self):
+        """Sort the merged trades of each plan by trade date; txs on the same date keep their file order."""
+        for parser in self._owners.values():
+            record = parser.get_input_record()
+            for plan_type in record.get_data():
+                plan = record.get_plan(plan_type)
+                if TRADE in plan:
+                    plan[TRADE].sort( key = lambda trd: dt.strptime(trd[TRADE_DATE], "%d-%b-%Y") )
+
+    def insert_txs_to_gnucash_file(self, p_gncs:GnucashSession):
+        """Write the merged txs of ALL the owners within ONE Gnucash session."""
+        self._lgr.info(get_current_time())
+        p_gncs.begin_session()
+        try:
+            # check the txs of ALL the owners BEFORE creating any
+            existing = BookFingerprints()
+            planned = {}
+            for owner, parser in self._owners.items():
+                self._lgr.debug(f"Owner = {owner}")
+                parser.gnc_session = p_gncs
+                planned[owner] = parser.prepare_gnucash_info(owner, existing)
+            self._lgr.info(existing.get_report())
+            # the LAST chance to cancel: BEFORE anything is written
+            if self._monitor:
+                self._monitor.check()
+            for owner, parser in self._owners.items():
+                parser.write_gnucash_info(planned[owner])
+        except Exception:
+            # a bad input OR a cancel stops the run BEFORE anything is written: close the session WITHOUT saving,
+            # which does NOT undo a write on a SQL book, where each CommitEdit is stored at once
+            p_gncs.end_session(False)
+            raise
+        p_gncs.end_session(True)
+
+        for parser in self._owners.values():
+            parser.report_unmatched_pairs()
+
+    def get_summary(self) -> list:
+        lines = [f"{len(self._summary)} input file(s) -> {len(self._owners)} owner(s); "
+                 f"{len(self.get_failures())} file(s) FAILED:"]
+        for fname, owner, num_trades, num_prices, num_dups, error in self._summary:
+            if error:
+                lines.append(f"\t{osp.basename(fname)}: FAILED = {error}")
+                continue
+            lines.append(f"\t{osp.basename(fname)}: owner = {owner}; trades = {num_trades}; "
+                         f"prices = {num_prices}; duplicates skipped = {num_dups}")
+        return lines
+# END class MonarchBatch
+
+
 class GoogleUpdate:
     """Keep a record of the transactions in my Google sheet."""
     def __init__(self, infile:str, domain:str, gncfile:str, p_lgr:lg.Logger):
@@ -458,8 +802,11 @@ def set_args():
     arg_parser = ArgumentParser(description="Process Monarch or JSON input data to obtain Gnucash transactions",
                                 prog="python3 parseMonarchCopyRep.py")
     # required arguments
-    required = arg_parser.add_argument_group("REQUIRED")
-    required.add_argument('-i', '--inputfile', required=True, help="path & name of the Monarch or JSON input file")
+    required = arg_parser.add_argument_group("REQUIRED: one of")
+    input_args = required.add_mutually_exclusive_group(required=True)
+    input_args.add_argument('-i', '--inputfile', help="path & name of the Monarch or JSON input file")
+    input_args.add_argument('-d', '--input-dir', dest="inputdir",
+                            help="folder of Monarch and/or JSON input files to merge and process in ONE Gnucash session")
     # required if PROD
     subparsers = arg_parser.add_subparsers(help="with gnc option: MUST specify -g FILENAME and -t TX_TYPE")
     gnc_parser = subparsers.add_parser("gnc", help="Insert the parsed trade and/or price transactions to a Gnucash file")
@@ -469,6 +816,8 @@ def set_args():
     # optional arguments
     arg_parser.add_argument('-l', '--level', type=int, default=lg.INFO, help="set LEVEL of logging output")
     arg_parser.add_argument('--json',  action="store_true", help="Write the parsed Monarch data to a JSON file")
+    arg_parser.add_argument('-p', '--pattern', default='*', help="glob pattern for the files in the input folder")
+    arg_parser.add_argument('-j', '--jobs', type=int, default=1, help="number of processes to parse the input folder")
 
     return arg_parser
 
@@ -476,9 +825,16 @@ def process_input_parameters(argx:list):
     args = set_args().parse_args(argx)
     info = [f"args = {args}"]
 
-    if not osp.isfile(args.inputfile):
-        raise Exception(f"File path '{args.inputfile}' does not exist! Exiting...")
-    info.append(f"Input file = {args.inputfile}")
+    if args.inputdir:
+        in_files = MonarchBatch.collect_files(args.inputdir, args.pattern)
+        if not in_files:
+            raise Exception(f"NO Monarch or JSON files in '{args.inputdir}' match '{args.pattern}'! Exiting...")
+        info.append(f"Input folder = {args.inputdir} ; {len(in_files)} file(s) match '{args.pattern}'")
+    else:
+        if not osp.isfile(args.inputfile):
+            raise Exception(f"File path '{args.inputfile}' does not exist! Exiting...")
+        in_files = [args.inputfile]
+        info.append(f"Input file = {args.inputfile}")
 
     mode = TEST
     domain = None
@@ -494,10 +850,21 @@ def process_input_parameters(argx:list):
     else:
         info.append("mode = TEST")
 
-    return args.inputfile, args.json, args.level, mode, gnc_file, domain, info
+    if args.jobs < 1:
+        raise Exception(f"Number of jobs MUST be at least 1, NOT {args.jobs}! Exiting...")
+
+    return in_files, args.inputdir, args.jobs, args.json, args.level, mode, gnc_file, domain, info
 
-def main_monarch_input(args:list):
-    in_file, save_monarch, level, mode, gnc_file, domain, parse_info = process_input_parameters(args)
+def main_monarch_input(args:list, p_monitor:RunMonitor = None):
+    """
+    :param      args: command line parameters
+    :param p_monitor: to follow the progress of the run and cancel it, e.g. from a UI thread
+    """
+    in_files, in_dir, jobs, save_monarch, level, mode, gnc_file, domain, parse_info = process_input_parameters(args)
+    if in_dir:
+        return main_monarch_batch(in_files, in_dir, jobs, save_monarch, level, mode, gnc_file, domain, parse_info,
+                                  p_monitor)
+    in_file = in_files[0]
 
     log_control = MhsLogger( get_base_filename(__file__), con_level = level, suffix = "gncout" )
     log_control.log_list(items = parse_info, level = DEFAULT_LOG_LEVEL)
@@ -510,7 +877,7 @@ def main_monarch_input(args:list):
     gnc_session = None
     try:
         # parse an external Monarch COPIED report file OR a JSON file with previously saved txs and/or prices
-        parser = ParseMonarchInput(lgr)
+        parser = ParseMonarchInput(lgr, p_monitor)
         parser.parse_file(in_file)
 
         if mode == SEND:
@@ -520,7 +887,7 @@ def main_monarch_input(args:list):
             gnc_session = GnucashSession(mode, gnc_file, domain, lgr)
             parser.insert_txs_to_gnucash_file(gnc_session)
 
-            # keep a record of the update
+            # keep a record of the update: the Gnucash file is written so a cancel is NOT checked any more
             GoogleUpdate(in_file, domain, gnc_file, lgr).send_google_data()
         else:
             basename += "_TEST"
@@ -531,6 +898,57 @@ def main_monarch_input(args:list):
             out_file = save_to_json(basename, parser.get_input_record().to_json(), get_current_time(FILE_DATETIME_FORMAT))
             lgr.info(f"Created Monarch JSON file: {out_file}")
 
+    except RunCancelled as rce:
+        lgr.warning(repr(rce))
+        raise rce
+    except Exception as monex:
+        lgr.exception(monex)
+        raise monex
+    finally:
+        if gnc_session:
+            gnc_session.check_end_session(locals())
+
+    lgr.info(">>> PROGRAM ENDED.")
+    return msg
+
+
+def main_monarch_batch(in_files:list, in_dir:str, jobs:int, save_monarch:bool, level:int, mode:str, gnc_file:str,
+                       domain:str, parse_info:list, p_monitor:RunMonitor = None):
+    """Parse ALL the input files, merge them per owner and write to Gnucash with ONE session open and save."""
+    log_control = MhsLogger( get_base_filename(__file__), con_level = level, suffix = "gncout" )
+    log_control.log_list(items = parse_info, level = DEFAULT_LOG_LEVEL)
+    lgr = log_control.get_logger()
+
+    basename = osp.basename( osp.normpath(in_dir) )
+
+    gnc_session = None
+    try:
+        batch = MonarchBatch(lgr, p_monitor)
+        batch.parse_files(in_files, jobs)
+
+        if mode == SEND:
+            basename += '_' + get_base_filename(gnc_file)
+
+            gnc_session = GnucashSession(mode, gnc_file, domain, lgr)
+            batch.insert_txs_to_gnucash_file(gnc_session)
+
+            # the Gnucash file is written so a cancel is NOT checked any more
+            GoogleUpdate(in_dir, domain, gnc_file, lgr).send_google_data()
+        else:
+            basename += "_TEST"
+
+        log_control.log_list(items = batch.get_summary(), level = DEFAULT_LOG_LEVEL)
+        msg = log_control.get_saved_info()
+
+        if save_monarch:
+            for owner, parser in batch.get_parsers().items():
+                out_file = save_to_json(f"{basename}_{owner.split()[0]}", parser.get_input_record().to_json(),
+                                        get_current_time(FILE_DATETIME_FORMAT))
+                lgr.info(f"Created merged Monarch JSON file: {out_file}")
+
+    except RunCancelled as rce:
+        lgr.warning(repr(rce))
+        raise rce
     except Exception as monex:
         lgr.exception(monex)
         raise monex
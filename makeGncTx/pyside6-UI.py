@@ -14,7 +14,7 @@ __updated__ = "2025-07-24"
 
 from PySide6.QtWidgets import (QApplication, QComboBox, QVBoxLayout, QGroupBox, QDialog, QFileDialog, QLabel, QTextEdit,
                                QPushButton, QFormLayout, QDialogButtonBox, QCheckBox, QInputDialog, QMessageBox)
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
 from functools import partial
 from parseMonarchCopyRep import *
 
@@ -25,6 +25,37 @@ INPUT:str        = "Input"
 SCRIPT_LABEL:str = MON + ' ' + INPUT
 
 
+class RunSignals(QObject):
+    """Signals of a MonarchRun, delivered to the GUI thread: run id, then progress counts or the reply text."""
+    progress = Signal(int, dict)
+    finished = Signal(int, str)
+
+
+class MonarchRun(QRunnable):
+    """ONE call of main_monarch_input on a worker thread so that the window stays responsive."""
+    def __init__(self, p_id:int, p_params:list):
+        super().__init__()
+        # the dialog keeps the run to be able to cancel it
+        self.setAutoDelete(False)
+        self.run_id = p_id
+        self.params = p_params
+        self.signals = RunSignals()
+        self.monitor = RunMonitor( partial(self.signals.progress.emit, p_id) )
+
+    def run(self):
+        try:
+            # may have been cancelled while waiting in the queue
+            self.monitor.check()
+            response = main_monarch_input(self.params, self.monitor)
+            reply = json.dumps({"response": response}, indent=4)
+        except RunCancelled as rce:
+            reply = f"\nCANCELLED: {rce}\n"
+        except Exception as mre:
+            reply = f"\nEXCEPTION:\n{repr(mre)}\n"
+        self.signals.finished.emit(self.run_id, reply)
+# END class MonarchRun
+
+
 # noinspection PyAttributeOutsideInit
 class MonarchGnucashUI(QDialog):
     """Use a PySide6 UI to conveniently specify parameters and run the parseMonarchCopyRep program."""
@@ -38,6 +69,11 @@ class MonarchGnucashUI(QDialog):
         self.mon_file = None
         self.gnc_file = None
         self._lgr = log_control.get_logger()
+        # ONE run at a time as the runs may write to the same Gnucash file: the others wait in the queue
+        self.run_pool = QThreadPool()
+        self.run_pool.setMaxThreadCount(1)
+        self.runs = {}
+        self.run_count = 0
 
         self.init_ui()
         self._lgr.info(f"start {self.title}: Runtime = {dt.now().strftime(RUN_DATETIME_FORMAT)}\n")
@@ -58,6 +94,9 @@ class MonarchGnucashUI(QDialog):
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
+        self.cancel_btn = button_box.addButton("Cancel runs", QDialogButtonBox.ButtonRole.ActionRole)
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_runs)
 
         qvb_layout = QVBoxLayout()
         qvb_layout.addWidget(self.gb_main)
@@ -174,15 +213,39 @@ class MonarchGnucashUI(QDialog):
             cl_params.append('-g' + self.gnc_file)
             cl_params.append('-t' + mode)
 
-        self._lgr.info(f"\n\t\tParameters = '{json.dumps(cl_params, indent=4)}'\n\t\t>> Calling main_monarch_input")
-        try:
-            response = main_monarch_input(cl_params)
-            reply = {"response": response}
-        except Exception as bcce:
-            self.response_box.append(f"\nEXCEPTION:\n{repr(bcce)}\n")
-            raise bcce
-
-        self.response_box.append( json.dumps(reply, indent=4) )
+        self.run_count += 1
+        run = MonarchRun(self.run_count, cl_params)
+        run.signals.progress.connect(self.show_progress)
+        run.signals.finished.connect(self.run_finished)
+        self.runs[run.run_id] = run
+        self.cancel_btn.setEnabled(True)
+
+        self._lgr.info(f"\n\t\tParameters = '{json.dumps(cl_params, indent=4)}'"
+                       f"\n\t\t>> Queue run #{run.run_id} of main_monarch_input")
+        self.response_box.append(f"\nRun #{run.run_id} QUEUED: {osp.basename(self.mon_file)} ; mode = {mode}")
+        self.run_pool.start(run)
+
+    def show_progress(self, p_id:int, p_counts:dict):
+        self.response_box.append(f"Run #{p_id}: " + " ; ".join(f"{name} = {num}" for name, num in p_counts.items()))
+
+    def run_finished(self, p_id:int, p_reply:str):
+        self.runs.pop(p_id, None)
+        self.cancel_btn.setEnabled( bool(self.runs) )
+        self._lgr.info(f"run #{p_id} finished.")
+        self.response_box.append(f"\nRun #{p_id} FINISHED:")
+        self.response_box.append(p_reply)
+
+    def cancel_runs(self):
+        """Cancel ALL the queued runs and the current run, unless it has started to write to the Gnucash file."""
+        self._lgr.info(f"Cancel {len(self.runs)} run(s).")
+        for run in self.runs.values():
+            run.monitor.cancel()
+
+    def reject(self):
+        """on Close: cancel the runs and wait for the current one to end cleanly"""
+        self.cancel_runs()
+        self.run_pool.waitForDone()
+        super().reject()
 # END class MonarchGnucashUI
 
 
@@ -12,8 +12,8 @@ __python_version__ = 3.6
 __created__ = '2018'
 __updated__ = '2019-07-27'
 
+import sys
 import json
-import inspect
 import os.path as osp
 from datetime import datetime as dt
 
@@ -25,6 +25,10 @@ strnow = dtnow.strftime(DATE_STR_FORMAT)
 TEST: str = 'test'
 PROD: str = 'PROD'
 
+# environment variable to select the Gnucash bindings in gncBindings.py: set to MOCK_BINDINGS for mockGnucash.py
+GNC_BINDINGS_ENV: str = "GNC_BINDINGS"
+MOCK_BINDINGS: str    = "mock"
+
 GNC: str       = 'Gnucash'
 MON: str       = 'Monarch'
 TXS: str       = "TRANSACTIONS"
@@ -46,6 +50,14 @@ MON_LULU: str = "Louise " + MON_ROBB
 GNC_MARK: str = "Mark"
 GNC_LULU: str = "Lulu"
 
+# credit cards: the card account in Gnucash and the account for the other side of each card tx
+CARD: str      = "Card"
+EXPENSE: str   = "Expense"
+CIBC_VISA: str = "CIBC Visa"
+PC_MC: str     = "PC Mastercard"
+SCOTIA_VISA: str = "Scotia Visa"
+CARD_ACCTS = [CIBC_VISA, PC_MC, SCOTIA_VISA]
+
 # Plan types
 PLAN_DATA: str = "Plan Data"
 PL_OPEN: str   = "OPEN"
@@ -96,9 +108,35 @@ CYAN:str    = COLOR_FLAG + '36m'
 WHITE:str   = COLOR_FLAG + '37m'
 
 
+# Gnulog levels -- same values as the standard logging module
+LOG_DEBUG: int = 10
+LOG_INFO: int  = 20
+LOG_ERROR: int = 40
+LOG_OFF: int   = 100
+
+
+class LogMsg:
+    """
+    Lazy log message: the format string is only filled in if the message is actually printed
+    e.g. logger.print_debug(LogMsg("gross = {}", gross))
+    the LogMsg itself and its arguments are still made on each call:
+    in a loop over the txs use  if logger.is_enabled(LOG_DEBUG): logger.print_debug(...)  instead
+    """
+    __slots__ = ('fmt', 'args')
+
+    def __init__(self, fmt, *args):
+        self.fmt = fmt
+        self.args = args
+
+    def __str__(self):
+        return self.fmt.format(*self.args)
+
+
 class Gnulog:
-    def __init__(self, p_debug):
+    def __init__(self, p_debug, p_level=None):
         self.debug = p_debug
+        # messages below this level are dropped before any formatting or inspection
+        self.level = p_level if p_level is not None else (LOG_DEBUG if p_debug else LOG_OFF)
         self.log_text = []
 
     def append(self, obj):
@@ -110,25 +148,38 @@ class Gnulog:
     def get_log(self):
         return self.log_text
 
+    def set_level(self, p_level):
+        self.level = p_level
+
+    def is_enabled(self, p_level):
+        return p_level >= self.level
+
+    def print_debug(self, info, color='', inspector=True, newline=True):
+        """
+        Print detailed information with choices of color, inspection info, newline
+        """
+        if LOG_DEBUG >= self.level:
+            self.append( self.print_text(info, color, inspector, newline, p_depth=2) )
+
     def print_info(self, info, color='', inspector=True, newline=True):
         """
         Print information with choices of color, inspection info, newline
         """
-        if self.debug:
-            text = self.print_text(info, color, inspector, newline)
-            self.append(text)
+        if LOG_INFO >= self.level:
+            self.append( self.print_text(info, color, inspector, newline, p_depth=2) )
 
     def print_error(self, text, newline=True):
         """
         Print Error information in RED with inspection info
         """
-        if self.debug:
-            self.print_text(text, RED, True, newline)
+        if LOG_ERROR >= self.level:
+            self.print_text(text, RED, True, newline, p_depth=2)
 
     @staticmethod
-    def print_text(info, color='', inspector=True, newline=True):
+    def print_text(info, color='', inspector=True, newline=True, p_depth=1):
         """
         Print information with choices of color, inspection info, newline
+        :param p_depth: number of frames between print_text and the code to report as the caller
         """
         inspect_line = ''
         if info is None:
@@ -136,13 +187,33 @@ class Gnulog:
             inspector = False
         text = str(info)
         if inspector:
-            calling_frame = inspect.currentframe().f_back
-            calling_file  = inspect.getfile(calling_frame).split('/')[-1]
-            calling_line  = str(inspect.getlineno(calling_frame))
-            inspect_line  = '[' + calling_file + '@' + calling_line + ']: '
+            calling_frame = sys._getframe(p_depth)
+            calling_file  = calling_frame.f_code.co_filename.split('/')[-1]
+            inspect_line  = '[' + calling_file + '@' + str(calling_frame.f_lineno) + ']: '
         print(inspect_line + color + text + COLOR_OFF, end=('\n' if newline else ''))
         return text
 
+# END class Gnulog
+
+
+# default Gnulog for the modules without a logger of their own
+GNULOG = Gnulog(True)
+
+
+def print_debug(info, color='', inspector=True, newline=True):
+    if LOG_DEBUG >= GNULOG.level:
+        GNULOG.append( GNULOG.print_text(info, color, inspector, newline, p_depth=2) )
+
+
+def print_info(info, color='', inspector=True, newline=True):
+    if LOG_INFO >= GNULOG.level:
+        GNULOG.append( GNULOG.print_text(info, color, inspector, newline, p_depth=2) )
+
+
+def print_error(text, newline=True):
+    if LOG_ERROR >= GNULOG.level:
+        GNULOG.print_text(text, RED, True, newline, p_depth=2)
+
 
 class GncUtilities:
     @staticmethod
@@ -210,23 +281,383 @@ class GncUtilities:
 # END class GncUtilities
 
 
-# TODO: TxRecord in standard format for both Monarch and Gnucash
+class AccountIndex:
+    """
+    Session-scoped index of a Gnucash account tree, built ONCE by walking down from the root account:
+      (parent GUID, name) -> Account: same as parent.lookup_by_name(name), i.e. ANY descendant of the parent,
+                             with the accounts closest to the parent found first
+    The tree does not change during a session, so each lookup is a dict hit instead of a walk through the C API.
+    Call invalidate() if accounts are added, removed, renamed or moved while the index is in use.
+    """
+    def __init__(self, p_root):
+        self.root = p_root
+        self._by_parent = None
+
+    @staticmethod
+    def guid_of(acct):
+        return acct.GetGUID().to_string()
+
+    def invalidate(self):
+        self._by_parent = None
+
+    def build(self):
+        by_parent = {}
+        # breadth-first so that lookups find the same account as lookup_by_name: immediate children first
+        level = [ (self.root, []) ]
+        while level:
+            next_level = []
+            for acct, ancestors in level:
+                guids = ancestors + [self.guid_of(acct)]
+                for child in acct.get_children():
+                    name = child.GetName()
+                    for guid in guids:
+                        by_parent.setdefault((guid, name), child)
+                    next_level.append( (child, guids) )
+            level = next_level
+        self._by_parent = by_parent
+
+    def from_path(self, account_path):
+        """
+        get a Gnucash account from the given path, as GncUtilities.account_from_path():
+        each name is looked up among ALL the descendants of the account found for the name before it
+        :param account_path: list or tuple of account names, starting under the root
+        :return: Gnucash account
+        """
+        account = self.root
+        for name in account_path:
+            account = self.lookup(account, name)
+            if account is None:
+                raise Exception("path " + str(account_path) + " could NOT be found")
+        return account
+
+    def lookup(self, parent, name:str):
+        """
+        get the descendant of parent with the given name
+        :param parent: Gnucash account
+        :param   name: String: account name
+        :return: Gnucash account or None
+        """
+        if self._by_parent is None:
+            self.build()
+        return self._by_parent.get( (self.guid_of(parent), name) )
+
+# END class AccountIndex
+
+
+def scale_gnc_numeric(p_num, p_scale:int) -> int:
+    """Gnucash numeric as an integer number of 1/p_scale, e.g. cents for 100 or units for 10000"""
+    num, denom = p_num.num(), p_num.denom()
+    if denom == p_scale:
+        return num
+    return int(round(num * p_scale / denom))
+
+
+class BookFingerprints:
+    """
+    Fingerprints of the splits and prices ALREADY in a Gnucash book, built ONCE at the start of a session:
+      split = (account GUID, date, value in cents, amount in 1/10000 units) -> count
+      price = (commodity namespace, commodity mnemonic, date) -> count
+    An incoming Monarch trade or price that matches a fingerprint is already in the book, so it is skipped
+    with a dict lookup instead of a search of the book. Each match USES UP one count, so a report with two
+    identical trades on the same day still adds the second one if the book only has the first.
+    """
+    def __init__(self):
+        self._splits = {}
+        self._prices = {}
+        self._indexed = set()
+        self.skipped_trades = 0
+        self.skipped_prices = 0
+
+    @staticmethod
+    def split_key(acct, tx_date, gross:int, units:int) -> tuple:
+        return AccountIndex.guid_of(acct), to_date(tx_date), gross, units
+
+    @staticmethod
+    def price_key(comm, pr_date) -> tuple:
+        return comm.get_namespace(), comm.get_mnemonic(), to_date(pr_date)
+
+    def add_parent(self, parent, price_db=None, currency=None):
+        """Index the splits, and the prices if a PriceDB is given, of ALL the accounts under parent -- once per parent."""
+        guid = AccountIndex.guid_of(parent)
+        if guid in self._indexed:
+            return
+        self._indexed.add(guid)
+        commodities = {}
+        for acct in parent.get_descendants():
+            acct_guid = AccountIndex.guid_of(acct)
+            for split in acct.GetSplitList():
+                key = ( acct_guid, to_date(split.GetParent().GetDate()),
+                        scale_gnc_numeric(split.GetValue(), 100), scale_gnc_numeric(split.GetAmount(), 10000) )
+                self._splits[key] = self._splits.get(key, 0) + 1
+            comm = acct.GetCommodity()
+            commodities[(comm.get_namespace(), comm.get_mnemonic())] = comm
+        if price_db is None:
+            return
+        for comm in commodities.values():
+            for price in price_db.get_prices(comm, currency):
+                key = self.price_key(comm, price.get_time64())
+                self._prices[key] = self._prices.get(key, 0) + 1
+
+    @staticmethod
+    def _use(p_index:dict, key) -> bool:
+        count = p_index.get(key, 0)
+        if count == 0:
+            return False
+        p_index[key] = count - 1
+        return True
+
+    def has_trade(self, *split_keys) -> bool:
+        """
+        True if ALL the given asset splits of a trade are already in the book, e.g. both legs of a Switch.
+        Counts are only used up when the whole trade matches.
+        """
+        if any(self._splits.get(key, 0) == 0 for key in split_keys):
+            return False
+        for key in split_keys:
+            self._use(self._splits, key)
+        self.skipped_trades += 1
+        return True
+
+    def has_price(self, key) -> bool:
+        if self._use(self._prices, key):
+            self.skipped_prices += 1
+            return True
+        return False
+
+    def get_report(self) -> str:
+        return "SKIPPED {} trade(s) and {} price(s) ALREADY in the book.".format(self.skipped_trades, self.skipped_prices)
+
+# END class BookFingerprints
+
+
+# date formats found in Monarch reports, and the format used in the saved json files
+MONARCH_DATE_FORMATS = ("%d-%b-%Y", "%m/%d/%Y")
+JSON_DATE_FORMAT = "%Y-%m-%d"
+
+
+def to_scaled_int(value, p_places:int) -> int:
+    """
+    Convert a Monarch currency or unit string to an integer number of 1/10^p_places,
+    e.g. "$1,234.56" -> 123456 or "-67.2970" -> -672970 ; NEGATIVE if there is a leading minus sign OR parentheses
+    :param    value: str OR int, which is already converted and returned as is
+    :param p_places: number of decimal places in the result
+    :return: int
+    """
+    if isinstance(value, int):
+        return value
+    text = value.strip()
+    negative = text[:1] in ('-', '(')
+    whole, _, frac = text.strip("-()$").replace('$', '').replace(',', '').partition('.')
+    # ONLY ascii digits: str.isdigit() also takes e.g. '٣', which the NumPy path of amountColumns rejects
+    if not ((whole.isascii() and whole.isdigit()) or (whole == '' and frac)) \
+            or (frac and not (frac.isascii() and frac.isdigit())) or len(frac) > p_places:
+        raise ValueError("PROBLEM!! '{}' is NOT a proper amount with {} decimal places!".format(value, p_places))
+    result = int(whole or '0') * pow(10, p_places) + int(frac.ljust(p_places, '0') or '0')
+    return -result if negative else result
+
+
+def to_cents(value) -> int:
+    return to_scaled_int(value, 2)
+
+
+def to_units(value) -> int:
+    """units, unit balances and prices are stored as integer 1/10000 ths"""
+    return to_scaled_int(value, 4)
+
+
+def to_date(value):
+    """:return datetime.date from a date or datetime OR a string in one of the Monarch formats or the json format"""
+    if isinstance(value, dt):
+        return value.date()
+    if not isinstance(value, str):
+        return value
+    for fmt in (JSON_DATE_FORMAT,) + MONARCH_DATE_FORMATS:
+        try:
+            return dt.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError("PROBLEM!! '{}' is NOT a proper date!".format(value))
+
+
 class TxRecord:
     """
-    All the required information for an individual transaction
+    All the required information for an individual Trade transaction, with the Monarch strings parsed ONCE:
+      date: datetime.date ; gross, net: int cents ; units, price, unit_bal: int 1/10000 ths
     """
-    def __init__(self, tx_dte, tx_cmpy, tx_code, tx_name, tx_gross, tx_price, tx_units):
-        self.date = tx_dte
+    __slots__ = ('date', 'fund', 'company', 'desc', 'gross', 'net', 'units', 'price', 'unit_bal', 'load', 'notes')
+
+    def __init__(self, tx_dte, tx_fund:str, tx_cmpy:str, tx_desc:str, tx_gross, tx_units, tx_price=None,
+                 tx_net=None, tx_bal=None, tx_load:str=None, tx_notes:str=None):
+        self.date = to_date(tx_dte)
+        self.fund = tx_fund
         self.company = tx_cmpy
-        self.fd_name = tx_name
-        self.fd_code = tx_code
-        self.gross = tx_gross
-        self.price = tx_price
-        self.units = tx_units
+        self.desc = tx_desc
+        self.gross = to_cents(tx_gross)
+        self.net = self.gross if tx_net is None else to_cents(tx_net)
+        self.units = to_units(tx_units)
+        self.price = None if tx_price is None else to_units(tx_price)
+        self.unit_bal = None if tx_bal is None else to_units(tx_bal)
+        self.load = tx_load
+        self.notes = tx_notes
+
+    @classmethod
+    def from_dict(cls, p_dict:dict):
+        """
+        From a Monarch tx dict with string values OR a dict saved by to_dict()
+        the fund is either in FUND or split into FUND_CMPY and FUND_CODE
+        """
+        fund = p_dict[FUND] if FUND in p_dict else p_dict[FUND_CMPY] + " " + p_dict[FUND_CODE]
+        return cls(p_dict[TRADE_DATE], fund, p_dict.get(FUND_CMPY, fund.split()[0]), p_dict.get(DESC, ''),
+                   p_dict[GROSS], p_dict[UNITS], p_dict.get(PRICE), p_dict.get(NET), p_dict.get(UNIT_BAL),
+                   p_dict.get(LOAD), p_dict.get(NOTES))
+
+    def to_dict(self) -> dict:
+        result = { TRADE_DATE:self.date.strftime(JSON_DATE_FORMAT), FUND:self.fund, FUND_CMPY:self.company,
+                   DESC:self.desc, GROSS:self.gross, NET:self.net, UNITS:self.units }
+        for key, value in ( (PRICE, self.price), (UNIT_BAL, self.unit_bal), (LOAD, self.load), (NOTES, self.notes) ):
+            if value is not None:
+                result[key] = value
+        return result
+
+    def __eq__(self, other):
+        return isinstance(other, TxRecord) and all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self):
+        return "TxRecord({})".format(self.to_dict())
 
 # END class TxRecord
 
 
+class PriceRecord:
+    """
+    The price, and possibly the unit balance, of a fund on a date:
+      date: datetime.date ; price, unit_bal: int 1/10000 ths
+    """
+    __slots__ = ('date', 'fund', 'company', 'price', 'unit_bal')
+
+    def __init__(self, pr_dte, pr_fund:str, pr_cmpy:str, pr_price, pr_bal=None):
+        self.date = to_date(pr_dte)
+        self.fund = pr_fund
+        self.company = pr_cmpy
+        self.price = to_units(pr_price)
+        self.unit_bal = None if pr_bal is None else to_units(pr_bal)
+
+    @classmethod
+    def from_dict(cls, p_dict:dict):
+        """From a Monarch price dict with string values OR a dict saved by to_dict()"""
+        fund = p_dict[FUND] if FUND in p_dict else p_dict[FUND_CMPY] + " " + p_dict[FUND_CODE]
+        pr_date = p_dict[DATE] if DATE in p_dict else p_dict[TRADE_DATE]
+        return cls(pr_date, fund, p_dict.get(FUND_CMPY, fund.split()[0]), p_dict[PRICE], p_dict.get(UNIT_BAL))
+
+    def to_dict(self) -> dict:
+        result = { DATE:self.date.strftime(JSON_DATE_FORMAT), FUND:self.fund, FUND_CMPY:self.company, PRICE:self.price }
+        if self.unit_bal is not None:
+            result[UNIT_BAL] = self.unit_bal
+        return result
+
+    def __eq__(self, other):
+        return isinstance(other, PriceRecord) and all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self):
+        return "PriceRecord({})".format(self.to_dict())
+
+# END class PriceRecord
+
+
+class CardTxRecord:
+    """
+    One transaction from a credit card statement, with the strings parsed ONCE:
+      date: datetime.date ; card: name of the card account in Gnucash
+      amount: int cents, POSITIVE for a charge to the card and NEGATIVE for a payment or refund
+      ref: reference from the statement, e.g. the card number, or None
+    """
+    __slots__ = ('date', 'card', 'desc', 'amount', 'ref')
+
+    def __init__(self, tx_dte, tx_card:str, tx_desc:str, tx_amount, tx_ref:str=None):
+        self.date = to_date(tx_dte)
+        self.card = tx_card
+        self.desc = tx_desc
+        self.amount = to_cents(tx_amount)
+        self.ref = tx_ref
+
+    @classmethod
+    def from_dict(cls, p_dict:dict):
+        return cls(p_dict[DATE], p_dict[CARD], p_dict.get(DESC, ''), p_dict[GROSS], p_dict.get(NOTES))
+
+    def to_dict(self) -> dict:
+        result = { DATE:self.date.strftime(JSON_DATE_FORMAT), CARD:self.card, DESC:self.desc, GROSS:self.amount }
+        if self.ref is not None:
+            result[NOTES] = self.ref
+        return result
+
+    def __eq__(self, other):
+        return isinstance(other, CardTxRecord) and all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self):
+        return "CardTxRecord({})".format(self.to_dict())
+
+# END class CardTxRecord
+
+
+class CardRecord:
+    """
+    All transactions from credit card statements, by card account: the InvestmentRecord of the card imports
+    """
+    def __init__(self, p_fname=None):
+        self.date = dtnow
+        self.filename: str = p_fname
+        # card account -> list of CardTxRecords
+        self.cards = {}
+
+    def get_cards(self) -> dict:
+        return self.cards
+
+    def get_date_str(self):
+        return self.date.strftime(DATE_STR_FORMAT)
+
+    def set_filename(self, fn):
+        self.filename = str(fn)
+
+    def get_filename(self):
+        return UNKNOWN if self.filename is None or self.filename == '' else self.filename
+
+    def get_size(self, p_card:str = None) -> int:
+        if p_card is None:
+            return sum( len(txs) for txs in self.cards.values() )
+        return len(self.cards.get(p_card, []))
+
+    def get_size_str(self) -> str:
+        return "{} = {}".format( self.get_size(), " + ".join("{}:{}".format(card, len(txs)) for card, txs in self.cards.items()) )
+
+    def add_tx(self, p_ctx:CardTxRecord):
+        if p_ctx is not None:
+            self.cards.setdefault(p_ctx.card, []).append(p_ctx)
+
+    def to_json(self):
+        return {
+            "__class__"   : self.__class__.__name__ ,
+            "__module__"  : self.__module__         ,
+            "Source File" : self.get_filename()     ,
+            "Date"        : self.get_date_str()     ,
+            "Size"        : self.get_size_str()     ,
+            CARD          : { card: [ctx.to_dict() for ctx in txs] for card, txs in self.cards.items() }
+        }
+
+    @classmethod
+    def from_json(cls, p_json:dict):
+        """Rebuild a CardRecord saved with to_json()"""
+        fname = p_json.get("Source File")
+        crec = cls(None if fname == UNKNOWN else fname)
+        if "Date" in p_json:
+            crec.date = dt.strptime(p_json["Date"], DATE_STR_FORMAT)
+        for txs in p_json[CARD].values():
+            for ctx in txs:
+                crec.add_tx( CardTxRecord.from_dict(ctx) )
+        return crec
+
+# END class CardRecord
+
+
 # TODO: data date and run date
 class InvestmentRecord:
     """
@@ -242,7 +673,7 @@ class InvestmentRecord:
             assert (isinstance(p_fname, str) and osp.isfile(p_fname)), 'MUST be a valid filename!'
         self.filename: str = p_fname
         self.plans = {
-            # lists of TxRecords
+            # lists of TxRecords and PriceRecords
             PL_OPEN : { TRADE:[], PRICE:[] } ,
             PL_TFSA : { TRADE:[], PRICE:[] } ,
             PL_RRSP : { TRADE:[], PRICE:[] }
@@ -308,9 +739,31 @@ class InvestmentRecord:
             "Source File"  : self.get_filename()     ,
             "Date"         : self.get_date_str()     ,
             "Size"         : self.get_size_str()     ,
-            PLAN_DATA      : self.plans
+            PLAN_DATA      : { plan: { tx_type: [tx.to_dict() if hasattr(tx, "to_dict") else tx for tx in txs]
+                                       for tx_type, txs in self.plans[plan].items() } for plan in self.plans }
         }
 
+    @classmethod
+    def from_json(cls, p_json:dict):
+        """
+        Rebuild an InvestmentRecord saved with to_json()
+        :param p_json: dict from json.load()
+        :return: InvestmentRecord with TxRecord trades and PriceRecord prices
+        """
+        owner = p_json.get(OWNER)
+        irec = cls(None if owner in (None, '', UNKNOWN) else owner)
+        if "Date" in p_json:
+            irec.set_date( dt.strptime(p_json["Date"], DATE_STR_FORMAT) )
+        # the source file may not exist on this machine
+        fname = p_json.get("Source File")
+        irec.filename = None if fname == UNKNOWN else fname
+        for plan, txs in p_json[PLAN_DATA].items():
+            for tx in txs.get(TRADE, []):
+                irec.add_tx(plan, TRADE, TxRecord.from_dict(tx))
+            for tx in txs.get(PRICE, []):
+                irec.add_tx(plan, PRICE, PriceRecord.from_dict(tx))
+        return irec
+
 # END class InvestmentRecord
 
 
@@ -427,7 +880,9 @@ ACCT_PATHS = {
     ASSET    : ["FAMILY", "INVEST"] ,  # + planType [+ Owner]
     MON_MARK : GNC_MARK ,
     MON_LULU : GNC_LULU ,
-    TRUST    : [TRUST, "Trust Assets", "Monarch ITF", COMPANY_NAME[CIG]]
+    TRUST    : [TRUST, "Trust Assets", "Monarch ITF", COMPANY_NAME[CIG]] ,
+    CARD     : ["LIAB", "Credit Cards"] ,  # + card account
+    EXPENSE  : ["EXP", "Unsorted"]         # the other side of EVERY card tx, to sort out in Gnucash
 }
 
 # parsing states
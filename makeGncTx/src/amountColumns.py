@@ -0,0 +1,135 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# amountColumns.py -- convert WHOLE columns of Monarch currency and unit strings, e.g. the Gross of every trade in a plan,
+#                     to integer cents or 1/10000 units in ONE pass: with NumPy if it is installed, else row by row
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+from array import array
+from Configuration import to_scaled_int
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAVE_NUMPY = np is not None
+
+
+class ScaledColumn:
+    """
+    A converted column: values[i] is the integer value of row i, or 0 if row i is in bad
+      values: numpy int64 array OR array('q') ; bad: indices of the rows that are NOT proper amounts
+    """
+    __slots__ = ('values', 'bad', 'places', '_bad_rows')
+
+    def __init__(self, p_values, p_bad:list, p_places:int):
+        self.values = p_values
+        self.bad = p_bad
+        self.places = p_places
+        self._bad_rows = frozenset(p_bad)
+
+    def __len__(self):
+        return len(self.values)
+
+    def ok(self, p_row:int) -> bool:
+        return p_row not in self._bad_rows
+
+    def get(self, p_row:int):
+        """:return: the int value of the row, or None if it is a bad row"""
+        return None if p_row in self._bad_rows else int(self.values[p_row])
+
+    def to_list(self) -> list:
+        """:return: the int value of EACH row, with None for the bad rows"""
+        result = self.values.tolist()
+        for row in self.bad:
+            result[row] = None
+        return result
+
+    def __repr__(self):
+        return "ScaledColumn({} rows @ 1e-{}, bad rows = {})".format(len(self.values), self.places, self.bad)
+
+# END class ScaledColumn
+
+
+def _scale_numpy(p_strings:list, p_places:int) -> ScaledColumn:
+    """
+    same rules as Configuration.to_scaled_int, applied to the whole column at once:
+      the stripped strings are viewed as a (rows x chars) matrix of code points and each digit is weighted
+      by its power of 10, so no str -> int conversion is needed
+    """
+    text = np.char.strip( np.array(p_strings, dtype=str) )
+    negative = np.char.startswith(text, '-') | np.char.startswith(text, '(')
+    cleaned = np.ascontiguousarray( np.char.strip(text, "-()$") )
+    width = max(1, cleaned.dtype.itemsize // 4)
+    codes = cleaned.astype(f"<U{width}").view(np.uint32).reshape(len(p_strings), width)
+
+    is_digit = (codes >= ord('0')) & (codes <= ord('9'))
+    is_dot = codes == ord('.')
+    # '$' and ',' inside the number are ignored ; 0 is the padding at the end of the shorter strings
+    ignored = (codes == ord('$')) | (codes == ord(',')) | (codes == 0)
+    after_dot = np.cumsum(is_dot, axis=1) > 0
+    whole = is_digit & ~after_dot
+    frac = is_digit & after_dot
+    num_whole = whole.sum(axis=1)
+    num_frac = frac.sum(axis=1)
+    # 18 digits always fit in an int64
+    valid = (is_digit | is_dot | ignored).all(axis=1) & (is_dot.sum(axis=1) <= 1) & (num_frac <= p_places) \
+            & ((num_whole + num_frac) > 0) & ((num_whole + p_places) <= 18)
+
+    # power of 10 of each digit: places + (whole digits to its right) OR places - (position after the dot)
+    whole_right = num_whole[:, None] - np.cumsum(whole, axis=1)
+    exponent = np.where(whole, p_places + whole_right, p_places - np.cumsum(frac, axis=1))
+    exponent = np.where(is_digit & valid[:, None], exponent, 0).clip(0, 18)
+    digits = np.where(is_digit & valid[:, None], codes.astype(np.int64) - ord('0'), 0)
+    values = (digits * (np.int64(10) ** exponent)).sum(axis=1)
+    values = np.where(negative, -values, values)
+    return ScaledColumn( values, np.flatnonzero(~valid).tolist(), p_places )
+
+
+def _scale_rows(p_strings:list, p_places:int) -> ScaledColumn:
+    values = array('q', bytes(8 * len(p_strings)))
+    bad = []
+    for row, value in enumerate(p_strings):
+        try:
+            values[row] = to_scaled_int(value, p_places)
+        except (ValueError, AttributeError, OverflowError):
+            bad.append(row)
+    return ScaledColumn(values, bad, p_places)
+
+
+def scale_column(p_strings:list, p_places:int) -> ScaledColumn:
+    """
+    Convert a column of amount strings such as "$1,234.56", "(12.34)" or "-12.3456" to integer 1/10^p_places
+    :param p_strings: list of str
+    :param  p_places: number of decimal places in the result: 2 for cents, 4 for units and prices
+    :return: ScaledColumn
+    """
+    if HAVE_NUMPY and p_strings and all(isinstance(value, str) for value in p_strings):
+        return _scale_numpy(p_strings, p_places)
+    return _scale_rows(p_strings, p_places)
+
+
+def cents_column(p_strings:list) -> ScaledColumn:
+    return scale_column(p_strings, 2)
+
+
+def units_column(p_strings:list) -> ScaledColumn:
+    return scale_column(p_strings, 4)
+
+
+def scale_columns(p_rows:list, p_places:dict) -> dict:
+    """
+    Convert several columns of a batch of rows at once
+    :param    p_rows: list of dict, e.g. Monarch trades
+    :param  p_places: column key -> decimal places, e.g. { GROSS: 2, NET: 2, UNITS: 4 }
+    :return: column key -> ScaledColumn
+    """
+    return { key: scale_column([row[key] for row in p_rows], places) for key, places in p_places.items() }
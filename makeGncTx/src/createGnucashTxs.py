@@ -15,9 +15,9 @@ __updated__ = '2019-06-02'
 import copy
 import json
 import re
-from gnucash import Session, Transaction, Split, GncNumeric, GncPrice
-from gnucash.gnucash_core_c import CREC
+from gncBindings import Session, Transaction, Split, GncNumeric, GncPrice, CREC
 from Configuration import *
+from tradePairs import PendingPairs
 
 
 # noinspection PyUnresolvedReferences,PyUnboundLocalVariable
@@ -26,7 +26,7 @@ class GncTxCreator:
     create Gnucash transactions and prices from Monarch json
     """
     def __init__(self, tx_colxn, gnc_f, md, pdb=None, bk=None, rt=None, cur=None, rpinfo=None):
-        print_info("createGnucashTxs:GncTxCreator()\nRuntime = {}\n".format(strnow), MAGENTA)
+        print_info(LogMsg("createGnucashTxs:GncTxCreator()\nRuntime = {}\n", strnow), MAGENTA)
         self.tx_coll  = tx_colxn
         self.gnc_file = gnc_f
         self.mode     = md
@@ -35,6 +35,8 @@ class GncTxCreator:
         self.root     = rt
         self.curr     = cur
         self.report_info = rpinfo
+        # first legs of the Switch pairs still waiting for their match
+        self.pending_pairs = PendingPairs()
 
     gncu = GncUtilities()
 
@@ -63,26 +65,31 @@ class GncTxCreator:
 
         init_tx = {FUND_CMPY: mtx[FUND_CMPY]}
 
-        print_info("trade date = {}".format(mtx[TRADE_DATE]))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("trade date = {}".format(mtx[TRADE_DATE]))
         trade_date = mtx[TRADE_DATE].split('/')
         init_tx[TRADE_DAY] = int(trade_date[1])
         init_tx[TRADE_MTH] = int(trade_date[0])
         init_tx[TRADE_YR]  = int(trade_date[2])
-        print_info("trade day/month/year = '{}/{}/{}'".format(init_tx[TRADE_DAY],init_tx[TRADE_MTH],init_tx[TRADE_YR]))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("trade day/month/year = '{}/{}/{}'".format(init_tx[TRADE_DAY],init_tx[TRADE_MTH],init_tx[TRADE_YR]))
 
         # check if we have a switch/transfer
         switch = True if (re.match(re_switch, mtx[DESC]) or re.match(re_intrf, mtx[DESC])) else False
         init_tx[SWITCH] = switch
-        print_info("{}Have a Switch!".format('DO NOT ' if not switch else '>>> '), BLUE)
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("{}Have a Switch!".format('DO NOT ' if not switch else '>>> '), BLUE)
 
         asset_acct_name = mtx[FUND_CMPY] + " " + mtx[FUND_CODE]
         asset_parent = ast_parent
         # special locations for Trust Revenue and Asset accounts
         if asset_acct_name == TRUST_AST_ACCT:
             asset_parent = self.root.lookup_by_name(TRUST)
-            print_info("asset_parent = {}".format(asset_parent.GetName()))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("asset_parent = {}".format(asset_parent.GetName()))
             rev_acct = self.root.lookup_by_name(TRUST_REV_ACCT)
-            print_info("rev_acct = {}".format(rev_acct.GetName()))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("rev_acct = {}".format(rev_acct.GetName()))
         # save the (possibly modified) Revenue account to the Gnc tx
         init_tx[REVENUE] = rev_acct
 
@@ -92,7 +99,8 @@ class GncTxCreator:
             raise Exception("Could NOT find acct '{}' under parent '{}'".format(asset_acct_name, asset_parent.GetName()))
         else:
             init_tx[ACCT] = asset_acct
-            print_info("asset_acct = {}".format(asset_acct.GetName()), color=CYAN)
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("asset_acct = {}".format(asset_acct.GetName()), color=CYAN)
 
         # get the dollar value of the tx
         re_match = re.match(re_gross, mtx[GROSS])
@@ -103,7 +111,8 @@ class GncTxCreator:
             # if match group 1 is not empty, amount is negative
             if re_match.group(1) != '':
                 gross_curr *= -1
-            print_info("gross_curr = {}".format(gross_curr))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("gross_curr = {}".format(gross_curr))
             init_tx[GROSS] = gross_curr
         else:
             raise Exception("PROBLEM!! re_gross DID NOT match with value '{}'!".format(mtx[GROSS]))
@@ -116,37 +125,33 @@ class GncTxCreator:
             if re_match.group(1) != '':
                 units *= -1
             init_tx[UNITS] = units
-            print_info("units = {}".format(units))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("units = {}".format(units))
         else:
             raise Exception("PROBLEM!! re_units DID NOT match with value '{}'!".format(mtx[UNITS]))
 
         # assemble the Description string
         descr = "{}: {} {}".format(COMPANY_NAME[init_tx[FUND_CMPY]], mtx[DESC], asset_acct_name)
         init_tx[DESC] = descr
-        print_info("descr = {}".format(descr))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("descr = {}".format(descr))
 
         # notes field
         notes = str(asset_acct_name + " balance = " + mtx[UNIT_BAL])
         init_tx[NOTES] = notes
-        print_info("notes = {}".format(notes))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("notes = {}".format(notes))
 
         pair_tx = None
-        have_pair = False
         if switch:
             print_info("Tx is a Switch to OTHER Monarch account.", BLUE)
-            # look for switches in this plan type with same company, day, month and opposite gross value
-            for itx in self.report_info.plans[plan_type]:
-                if itx[SWITCH] and itx[FUND_CMPY] == init_tx[FUND_CMPY] and itx[GROSS] == (gross_curr * -1) \
-                        and itx[TRADE_DAY] == init_tx[TRADE_DAY] and itx[TRADE_MTH] == init_tx[TRADE_MTH] :
-                    # ALREADY HAVE THE FIRST ITEM OF THE PAIR
-                    have_pair = True
-                    pair_tx = itx
-                    print_info('Found the MATCH of a pair...', YELLOW)
-                    break
-
-            if not have_pair:
-                # store the tx until we find the matching tx
-                self.report_info.plans[plan_type].append(init_tx)
+            # look for switches in this plan type with same company, date and opposite gross value
+            trade_date = (init_tx[TRADE_YR], init_tx[TRADE_MTH], init_tx[TRADE_DAY])
+            pair_tx = self.pending_pairs.match_or_add(plan_type, init_tx[FUND_CMPY], trade_date, gross_curr, init_tx)
+            if pair_tx:
+                print_info('Found the MATCH of a pair...', YELLOW)
+            else:
+                # the tx is stored until we find the matching tx
                 print_info('Found the FIRST of a pair...\n', YELLOW)
 
         return init_tx, pair_tx
@@ -180,21 +185,25 @@ class GncTxCreator:
         init_tx[TRADE_DAY] = conv_date.day
         init_tx[TRADE_MTH] = conv_date.month
         init_tx[TRADE_YR]  = conv_date.year
-        print_info("trade day-month-year = '{}-{}-{}'".format(init_tx[TRADE_DAY],init_tx[TRADE_MTH],init_tx[TRADE_YR]))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("trade day-month-year = '{}-{}-{}'".format(init_tx[TRADE_DAY],init_tx[TRADE_MTH],init_tx[TRADE_YR]))
 
         # check if we have a switch-in/out
         switch = True if mtx[DESC] == SW_IN or mtx[DESC] == SW_OUT else False
         init_tx[SWITCH] = switch
-        print_info("{}Have a Switch!".format('DO NOT ' if not switch else '>>> '), BLUE)
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("{}Have a Switch!".format('DO NOT ' if not switch else '>>> '), BLUE)
 
         asset_acct_name = mtx[FUND_CMPY] + " " + mtx[FUND_CODE]
         asset_parent = ast_parent
         # special locations for Trust Revenue and Asset accounts
         if asset_acct_name == TRUST_AST_ACCT:
             asset_parent = self.root.lookup_by_name(TRUST)
-            print_info("asset_parent = {}".format(asset_parent.GetName()))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("asset_parent = {}".format(asset_parent.GetName()))
             rev_acct = self.root.lookup_by_name(TRUST_REV_ACCT)
-            print_info("rev_acct = {}".format(rev_acct.GetName()))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("rev_acct = {}".format(rev_acct.GetName()))
         # save the (possibly modified) Revenue account to the Gnc tx
         init_tx[REVENUE] = rev_acct
 
@@ -204,7 +213,8 @@ class GncTxCreator:
             raise Exception("Could NOT find acct '{}' under parent '{}'".format(asset_acct_name, asset_parent.GetName()))
         else:
             init_tx[ACCT] = asset_acct
-            print_info("asset_acct = {}".format(asset_acct.GetName()), color=CYAN)
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("asset_acct = {}".format(asset_acct.GetName()), color=CYAN)
 
         # get the dollar value of the tx
         re_match = re.match(re_gross, mtx[GROSS])
@@ -215,7 +225,8 @@ class GncTxCreator:
             # if match group 1 is not empty, amount is negative
             if re_match.group(1) != '':
                 gross_curr *= -1
-            print_info("gross_curr = {}".format(gross_curr))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("gross_curr = {}".format(gross_curr))
             init_tx[GROSS] = gross_curr
         else:
             raise Exception("PROBLEM!! re_gross DID NOT match with value '{}'!".format(mtx[GROSS]))
@@ -228,7 +239,8 @@ class GncTxCreator:
             if re_match.group(1) != '':
                 units *= -1
             init_tx[UNITS] = units
-            print_info("units = {}".format(units))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("units = {}".format(units))
         else:
             raise Exception("PROBLEM!! re_units DID NOT match with value '{}'!".format(mtx[UNITS]))
 
@@ -243,22 +255,15 @@ class GncTxCreator:
         # print_info("notes = {}".format(init_tx[NOTES]))
 
         pair_tx = None
-        have_pair = False
         if switch:
             print_info("Tx is a Switch to OTHER Monarch account.", BLUE)
-            # look for switches in this plan type with same company, day, month and opposite gross value
-            for itx in self.report_info.plans[plan_type]:
-                if itx[SWITCH] and itx[FUND_CMPY] == init_tx[FUND_CMPY] and itx[GROSS] == (gross_curr * -1) \
-                        and itx[TRADE_DAY] == init_tx[TRADE_DAY] and itx[TRADE_MTH] == init_tx[TRADE_MTH] :
-                    # ALREADY HAVE THE FIRST ITEM OF THE PAIR
-                    have_pair = True
-                    pair_tx = itx
-                    print_info('Found the MATCH of a pair...', YELLOW)
-                    break
-
-            if not have_pair:
-                # store the tx until we find the matching tx
-                self.report_info.plans[plan_type].append(init_tx)
+            # look for switches in this plan type with same company, date and opposite gross value
+            trade_date = (init_tx[TRADE_YR], init_tx[TRADE_MTH], init_tx[TRADE_DAY])
+            pair_tx = self.pending_pairs.match_or_add(plan_type, init_tx[FUND_CMPY], trade_date, gross_curr, init_tx)
+            if pair_tx:
+                print_info('Found the MATCH of a pair...', YELLOW)
+            else:
+                # the tx is stored until we find the matching tx
                 print_info('Found the FIRST of a pair...\n', YELLOW)
 
         return init_tx, pair_tx
@@ -277,13 +282,15 @@ class GncTxCreator:
 
         int_price = int((tx1[GROSS] * 100) / (tx1[UNITS] / 10000))
         val = GncNumeric(int_price, 10000)
-        print_info("Adding: {}[{}] @ ${}".format(tx1[ACCT].GetName(), datestring, val))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("Adding: {}[{}] @ ${}".format(tx1[ACCT].GetName(), datestring, val))
 
         pr1 = GncPrice(self.book)
         pr1.begin_edit()
         pr1.set_time64(pr_date)
         comm = tx1[ACCT].GetCommodity()
-        print_info("Commodity = {}:{}".format(comm.get_namespace(), comm.get_printname()))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("Commodity = {}:{}".format(comm.get_namespace(), comm.get_printname()))
         pr1.set_commodity(comm)
 
         pr1.set_currency(self.curr)
@@ -296,13 +303,15 @@ class GncTxCreator:
             # get the price for the paired Tx
             int_price = int((tx2[GROSS] * 100) / (tx2[UNITS] / 10000))
             val = GncNumeric(int_price, 10000)
-            print_info("Adding: {}[{}] @ ${}".format(tx2[ACCT].GetName(), datestring, val))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("Adding: {}[{}] @ ${}".format(tx2[ACCT].GetName(), datestring, val))
 
             pr2 = GncPrice(self.book)
             pr2.begin_edit()
             pr2.set_time64(pr_date)
             comm = tx2[ACCT].GetCommodity()
-            print_info("Commodity = {}:{}".format(comm.get_namespace(), comm.get_printname()))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("Commodity = {}:{}".format(comm.get_namespace(), comm.get_printname()))
             pr2.set_commodity(comm)
 
             pr2.set_currency(self.curr)
@@ -312,13 +321,13 @@ class GncTxCreator:
             pr2.commit_edit()
 
         if self.mode == PROD:
-            print_info("Mode = {}: Add Price1 to DB.".format(self.mode), GREEN)
+            print_info(LogMsg("Mode = {}: Add Price1 to DB.", self.mode), GREEN)
             self.price_db.add_price(pr1)
             if tx1[SWITCH]:
-                print_info("Mode = {}: Add Price2 to DB.".format(self.mode), GREEN)
+                print_info(LogMsg("Mode = {}: Add Price2 to DB.", self.mode), GREEN)
                 self.price_db.add_price(pr2)
         else:
-            print_info("Mode = {}: ABANDON Prices!\n".format(self.mode), RED)
+            print_info(LogMsg("Mode = {}: ABANDON Prices!\n", self.mode), RED)
 
     # TODO: separate file with standard functions to create Gnucash session, prices, transactions
     def create_gnc_txs(self, tx1, tx2):
@@ -338,7 +347,8 @@ class GncTxCreator:
         gtx.SetCurrency(self.curr)
         gtx.SetDate(tx1[TRADE_DAY], tx1[TRADE_MTH], tx1[TRADE_YR])
         # print_info("gtx date = {}".format(gtx.GetDate()), BLUE)
-        print_info("tx1[DESC] = {}".format(tx1[DESC]), YELLOW)
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("tx1[DESC] = {}".format(tx1[DESC]), YELLOW)
         gtx.SetDescription(tx1[DESC])
 
         # create the ASSET split for the Tx
@@ -378,20 +388,21 @@ class GncTxCreator:
             gtx.SetNotes(tx1[NOTES])
             # set Action for the ASSET split
             action = FEE if FEE in tx1[DESC] else ("Sell" if tx1[UNITS] < 0 else DIST)
-            print_info("action = {}".format(action))
+            if GNULOG.is_enabled(LOG_DEBUG):
+                print_debug("action = {}".format(action))
             spl_ast.SetAction(action)
 
         # ROLL BACK if something went wrong and the two splits DO NOT balance
         if not gtx.GetImbalanceValue().zero_p():
-            print_error("gtx Imbalance = {}!! Roll back transaction changes!".format(gtx.GetImbalanceValue().to_string()))
+            print_error(LogMsg("gtx Imbalance = {}!! Roll back transaction changes!", gtx.GetImbalanceValue().to_string()))
             gtx.RollbackEdit()
             return
 
         if self.mode == PROD:
-            print_info("Mode = {}: Commit transaction changes.\n".format(self.mode), GREEN)
+            print_info(LogMsg("Mode = {}: Commit transaction changes.\n", self.mode), GREEN)
             gtx.CommitEdit()
         else:
-            print_info("Mode = {}: Roll back transaction changes!\n".format(self.mode), RED)
+            print_info(LogMsg("Mode = {}: Roll back transaction changes!\n", self.mode), RED)
             gtx.RollbackEdit()
 
     def process_monarch_txs(self, mtx, plan_type, ast_parent, rev_acct):
@@ -423,7 +434,7 @@ class GncTxCreator:
             self.create_gnc_txs(tx1, tx2)
 
         except Exception as ie:
-            print_error("process_monarch_txs() EXCEPTION!! '{}'\n".format(str(ie)))
+            print_error(LogMsg("process_monarch_txs() EXCEPTION!! '{}'\n", ie))
 
     def create_gnucash_info(self):
         """
@@ -442,13 +453,16 @@ class GncTxCreator:
         self.curr = commod_tab.lookup("ISO4217", "CAD")
 
         for plan_type in self.tx_coll[PLAN_DATA]:
-            print_info("\n\t\u0022Plan type = {}\u0022".format(plan_type), YELLOW)
+            print_info(LogMsg("\n\t\u0022Plan type = {}\u0022", plan_type), YELLOW)
 
             asset_parent, rev_acct = self.get_plan_info(plan_type)
 
             for mon_tx in self.tx_coll[PLAN_DATA][plan_type]:
                 self.process_monarch_txs(mon_tx, plan_type, asset_parent, rev_acct)
 
+        for plan_type, fund_cmpy, trade_date, amount, itx in self.pending_pairs.get_unmatched():
+            print_error(LogMsg("Switch tx NOT matched: {} {} @ {} = {}", plan_type, itx[DESC], trade_date, amount))
+
     def get_plan_info(self, plan_type):
         """
         get the required asset and/or revenue information from each plan
@@ -468,13 +482,17 @@ class GncTxCreator:
                                 " in Tx Collection!!".format(plan_type))
             rev_path.append(ACCT_PATHS[pl_owner])
             ast_parent_path.append(ACCT_PATHS[pl_owner])
-        print_info("rev_path = {}".format(str(rev_path)))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("rev_path = {}".format(rev_path))
 
         rev_acct = self.gncu.account_from_path(self.root, rev_path)
-        print_info("rev_acct = {}".format(rev_acct.GetName()))
-        print_info("asset_parent_path = {}".format(str(ast_parent_path)))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("rev_acct = {}".format(rev_acct.GetName()))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("asset_parent_path = {}".format(ast_parent_path))
         asset_parent = self.gncu.account_from_path(self.root, ast_parent_path)
-        print_info("asset_parent = {}".format(asset_parent.GetName()))
+        if GNULOG.is_enabled(LOG_DEBUG):
+            print_debug("asset_parent = {}".format(asset_parent.GetName()))
 
         return asset_parent, rev_acct
 
@@ -490,7 +508,7 @@ class GncTxCreator:
             session = Session(self.gnc_file)
             self.book = session.book
 
-            print_info("Owner = {}".format(self.tx_coll[OWNER]), GREEN)
+            print_info(LogMsg("Owner = {}", self.tx_coll[OWNER]), GREEN)
             self.report_info = InvestmentRecord(self.tx_coll[OWNER])
 
             self.create_gnucash_info()
@@ -525,10 +543,10 @@ def create_gnc_txs_main(args):
 
     mon_file = args[0]
     if not osp.isfile(mon_file):
-        print_error("File path '{}' does not exist. Exiting...".format(mon_file))
+        print_error(LogMsg("File path '{}' does not exist. Exiting...", mon_file))
         print_info(usage, GREEN)
         exit(530)
-    print_info("\nMonarch file = {}".format(mon_file), GREEN)
+    print_info(LogMsg("\nMonarch file = {}", mon_file), GREEN)
 
     # get Monarch transactions from the Monarch json file
     with open(mon_file, 'r') as fp:
@@ -536,9 +554,9 @@ def create_gnc_txs_main(args):
 
     gnc_file = args[1]
     if not osp.isfile(gnc_file):
-        print_error("File path '{}' does not exist. Exiting...".format(gnc_file))
+        print_error(LogMsg("File path '{}' does not exist. Exiting...", gnc_file))
         exit(540)
-    print_info("\nGnucash file = {}".format(gnc_file), GREEN)
+    print_info(LogMsg("\nGnucash file = {}", gnc_file), GREEN)
 
     mode = args[2].upper()
 
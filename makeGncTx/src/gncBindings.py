@@ -0,0 +1,27 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# gncBindings.py -- the Gnucash classes used by this package, from the real gnucash bindings OR,
+#                   if the environment variable GNC_BINDINGS=mock, from the in-memory stand-in in mockGnucash.py
+#
+#   e.g.  GNC_BINDINGS=mock python3 createGnucashTxs.py <Monarch json> <gnucash file> test
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+from Configuration import GNC_BINDINGS_ENV, MOCK_BINDINGS
+
+USING_MOCK = os.environ.get(GNC_BINDINGS_ENV, '').lower() == MOCK_BINDINGS
+
+if USING_MOCK:
+    from mockGnucash import Session, Book, Account, Transaction, Split, GncNumeric, GncPrice, GncPriceDB, \
+                            GncCommodity, CREC
+else:
+    from gnucash import Session, Book, Account, Transaction, Split, GncNumeric, GncPrice, GncPriceDB, GncCommodity
+    from gnucash.gnucash_core_c import CREC
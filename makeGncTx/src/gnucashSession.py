@@ -13,17 +13,19 @@ __created__ = '2019-07-01'
 __updated__ = '2019-08-12'
 
 import copy
-import re
-from gnucash import Session, Book, Account, Transaction, Split, GncNumeric, GncPrice, GncPriceDB, GncCommodity
-from gnucash.gnucash_core_c import CREC
+from gncBindings import Session, Book, Account, Transaction, Split, GncNumeric, GncPrice, GncPriceDB, GncCommodity, \
+                        CREC
 from Configuration import *
+from tradePairs import PendingPairs
+from priceLoader import PriceLoader
 
 
 class GnucashSession:
     """
     Create and manage a Gnucash session
+      p_mrec: InvestmentRecord, OR a CardRecord for domain CARD
     """
-    def __init__(self, p_mrec:InvestmentRecord, p_mode:str, p_gncfile:str, p_debug:bool, p_domain:str,
+    def __init__(self, p_mrec, p_mode:str, p_gncfile:str, p_debug:bool, p_domain:str,
                  p_pdb:GncPriceDB=None, p_book:Book=None, p_root:Account=None,
                  p_curr:GncCommodity=None, p_grec:InvestmentRecord=None):
         self.logger = Gnulog(p_debug)
@@ -37,21 +39,27 @@ class GnucashSession:
         self.root_acct = p_root
         self.currency  = p_curr
         self.gnc_util  = GncUtilities()
-        self.logger.print_info("class GnucashSession: Runtime = {}\n".format(dt.now().strftime(DATE_STR_FORMAT)), MAGENTA)
+        # built from the root account when the session starts
+        self.acct_index = None
+        # first legs of the Switch pairs still waiting for their match
+        self.pending_pairs = PendingPairs()
+        # splits already in the book, built when the session starts
+        self.existing = None
+        # collects the prices of the run to load them in ONE batch at the end
+        self.price_loader = None
+        self.logger.print_info(LogMsg("class GnucashSession: Runtime = {}\n", dt.now().strftime(DATE_STR_FORMAT)), MAGENTA)
 
     def set_gnc_rec(self, p_gncrec:InvestmentRecord):
         self.gnucash_record = p_gncrec
 
-    def get_trade_info(self, mtx:dict, plan_type:str, ast_parent:Account, rev_acct:Account):
+    def get_trade_info(self, mtx:TxRecord, plan_type:str, ast_parent:Account, rev_acct:Account):
         """
-        Parse the Monarch trade transactions from a copy&paste JSON file
+        Get the Gnucash information for a Monarch trade transaction
         Asset accounts: use the proper path to find the parent then search for the Fund Code in the descendants
         Revenue accounts: pick the proper account based on owner and plan type
-        gross_curr: re match to Gross then concatenate the two match groups
-        date: convert the date then get day, month and year to form a Gnc date
-        Units: re match and concatenate the two groups on either side of decimal point
+        Gross, Units and date: ALREADY converted in the TxRecord
         Description: use DESC and Fund Company
-        :param        mtx: Monarch copied trade tx information
+        :param        mtx: Monarch trade tx information
         :param  plan_type: plan names from Configuration.InvestmentRecord
         :param ast_parent: Asset parent account
         :param   rev_acct: Revenue account
@@ -59,84 +67,52 @@ class GnucashSession:
         """
         self.logger.print_info('get_trade_info()', BLUE)
 
-        # set the regex needed to match the required groups in each value
-        re_gross  = re.compile(r"^(-?)\$([0-9,]{1,6})\.([0-9]{2}).*")
-        re_units  = re.compile(r"^(-?)([0-9]{1,5})\.([0-9]{4}).*")
-
-        fund_name = mtx[FUND]
-
-        # self.dbg.print_info("trade date = {}".format(mtx[TRADE_DATE]))
-        conv_date = dt.strptime(mtx[TRADE_DATE], "%d-%b-%Y")
-        # self.dbg.print_info("converted date = {}".format(conv_date))
-        init_tx = { FUND:fund_name, TRADE_DATE:mtx[TRADE_DATE],
+        fund_name = mtx.fund
+        conv_date = mtx.date
+        init_tx = { FUND:fund_name, TRADE_DATE:conv_date,
                     TRADE_DAY:conv_date.day, TRADE_MTH:conv_date.month, TRADE_YR:conv_date.year }
-        self.logger.print_info("trade day-month-year = '{}-{}-{}'"
-                               .format(init_tx[TRADE_DAY], init_tx[TRADE_MTH], init_tx[TRADE_YR]))
 
         # check if we have a switch-in/out
-        sw_ind = mtx[DESC].split()[-1]
+        sw_ind = mtx.desc.split()[-1]
         switch = True if sw_ind == SW_IN or sw_ind == SW_OUT else False
         init_tx[SWITCH] = switch
-        self.logger.print_info("{} Have a Switch!".format('***' if switch else 'DO NOT'), BLUE)
 
         asset_acct, rev_acct = self.get_accounts(ast_parent, fund_name, rev_acct)
         init_tx[ACCT] = asset_acct
         # save the (possibly modified) Revenue account to the Gnc tx
         init_tx[REVENUE] = rev_acct
 
-        # get the dollar value of the tx
-        re_match = re.match(re_gross, mtx[GROSS])
-        if re_match:
-            str_gross_curr = re_match.group(2) + re_match.group(3)
-            # remove possible comma
-            gross_curr = int(str_gross_curr.replace(',', ''))
-            # if match group 1 is not empty, amount is negative
-            if re_match.group(1) != '':
-                gross_curr *= -1
-            self.logger.print_info("gross_curr = {}".format(gross_curr))
-            init_tx[GROSS] = gross_curr
-        else:
-            raise Exception("PROBLEM[100]!! re_gross DID NOT match with value '{}'!".format(mtx[GROSS]))
-
-        # get the units of the tx
-        re_match = re.match(re_units, mtx[UNITS])
-        if re_match:
-            units = int(re_match.group(2) + re_match.group(3))
-            # if match group 1 is not empty, units is negative
-            if re_match.group(1) != '':
-                units *= -1
-            init_tx[UNITS] = units
-            self.logger.print_info("units = {}".format(units))
-        else:
-            raise Exception("PROBLEM[105]!! re_units DID NOT match with value '{}'!".format(mtx[UNITS]))
+        gross_curr = mtx.gross
+        init_tx[GROSS] = gross_curr
+        init_tx[UNITS] = mtx.units
 
         # assemble the Description string
-        descr = "{} {}".format(mtx[DESC], fund_name)
+        descr = "{} {}".format(mtx.desc, fund_name)
         init_tx[DESC] = descr
-        self.logger.print_info("descr = {}".format(init_tx[DESC]), CYAN)
 
         # notes field
-        notes = mtx[NOTES] if NOTES in mtx else "{} Load = {}".format(fund_name, mtx[LOAD])
+        notes = mtx.notes if mtx.notes is not None else "{} Load = {}".format(fund_name, mtx.load)
         init_tx[NOTES] = notes
-        self.logger.print_info("notes = {}".format(init_tx[NOTES]), CYAN)
+
+        # called for EVERY trade: build NO message unless debug is on
+        if self.logger.is_enabled(LOG_DEBUG):
+            self.logger.print_debug("trade day-month-year = '{}-{}-{}'"
+                                    .format(init_tx[TRADE_DAY], init_tx[TRADE_MTH], init_tx[TRADE_YR]))
+            self.logger.print_debug("{} Have a Switch!".format('***' if switch else 'DO NOT'), BLUE)
+            self.logger.print_debug("gross_curr = {} ; units = {}".format(gross_curr, mtx.units))
+            self.logger.print_debug("descr = {}".format(descr), CYAN)
+            self.logger.print_debug("notes = {}".format(notes), CYAN)
 
         pair_tx = None
-        have_pair = False
         if switch:
             self.logger.print_info("Tx is a Switch to OTHER Monarch account.", BLUE)
-            # look for switches in this plan type with same company, day, month and opposite gross value
-            for itx in self.gnucash_record.plans[plan_type][TRADE]:
-                if itx[SWITCH] and itx[FUND].split()[0] == init_tx[FUND].split()[0] and itx[GROSS] == (gross_curr * -1) \
-                        and itx[TRADE_DATE] == init_tx[TRADE_DATE] :
-                    # ALREADY HAVE THE FIRST ITEM OF THE PAIR
-                    have_pair = True
-                    pair_tx = itx
-                    self.logger.print_info('*** Found the MATCH of a pair ***', YELLOW)
-                    break
-
-            if not have_pair:
-                # store the tx until we find the matching tx
-                self.gnucash_record.plans[plan_type][TRADE].append(init_tx)
+            # look for switches in this plan type with same company, date and opposite gross value
+            pair_tx = self.pending_pairs.match_or_add(plan_type, init_tx[FUND].split()[0], init_tx[TRADE_DATE],
+                                                      gross_curr, init_tx)
+            if pair_tx:
+                self.logger.print_info('*** Found the MATCH of a pair ***', YELLOW)
+            else:
+                # the tx is stored until we find the matching tx
                 self.logger.print_info('Found the FIRST of a pair...\n', YELLOW)
 
         return init_tx, pair_tx
@@ -153,66 +129,76 @@ class GnucashSession:
         asset_parent = ast_parent
         # special locations for Trust Revenue and Asset accounts
         if asset_acct_name == TRUST_AST_ACCT:
-            asset_parent = self.root_acct.lookup_by_name(TRUST)
-            self.logger.print_info("asset_parent = {}".format(asset_parent.GetName()))
-            rev_acct = self.root_acct.lookup_by_name(TRUST_REV_ACCT)
-            self.logger.print_info("MODIFIED rev_acct = {}".format(rev_acct.GetName()))
+            asset_parent = self.acct_index.lookup(self.root_acct, TRUST)
+            rev_acct = self.acct_index.lookup(self.root_acct, TRUST_REV_ACCT)
+            if self.logger.is_enabled(LOG_DEBUG):
+                self.logger.print_debug("asset_parent = {}".format(asset_parent.GetName()))
+                self.logger.print_debug("MODIFIED rev_acct = {}".format(rev_acct.GetName()))
         # get the asset account
-        asset_acct = asset_parent.lookup_by_name(asset_acct_name)
+        asset_acct = self.acct_index.lookup(asset_parent, asset_acct_name)
         if asset_acct is None:
             raise Exception("[164] Could NOT find acct '{}' under parent '{}'"
                             .format(asset_acct_name, asset_parent.GetName()))
 
-        self.logger.print_info("asset_acct = {}".format(asset_acct.GetName()), color=CYAN)
+        if self.logger.is_enabled(LOG_DEBUG):
+            self.logger.print_debug("asset_acct = {}".format(asset_acct.GetName()), color=CYAN)
         return asset_acct, rev_acct
 
-    def create_gnc_price_txs(self, mtx:dict, ast_parent:Account, rev_acct:Account):
+    def create_gnc_price_txs(self, mtx:PriceRecord, ast_parent:Account, rev_acct:Account):
         """
-        Create and load Gnucash prices to the Gnucash PriceDB
-        :param        mtx: InvestmentRecord transaction
+        Add a Gnucash price to the batch that is loaded to the Gnucash PriceDB at the end of the run
+        :param        mtx: InvestmentRecord price
         :param ast_parent: Asset parent account
         :param   rev_acct: Revenue account
         :return: nil
         """
         self.logger.print_info('create_gnc_price_txs()', BLUE)
-        conv_date = dt.strptime(mtx[DATE], "%d-%b-%Y")
-        pr_date = dt(conv_date.year, conv_date.month, conv_date.day)
-        datestring = pr_date.strftime("%Y-%m-%d")
-
-        fund_name = mtx[FUND]
+        fund_name = mtx.fund
         if fund_name in MONEY_MKT_FUNDS:
             return
 
-        int_price = int(mtx[PRICE].replace('.', '').replace('$', ''))
-        val = GncNumeric(int_price, 10000)
-        self.logger.print_info("Adding: {}[{}] @ ${}".format(fund_name, datestring, val))
-
-        pr1 = GncPrice(self.book)
-        pr1.begin_edit()
-        pr1.set_time64(pr_date)
-
-        asset_acct, rev_acct = self.get_accounts(ast_parent, fund_name, rev_acct)
-        comm = asset_acct.GetCommodity()
-        self.logger.print_info("Commodity = {}:{}".format(comm.get_namespace(), comm.get_printname()))
-        pr1.set_commodity(comm)
-
-        pr1.set_currency(self.currency)
-        pr1.set_value(val)
-        pr1.set_source_string("user:price")
-        pr1.set_typestr('nav')
-        pr1.commit_edit()
-
-        if self.mode == PROD:
-            self.logger.print_info("Mode = {}: Add Price to DB.".format(self.mode), GREEN)
-            self.price_db.add_price(pr1)
-        else:
-            self.logger.print_info("Mode = {}: ABANDON Prices!\n".format(self.mode), RED)
-
-    def create_gnc_trade_txs(self, tx1:dict, tx2:dict):
+        if self.logger.is_enabled(LOG_DEBUG):
+            self.logger.print_debug("Adding: {}[{}] @ ${}".format(fund_name, mtx.date, mtx.price / 10000))
+        asset_parent = ast_parent
+        # special location for the Trust Asset account
+        if fund_name == TRUST_AST_ACCT:
+            asset_parent = self.acct_index.lookup(self.root_acct, TRUST)
+        # the commodity of each fund is found ONCE by the loader
+        if not self.price_loader.add_record(mtx, asset_parent):
+            raise Exception("[151] Could NOT find acct '{}' under parent '{}'".format(fund_name, asset_parent.GetName()))
+
+    def get_trade_splits(self, tx1:dict, tx2:dict) -> list:
         """
-        Create and load Gnucash transactions to the Gnucash file
+        Phase ONE for the splits of a trade: their accounts and values, checked here so that phase two has NOTHING left to fail
         :param tx1: first transaction
         :param tx2: matching transaction if a switch
+        :return: list of (account, value in cents, units in 1/10000 ths or None, action, memo, reconcile flag)
+        :raise Exception if a split has NO account or the splits do NOT balance
+        """
+        if tx1[SWITCH]:
+            # the two ASSET splits, with the Notes of each tx as the Memo of its split
+            splits = [ (tx1[ACCT], tx1[GROSS], tx1[UNITS], "Buy" if tx1[UNITS] > 0 else "Sell", tx1[NOTES], None),
+                       (tx2[ACCT], tx2[GROSS], tx2[UNITS], "Buy" if tx1[UNITS] < 0 else "Sell", tx2[NOTES], None) ]
+        else:
+            # the ASSET split and the REVENUE split
+            action = FEE if FEE in tx1[DESC] else ("Sell" if tx1[UNITS] < 0 else DIST)
+            if self.logger.is_enabled(LOG_DEBUG):
+                self.logger.print_debug("action = {}".format(action))
+            splits = [ (tx1[ACCT], tx1[GROSS], tx1[UNITS], action, None, None),
+                       (tx1[REVENUE], tx1[GROSS] * -1, None, None, None, CREC) ]
+
+        if any(split[0] is None for split in splits):
+            raise Exception("Gnc tx '{}' has a split with NO account!".format(tx1[DESC]))
+        imbalance = sum(split[1] for split in splits)
+        if imbalance != 0:
+            raise Exception("Gnc tx '{}' IMBALANCE = {}!".format(tx1[DESC], GncNumeric(imbalance, 100).to_string()))
+        return splits
+
+    def create_gnc_trade_txs(self, tx1:dict, p_splits:list):
+        """
+        Phase TWO: create and load a Gnucash transaction to the Gnucash file
+        :param      tx1: first transaction
+        :param p_splits: from get_trade_splits(), ALREADY checked
         :return: nil
         """
         self.logger.print_info('create_gnc_trade_txs()', BLUE)
@@ -224,117 +210,233 @@ class GnucashSession:
 
         gtx.SetCurrency(self.currency)
         gtx.SetDate(tx1[TRADE_DAY], tx1[TRADE_MTH], tx1[TRADE_YR])
-        # self.dbg.print_info("gtx date = {}".format(gtx.GetDate()), BLUE)
-        self.logger.print_info("tx1[DESC] = {}".format(tx1[DESC]), YELLOW)
+        if self.logger.is_enabled(LOG_DEBUG):
+            self.logger.print_debug("tx1[DESC] = {}".format(tx1[DESC]), YELLOW)
         gtx.SetDescription(tx1[DESC])
-
-        # create the ASSET split for the Tx
-        spl_ast = Split(self.book)
-        spl_ast.SetParent(gtx)
-        # set the account, value, and units of the Asset split
-        spl_ast.SetAccount(tx1[ACCT])
-        spl_ast.SetValue(GncNumeric(tx1[GROSS], 100))
-        spl_ast.SetAmount(GncNumeric(tx1[UNITS], 10000))
-
-        if tx1[SWITCH]:
-            # create the second ASSET split for the Tx
-            spl_ast2 = Split(self.book)
-            spl_ast2.SetParent(gtx)
-            # set the Account, Value, and Units of the second ASSET split
-            spl_ast2.SetAccount(tx2[ACCT])
-            spl_ast2.SetValue(GncNumeric(tx2[GROSS], 100))
-            spl_ast2.SetAmount(GncNumeric(tx2[UNITS], 10000))
-            # set Actions for the splits
-            spl_ast2.SetAction("Buy" if tx1[UNITS] < 0 else "Sell")
-            spl_ast.SetAction("Buy" if tx1[UNITS] > 0 else "Sell")
-            # combine Notes for the Tx and set Memos for the splits
-            gtx.SetNotes(tx1[NOTES] + " | " + tx2[NOTES])
-            spl_ast.SetMemo(tx1[NOTES])
-            spl_ast2.SetMemo(tx2[NOTES])
-        else:
-            # the second split is for a REVENUE account
-            spl_rev = Split(self.book)
-            spl_rev.SetParent(gtx)
-            # set the Account, Value and Reconciled of the REVENUE split
-            spl_rev.SetAccount(tx1[REVENUE])
-            rev_gross = tx1[GROSS] * -1
-            # self.dbg.print_info("revenue gross = {}".format(rev_gross))
-            spl_rev.SetValue(GncNumeric(rev_gross, 100))
-            spl_rev.SetReconcile(CREC)
-            # set Notes for the Tx
-            gtx.SetNotes(tx1[NOTES])
-            # set Action for the ASSET split
-            action = FEE if FEE in tx1[DESC] else ("Sell" if tx1[UNITS] < 0 else DIST)
-            self.logger.print_info("action = {}".format(action))
-            spl_ast.SetAction(action)
-
-        # ROLL BACK if something went wrong and the two splits DO NOT balance
-        if not gtx.GetImbalanceValue().zero_p():
-            self.logger.print_error("Gnc tx IMBALANCE = {}!! Roll back transaction changes!"
-                                    .format(gtx.GetImbalanceValue().to_string()))
-            gtx.RollbackEdit()
-            return
+        # combine the Notes of both txs of a switch
+        gtx.SetNotes(" | ".join(split[4] for split in p_splits) if tx1[SWITCH] else tx1[NOTES])
+
+        for acct, value, units, action, memo, reconcile in p_splits:
+            spl = Split(self.book)
+            spl.SetParent(gtx)
+            # set the Account, Value, and Units of the split
+            spl.SetAccount(acct)
+            spl.SetValue(GncNumeric(value, 100))
+            if units is not None:
+                spl.SetAmount(GncNumeric(units, 10000))
+            if action:
+                spl.SetAction(action)
+            if memo:
+                spl.SetMemo(memo)
+            if reconcile:
+                spl.SetReconcile(reconcile)
 
         if self.mode == PROD:
-            self.logger.print_info("Mode = {}: Commit transaction changes.\n".format(self.mode), GREEN)
+            if self.logger.is_enabled(LOG_INFO):
+                self.logger.print_info("Mode = {}: Commit transaction changes.\n".format(self.mode), GREEN)
             gtx.CommitEdit()
         else:
-            self.logger.print_info("Mode = {}: Roll back transaction changes!\n".format(self.mode), RED)
+            if self.logger.is_enabled(LOG_INFO):
+                self.logger.print_info("Mode = {}: Roll back transaction changes!\n".format(self.mode), RED)
             gtx.RollbackEdit()
 
-    def process_monarch_trade(self, mtx:dict, plan_type:str, ast_parent:Account, rev_acct:Account):
+    def prepare_monarch_trade(self, mtx:TxRecord, plan_type:str, ast_parent:Account, rev_acct:Account):
         """
-        Obtain each Monarch trade as a transaction item, or pair of transactions where required, and forward to Gnucash processing
+        Phase ONE for a Monarch trade: get ALL the Gnucash information of the trade, or pair of trades where required,
+        WITHOUT creating anything in the book
         :param        mtx: Monarch transaction information
         :param  plan_type: plan names from Configuration.InvestmentRecord
         :param ast_parent: Asset parent account
         :param   rev_acct: Revenue account
-        :return: nil
+        :return: (tx1, splits) to create in phase two, or None if the trade is the first of a pair or ALREADY in the book
         """
-        self.logger.print_info('process_monarch_trade()', BLUE)
-        try:
-            # get the additional required information from the Monarch json
-            tx1, tx2 = self.get_trade_info(mtx, plan_type, ast_parent, rev_acct)
+        self.logger.print_info('prepare_monarch_trade()', BLUE)
+        # get the additional required information from the Monarch json
+        tx1, tx2 = self.get_trade_info(mtx, plan_type, ast_parent, rev_acct)
 
-            # just return if there is a matching tx but we don't have it yet
-            if tx1[SWITCH] and tx2 is None:
-                return
+        # nothing to create if there is a matching tx but we don't have it yet
+        if tx1[SWITCH] and tx2 is None:
+            return None
 
-            self.create_gnc_trade_txs(tx1, tx2)
+        splits = self.get_trade_splits(tx1, tx2)
+        split_keys = [ BookFingerprints.split_key(tx[ACCT], tx[TRADE_DATE], tx[GROSS], tx[UNITS])
+                       for tx in (tx1, tx2) if tx is not None ]
+        if self.existing.has_trade(*split_keys):
+            self.logger.print_info(LogMsg("SKIP trade ALREADY in the book: {} @ {}", tx1[DESC], tx1[TRADE_DATE]), YELLOW)
+            return None
 
-        except Exception as ie:
-            self.logger.print_error("process_monarch_trade() EXCEPTION!! '{}'\n".format(str(ie)))
+        return tx1, splits
 
     def create_gnucash_info(self):
         """
-        Process each transaction from the Monarch input file to get the required Gnucash information
+        Import the Monarch record in TWO phases so that a bad input NEVER leaves part of the record in the book:
+          1) find ALL the accounts and price commodities with the cached account tree, and compute and check the
+             split values and balance of EVERY trade: nothing is created and NO edit is begun
+          2) ONLY if there are NO problems: create the trade transactions and load the prices
+        NOT saving the session does NOT undo phase two on a SQL book, where each CommitEdit is written at once,
+        so ALL the checks are in phase one.
         :return: nil
         """
         self.logger.print_info("create_gnucash_info()", BLUE)
         self.root_acct = self.book.get_root_account()
         self.root_acct.get_instance()
-
-        if self.domain != TRADE:
-            self.price_db = self.book.get_price_db()
-            self.price_db.begin_edit()
-            self.logger.print_info("self.price_db.begin_edit()", CYAN)
+        self.acct_index = AccountIndex(self.root_acct)
 
         commod_tab = self.book.get_table()
         self.currency = commod_tab.lookup("ISO4217", "CAD")
 
+        if self.domain != TRADE:
+            self.price_db = self.book.get_price_db()
+            self.price_loader = PriceLoader(self.book, self.price_db, self.currency, self.acct_index)
+
         plans = self.monarch_record.get_plans()
+        plan_accts = self.index_existing(plans)
+        trades = []
+        problems = []
         for plan_type in plans:
-            self.logger.print_info("\n\t\u0022Plan type = {}\u0022".format(plan_type), YELLOW)
+            self.logger.print_info(LogMsg("\n\t\u0022Plan type = {}\u0022", plan_type), YELLOW)
 
-            asset_parent, rev_acct = self.get_asset_revenue_info(plan_type)
+            asset_parent, rev_acct = plan_accts[plan_type]
 
             if self.domain != PRICE:
                 for mon_tx in plans[plan_type][TRADE]:
-                    self.process_monarch_trade(mon_tx, plan_type, asset_parent, rev_acct)
+                    try:
+                        trade = self.prepare_monarch_trade(mon_tx, plan_type, asset_parent, rev_acct)
+                    except Exception as pmte:
+                        problems.append("{} trade {}: {}".format(plan_type, mon_tx, repr(pmte)))
+                        continue
+                    if trade:
+                        trades.append(trade)
 
             if self.domain != TRADE:
                 for mon_tx in plans[plan_type][PRICE]:
-                    self.create_gnc_price_txs(mon_tx, asset_parent, rev_acct)
+                    try:
+                        self.create_gnc_price_txs(mon_tx, asset_parent, rev_acct)
+                    except Exception as cgpe:
+                        problems.append("{} price {}: {}".format(plan_type, mon_tx, repr(cgpe)))
+
+        for plan_type, fund_cmpy, trade_date, amount, itx in self.pending_pairs.get_unmatched():
+            self.logger.print_error(LogMsg("Switch tx NOT matched: {} {} @ {} = {}", plan_type, itx[FUND], trade_date, amount))
+
+        if problems:
+            for problem in problems:
+                self.logger.print_error(problem)
+            raise Exception("{} BAD tx(s) in the Monarch record: NOTHING was written to the Gnucash book!".format(len(problems)))
+
+        self.logger.print_info(LogMsg("ALL txs are good: create {} trade(s).", len(trades)), GREEN)
+        for tx1, splits in trades:
+            self.create_gnc_trade_txs(tx1, splits)
+
+        self.logger.print_info(self.existing.get_report(), GREEN)
+
+        if self.domain != TRADE:
+            if self.mode != PROD:
+                self.logger.print_info(LogMsg("Mode = {}: ABANDON Prices!\n", self.mode), RED)
+            self.logger.print_info(self.price_loader.load(self.mode == PROD), GREEN)
+
+    def prepare_card_tx(self, ctx:CardTxRecord, card_acct:Account, exp_acct:Account):
+        """
+        Phase ONE for a credit card tx: nothing is created in the book
+        :param       ctx: credit card tx information
+        :param card_acct: Gnucash card account
+        :param  exp_acct: Gnucash account for the other side of the tx
+        :return: dict to create in phase two, or None if the tx is ALREADY in the book
+        """
+        # a charge INCREASES the balance of the card liability account
+        card_value = ctx.amount * -1
+        split_key = BookFingerprints.split_key(card_acct, ctx.date, card_value, card_value * 100)
+        if self.existing.has_trade(split_key):
+            self.logger.print_info(LogMsg("SKIP card tx ALREADY in the book: {} @ {}", ctx.desc, ctx.date), YELLOW)
+            return None
+
+        return { TRADE_DAY:ctx.date.day, TRADE_MTH:ctx.date.month, TRADE_YR:ctx.date.year, DESC:ctx.desc,
+                 GROSS:ctx.amount, CARD:card_acct, EXPENSE:exp_acct, NOTES:ctx.ref }
+
+    def create_gnc_card_tx(self, ctx:dict):
+        """
+        Create a Gnucash transaction with a split for the card account and a split for the expense account
+        :param ctx: from prepare_card_tx()
+        :return: nil
+        """
+        gtx = Transaction(self.book)
+        gtx.BeginEdit()
+        gtx.SetCurrency(self.currency)
+        gtx.SetDate(ctx[TRADE_DAY], ctx[TRADE_MTH], ctx[TRADE_YR])
+        gtx.SetDescription(ctx[DESC])
+
+        for acct, value in ( (ctx[CARD], ctx[GROSS] * -1), (ctx[EXPENSE], ctx[GROSS]) ):
+            spl = Split(self.book)
+            spl.SetParent(gtx)
+            spl.SetAccount(acct)
+            spl.SetValue(GncNumeric(value, 100))
+            spl.SetAmount(GncNumeric(value, 100))
+            if ctx[NOTES]:
+                spl.SetMemo(ctx[NOTES])
+
+        if self.mode == PROD:
+            gtx.CommitEdit()
+        else:
+            gtx.RollbackEdit()
+
+    def create_card_info(self):
+        """
+        Import a CardRecord in TWO phases, as in create_gnucash_info():
+          1) find the card account of EVERY tx and skip the txs ALREADY in the book: nothing is created
+          2) ONLY if there are NO problems: create ALL the card transactions
+        :return: nil
+        """
+        self.logger.print_info("create_card_info()", BLUE)
+        self.root_acct = self.book.get_root_account()
+        self.acct_index = AccountIndex(self.root_acct)
+        self.currency = self.book.get_table().lookup("ISO4217", "CAD")
+
+        card_parent = self.acct_index.from_path(ACCT_PATHS[CARD])
+        exp_acct = self.acct_index.from_path(ACCT_PATHS[EXPENSE])
+        self.existing = BookFingerprints()
+        self.existing.add_parent(card_parent)
+
+        card_txs = []
+        problems = []
+        for card, txs in self.monarch_record.get_cards().items():
+            card_acct = self.acct_index.lookup(card_parent, card)
+            if card_acct is None:
+                problems.append("Could NOT find card acct '{}' under parent '{}' for {} tx(s)"
+                                .format(card, card_parent.GetName(), len(txs)))
+                continue
+            self.logger.print_info(LogMsg("\n\t\u0022Card = {}: {} tx(s)\u0022", card, len(txs)), YELLOW)
+            for ctx in txs:
+                card_tx = self.prepare_card_tx(ctx, card_acct, exp_acct)
+                if card_tx:
+                    card_txs.append(card_tx)
+
+        if problems:
+            for problem in problems:
+                self.logger.print_error(problem)
+            raise Exception("{} PROBLEM(s) in the card record: NOTHING was written to the Gnucash book!".format(len(problems)))
+
+        self.logger.print_info(LogMsg("ALL txs are good: create {} card tx(s), SKIPPED {} ALREADY in the book.",
+                                      len(card_txs), self.existing.skipped_trades), GREEN)
+        for card_tx in card_txs:
+            self.create_gnc_card_tx(card_tx)
+
+    def index_existing(self, plans:dict) -> dict:
+        """
+        Fingerprint the splits already in the book under the Monarch asset parents of ALL the plans,
+        plus the Trust assets, so that a re-import skips what is already there.
+        The prices already in the PriceDB are checked by the PriceLoader.
+        :param plans: plans from Configuration.InvestmentRecord
+        :return: plan type -> (asset parent, revenue account)
+        """
+        self.logger.print_info("index_existing()", BLUE)
+        self.existing = BookFingerprints()
+        plan_accts = {}
+        for plan_type in plans:
+            plan_accts[plan_type] = self.get_asset_revenue_info(plan_type)
+            self.existing.add_parent(plan_accts[plan_type][0])
+        trust_parent = self.acct_index.lookup(self.root_acct, TRUST)
+        if trust_parent is not None:
+            self.existing.add_parent(trust_parent)
+        return plan_accts
 
     def get_asset_revenue_info(self, plan_type:str):
         """
@@ -355,13 +457,11 @@ class GnucashSession:
                                 " in Tx Collection!!".format(plan_type))
             rev_path.append(ACCT_PATHS[pl_owner])
             ast_parent_path.append(ACCT_PATHS[pl_owner])
-        self.logger.print_info("rev_path = {}".format(str(rev_path)))
-
-        rev_acct = self.gnc_util.account_from_path(self.root_acct, rev_path)
-        self.logger.print_info("rev_acct = {}".format(rev_acct.GetName()))
-        self.logger.print_info("asset_parent_path = {}".format(str(ast_parent_path)))
-        asset_parent = self.gnc_util.account_from_path(self.root_acct, ast_parent_path)
-        self.logger.print_info("asset_parent = {}".format(asset_parent.GetName()))
+        rev_acct = self.acct_index.from_path(rev_path)
+        asset_parent = self.acct_index.from_path(ast_parent_path)
+        if self.logger.is_enabled(LOG_DEBUG):
+            self.logger.print_debug("rev_path = {} ; rev_acct = {}".format(rev_path, rev_acct.GetName()))
+            self.logger.print_debug("asset_parent_path = {} ; asset_parent = {}".format(ast_parent_path, asset_parent.GetName()))
 
         return asset_parent, rev_acct
 
@@ -377,18 +477,17 @@ class GnucashSession:
             session = Session(self.gnc_file)
             self.book = session.book
 
-            owner = self.monarch_record.get_owner()
-            self.logger.print_info("Owner = {}".format(owner), GREEN)
-            self.set_gnc_rec(InvestmentRecord(owner))
+            if self.domain == CARD:
+                self.create_card_info()
+            else:
+                owner = self.monarch_record.get_owner()
+                self.logger.print_info(LogMsg("Owner = {}", owner), GREEN)
+                self.set_gnc_rec(InvestmentRecord(owner))
 
-            self.create_gnucash_info()
+                self.create_gnucash_info()
 
             if self.mode == PROD:
-                self.logger.print_info("Mode = {}: COMMIT Price DB edits and Save session.".format(self.mode), GREEN)
-
-                if self.domain != TRADE:
-                    self.price_db.commit_edit()
-
+                self.logger.print_info(LogMsg("Mode = {}: Save session.", self.mode), GREEN)
                 # only ONE session save for the entire run
                 session.save()
 
@@ -429,7 +528,7 @@ def gnucash_session_main(args:list):
 
     # get Monarch transactions from the Monarch JSON file
     with open(mon_file, 'r') as fp:
-        tx_coll = json.load(fp)
+        tx_coll = InvestmentRecord.from_json( json.load(fp) )
 
     gnc_file = args[1]
     if not osp.isfile(gnc_file):
@@ -0,0 +1,543 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# mockGnucash.py -- pure-Python, in-memory stand-in for the parts of the gnucash bindings used by this package:
+#                   Session, Book, Account tree, Transaction, Split, GncNumeric, GncPrice, GncPriceDB, GncCommodity
+#                   so that the Gnucash write path can be run, profiled and benchmarked WITHOUT a GnuCash install
+#
+#   select it with the environment variable GNC_BINDINGS=mock -- see gncBindings.py
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import itertools
+from fractions import Fraction
+from Configuration import *
+
+# reconcile flags, as in gnucash.gnucash_core_c
+CREC = 'c'
+NREC = 'n'
+
+_guid_counter = itertools.count(1)
+
+
+class GUID:
+    __slots__ = ('_hex',)
+
+    def __init__(self):
+        self._hex = "{:032x}".format(next(_guid_counter))
+
+    def to_string(self) -> str:
+        return self._hex
+
+# END class GUID
+
+
+class GncNumeric:
+    """rational number kept as num/denom, like the Gnucash numeric"""
+    __slots__ = ('_num', '_denom')
+
+    def __init__(self, num:int = 0, denom:int = 1):
+        if denom == 0:
+            raise ZeroDivisionError("GncNumeric with denom = 0!")
+        self._num = int(num)
+        self._denom = int(denom)
+
+    def num(self) -> int:
+        return self._num
+
+    def denom(self) -> int:
+        return self._denom
+
+    def as_fraction(self) -> Fraction:
+        return Fraction(self._num, self._denom)
+
+    def zero_p(self) -> bool:
+        return self._num == 0
+
+    def to_string(self) -> str:
+        return "{}/{}".format(self._num, self._denom)
+
+    def to_double(self) -> float:
+        return self._num / self._denom
+
+    def __str__(self):
+        return self.to_string()
+
+    def __repr__(self):
+        return "GncNumeric({})".format(self.to_string())
+
+# END class GncNumeric
+
+
+class GncCommodity:
+    def __init__(self, p_book, p_fullname:str, p_namespace:str, p_mnemonic:str, p_cusip:str = '', p_fraction:int = 10000):
+        self.book = p_book
+        self.fullname = p_fullname
+        self.namespace = p_namespace
+        self.mnemonic = p_mnemonic
+        self.cusip = p_cusip
+        self.fraction = p_fraction
+
+    def get_namespace(self) -> str:
+        return self.namespace
+
+    def get_mnemonic(self) -> str:
+        return self.mnemonic
+
+    def get_fullname(self) -> str:
+        return self.fullname
+
+    def get_printname(self) -> str:
+        return "{} ({})".format(self.mnemonic, self.fullname)
+
+    def get_fraction(self) -> int:
+        return self.fraction
+
+# END class GncCommodity
+
+
+class GncCommodityTable:
+    def __init__(self):
+        self._commodities = {}
+
+    def insert(self, comm:GncCommodity) -> GncCommodity:
+        return self._commodities.setdefault( (comm.get_namespace(), comm.get_mnemonic()), comm )
+
+    def lookup(self, namespace:str, mnemonic:str):
+        return self._commodities.get( (namespace, mnemonic) )
+
+# END class GncCommodityTable
+
+
+class Account:
+    def __init__(self, p_book):
+        self.book = p_book
+        self.guid = GUID()
+        self.name = ''
+        self.commodity = None
+        self.parent = None
+        self.children = []
+        self.splits = []
+
+    def get_instance(self):
+        return self
+
+    def get_book(self):
+        return self.book
+
+    def GetGUID(self) -> GUID:
+        return self.guid
+
+    def SetName(self, name:str):
+        self.name = name
+
+    def GetName(self) -> str:
+        return self.name
+
+    def SetCommodity(self, comm:GncCommodity):
+        self.commodity = comm
+
+    def GetCommodity(self) -> GncCommodity:
+        return self.commodity
+
+    def append_child(self, child):
+        if child.parent is not None:
+            child.parent.children.remove(child)
+        child.parent = self
+        self.children.append(child)
+
+    def get_parent(self):
+        return self.parent
+
+    def get_children(self) -> list:
+        return list(self.children)
+
+    def get_descendants(self) -> list:
+        """ALL the accounts under this one, depth-first"""
+        descendants = []
+        for child in self.children:
+            descendants.append(child)
+            descendants.extend(child.get_descendants())
+        return descendants
+
+    def lookup_by_name(self, name:str):
+        """same search as gnc_account_lookup_by_name: the immediate children first, then each child's descendants"""
+        for child in self.children:
+            if child.name == name:
+                return child
+        for child in self.children:
+            found = child.lookup_by_name(name)
+            if found is not None:
+                return found
+        return None
+
+    def get_full_name(self) -> str:
+        names = []
+        acct = self
+        while acct.parent is not None:
+            names.append(acct.name)
+            acct = acct.parent
+        return ':'.join(reversed(names))
+
+    def GetSplitList(self) -> list:
+        return list(self.splits)
+
+# END class Account
+
+
+class Split:
+    def __init__(self, p_book):
+        self.book = p_book
+        self.parent = None
+        self.account = None
+        self.value = GncNumeric()
+        self.amount = GncNumeric()
+        self.action = ''
+        self.memo = ''
+        self.reconcile = NREC
+
+    def SetParent(self, gtx):
+        if self.parent is not None:
+            self.parent.splits.remove(self)
+        self.parent = gtx
+        gtx.splits.append(self)
+
+    def GetParent(self):
+        return self.parent
+
+    def SetAccount(self, acct:Account):
+        self.account = acct
+
+    def GetAccount(self) -> Account:
+        return self.account
+
+    def SetValue(self, value:GncNumeric):
+        self.value = value
+
+    def GetValue(self) -> GncNumeric:
+        return self.value
+
+    def SetAmount(self, amount:GncNumeric):
+        self.amount = amount
+
+    def GetAmount(self) -> GncNumeric:
+        return self.amount
+
+    def SetAction(self, action:str):
+        self.action = action
+
+    def GetAction(self) -> str:
+        return self.action
+
+    def SetMemo(self, memo:str):
+        self.memo = memo
+
+    def GetMemo(self) -> str:
+        return self.memo
+
+    def SetReconcile(self, flag:str):
+        self.reconcile = flag
+
+    def GetReconcile(self) -> str:
+        return self.reconcile
+
+# END class Split
+
+
+class Transaction:
+    """
+    A new transaction only becomes part of the book at CommitEdit(): its splits are then added to their accounts.
+    RollbackEdit() drops the changes since BeginEdit(), which for a NEW transaction means the whole transaction.
+    """
+    def __init__(self, p_book):
+        self.book = p_book
+        self.guid = GUID()
+        self.currency = None
+        self.date = None
+        self.description = ''
+        self.notes = ''
+        self.splits = []
+        self.editing = False
+        self.committed = False
+
+    def GetGUID(self) -> GUID:
+        return self.guid
+
+    def BeginEdit(self):
+        self.editing = True
+
+    def CommitEdit(self):
+        if not self.editing:
+            raise Exception("CommitEdit() on a transaction that is NOT being edited!")
+        for spl in self.splits:
+            if spl.account is None:
+                raise Exception("Split with NO account in transaction '{}'!".format(self.description))
+            # the splits of a NEW transaction are not in any account yet: no search of the account splits
+            if not self.committed or spl not in spl.account.splits:
+                spl.account.splits.append(spl)
+        if not self.committed:
+            self.book.transactions.append(self)
+            self.committed = True
+        self.editing = False
+
+    def RollbackEdit(self):
+        if not self.editing:
+            raise Exception("RollbackEdit() on a transaction that is NOT being edited!")
+        if not self.committed:
+            for spl in self.splits:
+                spl.parent = None
+            self.splits = []
+            self.book.rollbacks += 1
+        self.editing = False
+
+    def SetCurrency(self, comm:GncCommodity):
+        self.currency = comm
+
+    def GetCurrency(self) -> GncCommodity:
+        return self.currency
+
+    def SetDate(self, day:int, month:int, year:int):
+        self.date = dt(year, month, day)
+
+    def GetDate(self):
+        return self.date
+
+    def SetDescription(self, desc:str):
+        self.description = desc
+
+    def GetDescription(self) -> str:
+        return self.description
+
+    def SetNotes(self, notes:str):
+        self.notes = notes
+
+    def GetNotes(self) -> str:
+        return self.notes
+
+    def GetSplitList(self) -> list:
+        return list(self.splits)
+
+    def CountSplits(self) -> int:
+        return len(self.splits)
+
+    def GetImbalanceValue(self) -> GncNumeric:
+        total = sum( (spl.value.as_fraction() for spl in self.splits), Fraction(0) )
+        return GncNumeric(total.numerator, total.denominator)
+
+    def IsBalanced(self) -> bool:
+        return self.GetImbalanceValue().zero_p()
+
+# END class Transaction
+
+
+class GncPrice:
+    def __init__(self, p_book):
+        self.book = p_book
+        self.time = None
+        self.commodity = None
+        self.currency = None
+        self.value = GncNumeric()
+        self.source = ''
+        self.typestr = ''
+
+    def begin_edit(self):
+        pass
+
+    def commit_edit(self):
+        pass
+
+    def set_time64(self, p_time):
+        self.time = p_time
+
+    def get_time64(self):
+        return self.time
+
+    def set_commodity(self, comm:GncCommodity):
+        self.commodity = comm
+
+    def get_commodity(self) -> GncCommodity:
+        return self.commodity
+
+    def set_currency(self, curr:GncCommodity):
+        self.currency = curr
+
+    def get_currency(self) -> GncCommodity:
+        return self.currency
+
+    def set_value(self, value:GncNumeric):
+        self.value = value
+
+    def get_value(self) -> GncNumeric:
+        return self.value
+
+    def set_source_string(self, source:str):
+        self.source = source
+
+    def get_source_string(self) -> str:
+        return self.source
+
+    def set_typestr(self, typestr:str):
+        self.typestr = typestr
+
+    def get_typestr(self) -> str:
+        return self.typestr
+
+# END class GncPrice
+
+
+class GncPriceDB:
+    """prices kept per (commodity, currency) pair"""
+    def __init__(self):
+        self._prices = {}
+        self.editing = False
+
+    def begin_edit(self):
+        self.editing = True
+
+    def commit_edit(self):
+        self.editing = False
+
+    @staticmethod
+    def _key(comm:GncCommodity, curr:GncCommodity) -> tuple:
+        return comm.get_namespace(), comm.get_mnemonic(), curr.get_namespace(), curr.get_mnemonic()
+
+    def add_price(self, price:GncPrice) -> bool:
+        self._prices.setdefault( self._key(price.commodity, price.currency), [] ).append(price)
+        return True
+
+    def remove_price(self, price:GncPrice) -> bool:
+        prices = self._prices.get( self._key(price.commodity, price.currency), [] )
+        if price not in prices:
+            return False
+        prices.remove(price)
+        return True
+
+    def get_prices(self, comm:GncCommodity, curr:GncCommodity) -> list:
+        """all the prices of the commodity in the currency, newest first"""
+        return sorted(self._prices.get(self._key(comm, curr), []), key=lambda pr: pr.time, reverse=True)
+
+    def get_num_prices(self) -> int:
+        return sum( len(prices) for prices in self._prices.values() )
+
+# END class GncPriceDB
+
+
+class Book:
+    def __init__(self):
+        self.root = Account(self)
+        self.root.SetName("Root Account")
+        self.price_db = GncPriceDB()
+        self.table = GncCommodityTable()
+        self.table.insert( GncCommodity(self, "Canadian Dollar", "ISO4217", "CAD", "124", 100) )
+        self.transactions = []
+        self.rollbacks = 0
+
+    def get_root_account(self) -> Account:
+        return self.root
+
+    def get_price_db(self) -> GncPriceDB:
+        return self.price_db
+
+    def get_table(self) -> GncCommodityTable:
+        return self.table
+
+    def get_stats(self) -> dict:
+        return { "transactions": len(self.transactions), "rollbacks": self.rollbacks,
+                 "prices": self.price_db.get_num_prices() }
+
+# END class Book
+
+
+class Session:
+    """
+    The book of each file name is kept in memory for the life of the process, so that a second session on the
+    same 'file' sees what the first one committed: whether it was saved or not, as nothing is written to disk.
+    A file name that has not been opened yet gets a NEW book with the Monarch account tree.
+    """
+    books = {}
+
+    def __init__(self, p_uri:str, p_mode=None):
+        if p_uri not in Session.books:
+            Session.books[p_uri] = new_monarch_book()
+        self.uri = p_uri
+        self.book = Session.books[p_uri]
+        self.saves = 0
+        self.ended = False
+
+    def save(self):
+        if self.ended:
+            raise Exception("save() on an ENDED session!")
+        self.saves += 1
+
+    def end(self):
+        self.ended = True
+
+    def destroy(self):
+        self.book = None
+
+    @classmethod
+    def forget(cls, p_uri:str = None):
+        """drop the book of one file name, or of ALL of them"""
+        if p_uri is None:
+            cls.books.clear()
+        else:
+            cls.books.pop(p_uri, None)
+
+# END class Session
+
+
+def add_account(p_parent:Account, p_name:str, p_commodity:GncCommodity) -> Account:
+    """:return: the child of p_parent named p_name, created if it is not there yet"""
+    for child in p_parent.children:
+        if child.name == p_name:
+            return child
+    acct = Account(p_parent.book)
+    acct.SetName(p_name)
+    acct.SetCommodity(p_commodity)
+    p_parent.append_child(acct)
+    return acct
+
+
+def add_path(p_root:Account, p_path:list, p_commodity:GncCommodity) -> Account:
+    acct = p_root
+    for name in p_path:
+        acct = add_account(acct, name, p_commodity)
+    return acct
+
+
+def new_monarch_book(p_owners=(MON_MARK, MON_LULU), p_plans=(PL_OPEN, PL_TFSA, PL_RRSP)) -> Book:
+    """
+    A book with the accounts that the Monarch import looks for, found the same way as in GnucashSession:
+      ACCT_PATHS[ASSET] + plan [+ owner] -> an asset account for EACH fund in FUNDS_LIST
+      ACCT_PATHS[REVENUE] + plan [+ owner]
+      ACCT_PATHS[TRUST] -> the Trust asset account ; TRUST -> the Trust revenue account
+      ACCT_PATHS[CARD] -> an account for EACH card in CARD_ACCTS ; ACCT_PATHS[EXPENSE]
+    """
+    book = Book()
+    root = book.get_root_account()
+    cad = book.get_table().lookup("ISO4217", "CAD")
+    funds = { fund: book.get_table().insert(GncCommodity(book, fund, "FUND", fund)) for fund in FUNDS_LIST }
+
+    for plan_type in p_plans:
+        owner_paths = [[]] if plan_type == PL_OPEN else [ [ACCT_PATHS[owner]] for owner in p_owners ]
+        for owner_path in owner_paths:
+            add_path(root, ACCT_PATHS[REVENUE] + [plan_type] + owner_path, cad)
+            ast_parent = add_path(root, ACCT_PATHS[ASSET] + [plan_type] + owner_path, cad)
+            for fund, comm in funds.items():
+                add_account(ast_parent, fund, comm)
+
+    trust_parent = add_path(root, ACCT_PATHS[TRUST], cad)
+    add_account(trust_parent, TRUST_AST_ACCT, funds[TRUST_AST_ACCT])
+    add_path(root, [TRUST, "Trust Revenue", TRUST_REV_ACCT], cad)
+
+    card_parent = add_path(root, ACCT_PATHS[CARD], cad)
+    for card in CARD_ACCTS:
+        add_account(card_parent, card, cad)
+    add_path(root, ACCT_PATHS[EXPENSE], cad)
+    return book
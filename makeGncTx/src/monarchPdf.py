@@ -0,0 +1,390 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# monarchPdf.py -- read the trades, and the prices of a Quarterly report, STRAIGHT from a Monarch pdf report:
+#                  the table rows are rebuilt from the coordinates of the words and blocks found by pymupdf,
+#                  with no text file in between and no counting of the lines of a tx
+#
+#   python3 monarchPdf.py <monarch pdf file> <mode: prod|test> [gnucash file]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+from functools import lru_cache
+from Configuration import *
+from monarchTokens import *
+from monarchStream import MonarchStream, collect_record
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+TX_DETAILS: str = "Transaction Details"
+OWNERS: str     = OWNER + "(s):"
+# only the pages from the first one with one of these are decoded
+PDF_MARKERS = (CLIENT_TX, TX_DETAILS)
+
+# the fields of a pymupdf word: (x0, y0, x1, y1, text, block number, line number, word number)
+W_X0    = 0
+W_Y0    = 1
+W_X1    = 2
+W_Y1    = 3
+W_TEXT  = 4
+W_BLOCK = 5
+
+# words on the same visual line start at most this far apart vertically, in points
+LINE_TOLERANCE = 3.0
+# a wider gap between two words of a line starts a new cell, e.g. 'Gross Amount' is ONE header cell
+CELL_GAP = 8.0
+# a number is right-aligned to the header of its column
+ALIGN_TOLERANCE = 6.0
+
+# the headers of the numeric columns, in the Transaction reports and the Quarterly reports
+HEADER_FIELDS = {
+    GROSS           : GROSS    ,
+    GROSS+" Amount" : GROSS    ,
+    NET             : NET      ,
+    NET+" Amount"   : NET      ,
+    UNITS           : UNITS    ,
+    PRICE           : PRICE    ,
+    "Unit "+PRICE   : PRICE    ,
+    UNIT_BAL        : UNIT_BAL ,
+    "Total "+UNITS  : UNIT_BAL
+}
+TRADE_DATE_HDR: str = TRADE_DATE
+SUMMARY_HDR: str    = "Investments"
+TOTAL: str          = "Total"
+
+# the descriptions that GnucashSession looks for
+PDF_TX_TYPES = {
+    "Switch-In"  : SW_IN ,
+    "Switch-Out" : SW_OUT
+}
+
+PDF_DATE_FORMATS = ("%m/%d/%Y", "%b %d, %Y")
+
+
+# a report has few distinct dates, so each date is converted ONCE
+@lru_cache(maxsize=1024)
+def pdf_date(text:str):
+    """:return: the datetime.date of '01/25/2019' OR 'Jan 25, 2019', or None if text is NOT a date"""
+    for fmt in PDF_DATE_FORMATS:
+        try:
+            return dt.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def is_amount(text:str) -> bool:
+    """:return: True if text looks like a currency or unit amount, e.g. '$1,234.56', '($956.67)' or '-26.5051'"""
+    return text[:1] in "$(-0123456789" and text[-1:] in ")0123456789"
+
+
+class PdfLine:
+    """
+    The words of a page at the same height, left to right
+      page: page number ; words: pymupdf word tuples, see W_X0 etc
+    """
+    __slots__ = ('page', 'words', 'text')
+
+    def __init__(self, p_page:int, p_words:list):
+        self.page = p_page
+        self.words = p_words
+        self.text = ' '.join(word[W_TEXT] for word in p_words)
+
+    def cells(self) -> list:
+        """:return: list of (x0, x1, text) of the groups of words separated by more than CELL_GAP"""
+        cells = []
+        for word in self.words:
+            if cells and word[W_X0] - cells[-1][1] <= CELL_GAP:
+                x0, _, text = cells[-1]
+                cells[-1] = (x0, word[W_X1], text + ' ' + word[W_TEXT])
+            else:
+                cells.append( (word[W_X0], word[W_X1], word[W_TEXT]) )
+        return cells
+
+    def __repr__(self):
+        return "PdfLine(page {} @ {:.0f}: {})".format(self.page, self.words[0][W_Y0], self.text)
+
+# END class PdfLine
+
+
+def page_lines(p_page:int, p_words:list) -> list:
+    """:return: list of the PdfLines of a page, top to bottom"""
+    lines = []
+    line_y = None
+    for word in sorted(p_words, key=lambda w: (w[W_Y0], w[W_X0])):
+        if line_y is not None and word[W_Y0] - line_y <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            line_y = word[W_Y0]
+            lines.append([word])
+    return [ PdfLine(p_page, sorted(words, key=lambda w: w[W_X0])) for words in lines ]
+
+
+def section_pages(p_doc, p_markers=PDF_MARKERS):
+    """
+    Decode the pages lazily: until a page with one of the markers turns up, each page is ONLY searched for them,
+    after that the words of each page are extracted -- the txs of a plan often continue on pages WITHOUT a marker.
+    The pages after the point where the consumer stops, e.g. at the Disclosure, are never even loaded.
+    :param    p_doc: open pymupdf.Document
+    :param p_markers: strings that start the part of the report with the txs
+    :return: generator of (page number, list of the words of the page)
+    """
+    in_section = False
+    for page in p_doc:
+        # ONE text page for the search AND the words
+        textpage = page.get_textpage()
+        if not in_section:
+            in_section = any( page.search_for(marker, textpage=textpage) for marker in p_markers )
+            if not in_section:
+                continue
+        yield page.number, page.get_text("words", textpage=textpage)
+
+
+class PdfLayoutStream(MonarchStream):
+    """
+    Trades and prices from the pages of a pdf Monarch Transaction Report OR Quarterly Report:
+      plan line: 'Plan Type: OPEN (Joint)...' OR 'OPEN 78512 (Joint)...' ; 'Owner(s):' line
+      fund line: '...Investments/CIG 11461-Signature...' OR 'CI Investments - 11111 - Signature...'
+      header line: 'Trade Date' cell, then the Description/Activity cell, then the numeric columns
+      tx row: date in the Trade Date column ; each number is right-aligned to its header and the Description is
+              the rest of the words in the BLOCK of the date, which may be above or below the line of the date
+      Quarterly 'Investments ... Price ...' summary: price of the fund named in the block to the left of the price
+    The events come from the lines of the pages found by section_pages(), e.g. events(section_pages(doc)).
+    """
+    def __init__(self):
+        super().__init__()
+        self.doc_date = None
+        self.fund_company = None
+        self.fund_code = None
+        self.pages = 0
+        self.finished = False
+        self.problems = []
+        # the words of the current page, by block
+        self.blocks = {}
+        # the current table of txs: left edge of the Description column ; (right edge, field) of each numeric column
+        self.desc_x0 = None
+        self.columns = []
+        # the current summary of a Quarterly report: right edge of the Price column ; left edge of the Account column
+        self.summary = False
+        self.price_x1 = None
+        self.acct_x0 = None
+
+    def events(self, p_pages):
+        """
+        :param p_pages: iterable of (page number, list of pymupdf words), e.g. section_pages() of a document
+        :return generator of MonarchEvent
+        """
+        for page_num, words in p_pages:
+            self.pages += 1
+            self.blocks = {}
+            for word in words:
+                self.blocks.setdefault(word[W_BLOCK], []).append(word)
+            for line in page_lines(page_num, words):
+                self.line_num += 1
+                yield from self.parse_line(line)
+                if self.finished:
+                    return
+
+    def parse_line(self, line:PdfLine):
+        text = line.text
+        if RE_QTR_FINISH.match(text):
+            self.finished = True
+            return ()
+
+        re_match = RE_QTR_DATE.match(text)
+        if re_match:
+            self.doc_date = dt.strptime("{} {} {}".format(*re_match.group(2, 3, 4)), "%b %d %Y").date()
+            return ()
+
+        re_match = RE_LAYOUT_PLAN.match(text)
+        if re_match:
+            self.plan_type = re_match.group(1) or re_match.group(2)
+            self.summary = False
+            print_info("\n\t\u0022Current plan_type: {}\u0022".format(self.plan_type), MAGENTA)
+            return ()
+
+        if text.startswith(OWNERS):
+            cells = line.cells()
+            names = cells[1][2].split(", ") if len(cells) > 1 else []
+            # a joint plan lists ALL the owners
+            if len(names) == 1:
+                self.owner = names[0]
+                print_info("Current owner: {}".format(self.owner), GREEN)
+            return ()
+
+        cells = line.cells()
+        first = cells[0][2]
+        if first == TRADE_DATE_HDR and len(cells) > 2:
+            self.desc_x0 = cells[1][0]
+            # a column that is NOT needed, e.g. Charges, has field '' so that its numbers are NOT taken as Description
+            self.columns = [ (x1, HEADER_FIELDS.get(label, '')) for _, x1, label in cells[2:] ]
+            self.summary = False
+            return ()
+        if first == SUMMARY_HDR and any(cell[2] == PRICE for cell in cells):
+            self.acct_x0 = cells[1][0]
+            self.price_x1 = next(x1 for _, x1, label in cells if label == PRICE)
+            self.summary = True
+            return ()
+        if first == TOTAL or text.startswith(TX_DETAILS):
+            self.summary = False
+            return ()
+
+        if self.summary:
+            return self.price_event(line)
+
+        re_match = RE_LAYOUT_FUND.search(text) or RE_LAYOUT_QFUND.match(text)
+        if re_match:
+            self.set_fund(*re_match.groups())
+            return ()
+
+        if self.columns:
+            return self.trade_event(line)
+        return ()
+
+    def set_fund(self, p_company:str, p_code:str):
+        """:param p_company: code of the company in a Transaction report OR its name in a Quarterly report"""
+        self.fund_company = p_company if p_company in COMPANY_NAME else FUND_NAME_CODE.get(p_company.split()[0], p_company)
+        self.fund_code = p_code
+        print_info("Current fund: {} {}".format(self.fund_company, self.fund_code), BLUE)
+
+    def column_of(self, p_word):
+        """:return: the field of the numeric column that p_word is aligned to, '' for an unused column, or None"""
+        if not is_amount(p_word[W_TEXT]):
+            return None
+        for x1, field in self.columns:
+            if abs(p_word[W_X1] - x1) <= ALIGN_TOLERANCE:
+                return field
+        return None
+
+    def trade_event(self, line:PdfLine):
+        date_words = [ word[W_TEXT] for word in line.words if word[W_X1] < self.desc_x0 ]
+        tx_date = pdf_date(' '.join(date_words)) if date_words else None
+        if tx_date is None:
+            return ()
+
+        curr_tx = {TRADE_DATE: tx_date}
+        for word in line.words:
+            field = self.column_of(word)
+            if field:
+                curr_tx[field] = word[W_TEXT]
+        if GROSS not in curr_tx:
+            # e.g. the Opening Unit Balance
+            return ()
+        if self.fund_company is None:
+            raise Exception("Found a tx date on page {} BEFORE any fund!".format(line.page))
+
+        # the Description is in the block of the date, maybe on the lines above AND below it
+        block = self.blocks[line.words[0][W_BLOCK]]
+        desc_words = { id(word): word for word in block + line.words
+                       if word[W_X0] >= self.desc_x0 - LINE_TOLERANCE and self.column_of(word) is None }
+        desc = ' '.join( word[W_TEXT] for word in sorted(desc_words.values(), key=lambda w: (w[W_Y0], w[W_X0])) )
+        curr_tx[DESC] = PDF_TX_TYPES.get(desc, desc)
+        curr_tx[FUND_CMPY] = self.fund_company
+        curr_tx[FUND_CODE] = self.fund_code
+        print_debug(LogMsg("curr_tx = {}", curr_tx))
+        try:
+            record = TxRecord.from_dict(curr_tx)
+        except ValueError as tve:
+            self.problems.append("page {}: {} {}".format(line.page, repr(tve), line.text))
+            print_error("SKIPPED tx on page {}: {}".format(line.page, repr(tve)))
+            return ()
+        return ( self.event(TRADE, record), )
+
+    def price_event(self, line:PdfLine):
+        prices = [ word for word in line.words
+                   if word[W_TEXT].startswith(DOLLARS) and abs(word[W_X1] - self.price_x1) <= ALIGN_TOLERANCE ]
+        if not prices:
+            return ()
+        price = prices[0]
+        middle = (price[W_Y0] + price[W_Y1]) / 2
+        # the name of the fund is the block to the LEFT of the price that spans its height
+        for words in self.blocks.values():
+            if all( word[W_X1] < self.acct_x0 for word in words ) and \
+                    min(word[W_Y0] for word in words) <= middle <= max(word[W_Y1] for word in words):
+                name = ' '.join(word[W_TEXT] for word in words)
+                break
+        else:
+            name = ''
+        re_match = RE_LAYOUT_QFUND.match(name)
+        if not re_match or self.doc_date is None:
+            self.problems.append("page {}: NO fund or date for price {} in '{}'".format(line.page, price[W_TEXT], name))
+            print_error(self.problems[-1])
+            return ()
+        self.set_fund(*re_match.groups())
+        curr_tx = {TRADE_DATE: self.doc_date, FUND_CMPY: self.fund_company, FUND_CODE: self.fund_code,
+                   PRICE: price[W_TEXT]}
+        return ( self.event(PRICE, PriceRecord.from_dict(curr_tx)), )
+
+    def read_file(self, file_name:str):
+        """generator of the MonarchEvents from a pdf report, which is closed when the stream is finished"""
+        if pymupdf is None:
+            raise ImportError("Package pymupdf is needed to read the pdf reports!")
+        with pymupdf.open(file_name) as doc:
+            yield from self.events(section_pages(doc))
+
+# END class PdfLayoutStream
+
+
+def parse_monarch_pdf_main(args:list):
+    usage = "usage: python3 monarchPdf.py <monarch pdf file> <mode: prod|test> [gnucash file]"
+    if len(args) < 2:
+        print_error("NOT ENOUGH parameters!")
+        print_info(usage, MAGENTA)
+        exit(283)
+
+    pdf_file = args[0]
+    if not osp.isfile(pdf_file):
+        print_error("File path '{}' does not exist. Exiting...".format(pdf_file))
+        print_info(usage, GREEN)
+        exit(289)
+    print_info("pdf_file = {}".format(pdf_file))
+
+    mode = args[1].upper()
+    gnc_file = args[2] if len(args) > 2 else None
+
+    try:
+        if pymupdf is None:
+            raise ImportError("Package pymupdf is needed to read the pdf reports!")
+        stream = PdfLayoutStream()
+        with pymupdf.open(pdf_file) as doc:
+            record = collect_record(stream, section_pages(doc))
+            print_info("Decoded {} of {} pages.".format(stream.pages, doc.page_count), GREEN)
+        record.set_filename(pdf_file)
+        if stream.doc_date is not None:
+            record.set_date( dt.combine(stream.doc_date, dt.min.time()) )
+        print_info("Investment record size = {}".format(record.get_size()), GREEN)
+        if stream.problems:
+            for problem in stream.problems:
+                print_error(problem)
+            raise Exception("{} BAD row(s) in '{}': NOTHING was written!".format(len(stream.problems), pdf_file))
+
+        msg = TEST
+        if mode == PROD:
+            out_file = GncUtilities.save_to_json(osp.splitext(pdf_file)[0], record.to_json(), strnow)
+            msg = "monarchPdf created file: {}".format(out_file)
+
+        if gnc_file:
+            from gnucashSession import GnucashSession
+            gncs = GnucashSession(record, mode, gnc_file, False, BOTH)
+            msg = gncs.prepare_session()
+
+    except Exception as pmpe:
+        msg = "parse_monarch_pdf_main() EXCEPTION!! '{}'".format(repr(pmpe))
+        print_error(msg)
+
+    print_info("\n >>> PROGRAM ENDED.", GREEN)
+    return msg
+
+
+if __name__ == '__main__':
+    import sys
+    parse_monarch_pdf_main(sys.argv[1:])
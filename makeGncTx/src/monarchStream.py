@@ -0,0 +1,323 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# monarchStream.py -- line-by-line Monarch report parsers that YIELD each trade or price as soon as it is read,
+#                     keeping only the current owner/plan/fund state instead of a whole InvestmentRecord
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+from Configuration import *
+from monarchTokens import *
+
+# first-word dispatch for the lines of a copied Monarch report
+TOKENIZER = LineTokenizer(FUND_NAME_CODE)
+
+
+class MonarchEvent:
+    """
+    One trade or price found in a Monarch report
+      tx_type: TRADE or PRICE ; record: TxRecord or PriceRecord (or a dict for the older parsers)
+      line: number of the line in the report where the tx was completed
+    """
+    __slots__ = ('tx_type', 'plan_type', 'owner', 'record', 'line')
+
+    def __init__(self, p_type:str, p_plan:str, p_owner:str, p_record, p_line:int):
+        self.tx_type = p_type
+        self.plan_type = p_plan
+        self.owner = p_owner
+        self.record = p_record
+        self.line = p_line
+
+    def __repr__(self):
+        return "MonarchEvent({} {} @ {}: {})".format(self.plan_type, self.tx_type, self.line, self.record)
+
+# END class MonarchEvent
+
+
+class MonarchStream:
+    """
+    Base of the streaming parsers: feed the lines of a report to events() and get back a MonarchEvent
+    for each trade or price. The parser state is kept in the object so that a consumer can check the
+    current owner or plan at any time.
+    """
+    def __init__(self):
+        self.owner = None
+        self.plan_type = UNKNOWN
+        self.state = STATE_SEARCH
+        self.line_num = 0
+
+    def event(self, p_type:str, p_record) -> MonarchEvent:
+        return MonarchEvent(p_type, self.plan_type, self.owner, p_record, self.line_num)
+
+    def events(self, p_lines):
+        """
+        :param p_lines: any iterable of lines, e.g. an open file
+        :return generator of MonarchEvent
+        """
+        for line in p_lines:
+            yield from self.feed(line)
+
+    def feed(self, line:str):
+        """
+        The next line of the report, for a reader that gets the lines one at a time, e.g. from a pipe
+        :return iterable of the MonarchEvents completed by this line
+        """
+        self.line_num += 1
+        return self.parse_line(line)
+
+    def parse_line(self, line:str):
+        """:return iterable of the MonarchEvents completed by this line"""
+        raise NotImplementedError
+
+    def read_file(self, file_name:str):
+        """generator of the MonarchEvents from a report file, which is closed when the stream is finished"""
+        with open(file_name) as fp:
+            yield from self.events(fp)
+
+# END class MonarchStream
+
+
+def collect_record(p_stream:MonarchStream, p_lines, p_record=None):
+    """
+    Gather ALL the events of a stream into an InvestmentRecord
+    :param p_stream: MonarchStream
+    :param  p_lines: iterable of lines
+    :param p_record: record to add to, or None for a new Configuration.InvestmentRecord
+    :return: the record
+    """
+    record = InvestmentRecord() if p_record is None else p_record
+    for evt in p_stream.events(p_lines):
+        record.add_tx(evt.plan_type, evt.tx_type, evt.record)
+    if p_stream.owner is not None:
+        record.set_owner(p_stream.owner)
+    return record
+
+
+class PdfTxStream(MonarchStream):
+    """
+    Trades from the text extracted from a pdf Monarch Transaction Report:
+      'Plan Type:' -> next line is either 'OPEN...', 'TFSA...' or 'RRSP...'
+      '$INVESTMENT_COMPANY/$MF_NAME-...' -> $MF_NAME is the Fund Code
+      date 'MM/DD/YYYY' -> then 2 lines of Description, Gross, Net, Units, Price, Unit Balance
+    A tx whose fields are NOT proper values, e.g. because the description took more or fewer lines than expected,
+    is NOT yielded but kept in problems, so the caller can see that the record is missing it
+    """
+    def __init__(self):
+        super().__init__()
+        self.problems = []
+        self.own_line = 0
+        self.tx_line = 0
+        self.fund_company = None
+        self.fund_code = None
+        self.curr_tx = None
+
+    def parse_line(self, line:str):
+        if GNULOG.is_enabled(LOG_DEBUG):
+            for it in line.split():
+                print_debug(LogMsg("it = {}", it))
+
+        if self.state == STATE_SEARCH:
+            re_match = RE_PDF_PLAN.match(line)
+            if re_match:
+                self.plan_type = re_match.group(1)
+                print_info("\n\t\u0022Current plan_type: {}\u0022".format(self.plan_type), MAGENTA)
+                self.state = FIND_OWNER
+                return ()
+
+        if self.state == FIND_OWNER:
+            if self.own_line == 0:
+                if RE_PDF_OWNER.match(line):
+                    self.own_line += 1
+            else:
+                self.owner = line.strip()
+                print_info("Current owner_name: {}".format(self.owner), GREEN)
+                self.own_line = 0
+                self.state = FIND_FUND
+            return ()
+
+        if self.state <= FIND_FUND:
+            re_match = RE_PDF_FUND.match(line)
+            if re_match:
+                self.fund_company = re_match.group(1)
+                self.fund_code = re_match.group(2)
+                print_info("Current fund: {}".format(self.fund_company + " " + self.fund_code), BLUE)
+                self.state = FIND_NEXT_TX
+                return ()
+
+        if self.state <= FIND_NEXT_TX:
+            re_match = RE_DATE_MDY.match(line)
+            if re_match:
+                tx_date = re_match.group(1)
+                if self.fund_company is None:
+                    raise Exception("Found a tx date at line {} BEFORE any fund!".format(self.line_num))
+                print_info("FOUND a NEW tx! Date: {}".format(tx_date), YELLOW)
+                self.curr_tx = {FUND_CMPY: self.fund_company, FUND_CODE: self.fund_code, TRADE_DATE: tx_date, DESC: ''}
+                self.state = FILL_CURR_TX
+                return ()
+
+        if self.state == FILL_CURR_TX:
+            return self.fill_tx(line.strip())
+
+        return ()
+
+    def fill_tx(self, entry:str):
+        curr_tx = self.curr_tx
+        self.tx_line += 1
+        if self.tx_line < 3:
+            if entry == AUTO_SYS or entry == INTRF_IN:
+                # back up by one as have one MORE line of DESCRIPTION for AUTO_SYS and INTRF_IN cases
+                self.tx_line -= 1
+            elif entry == SW_IN or entry == SW_OUT or entry == FEE:
+                # move forward by one because one FEWER line of DESCRIPTION for these cases
+                self.tx_line += 1
+            # TODO: match number to proceed to looking for GROSS?
+            curr_tx[DESC] += (entry + ":")
+            return ()
+        if self.tx_line == 3:
+            print_info("curr_tx[DESC]: {}".format(curr_tx[DESC]))
+            curr_tx[GROSS] = entry
+            print_info("curr_tx[GROSS]: {}".format(curr_tx[GROSS]))
+        if self.tx_line == 4:
+            curr_tx[NET] = entry
+            if curr_tx[NET] != curr_tx[GROSS]:
+                print_info("curr_tx[NET]: {}".format(curr_tx[NET]))
+                print_error("\n>>> PROBLEM!!! GROSS and NET do NOT match!!!\n")
+                return ()
+        if self.tx_line == 5:
+            curr_tx[UNITS] = entry
+            print_info("curr_tx[UNITS]: {}".format(curr_tx[UNITS]))
+        if self.tx_line == 6:
+            curr_tx[PRICE] = entry
+            print_info("curr_tx[PRICE]: {}".format(curr_tx[PRICE]))
+        if self.tx_line == 7:
+            curr_tx[UNIT_BAL] = entry
+            print_info("curr_tx[UNIT_BAL]: {}".format(curr_tx[UNIT_BAL]))
+            self.state = STATE_SEARCH
+            self.tx_line = 0
+            try:
+                record = TxRecord.from_dict(curr_tx)
+            except ValueError as tve:
+                # the description took more or fewer lines than expected and the fields are out of place
+                self.problems.append("tx ending at line {}: {} {}".format(self.line_num, repr(tve), curr_tx))
+                print_error("SKIPPED " + self.problems[-1])
+                return ()
+            print_info('ADD current Tx to Collection!', GREEN)
+            return ( self.event(TRADE, record), )
+        return ()
+
+# END class PdfTxStream
+
+
+class CopyTxStream(MonarchStream):
+    """
+    Trades from a Monarch Transaction Report COPIED from the Monarch web page, ~ May 31, 2019:
+      1st line: owner
+      TRANSACTIONS line: plan type = wd[1]
+      date line: date, type = wd[1], units = wd[-1], price = wd[-2], gross = wd[-4], load = wd[-5],
+                 code = wd[-7], company = wd[-8]
+    """
+    def __init__(self):
+        super().__init__()
+        self.state = FIND_OWNER
+
+    def parse_line(self, line:str):
+        print_info("Line {}".format(self.line_num))
+        if self.state == FIND_OWNER:
+            self.owner = line.strip()
+            print_info("\n\t\u0022Current owner: {}\u0022".format(self.owner), MAGENTA)
+            self.state = STATE_SEARCH
+            return ()
+
+        kind, words, re_match = TOKENIZER.tokenize(line)
+        if kind == TOK_TXS:
+            self.plan_type = words[1]
+            print_info("\n\t\u0022Current plan_type: {}\u0022".format(self.plan_type), MAGENTA)
+            return ()
+
+        if kind == TOK_DATE and len(words) > 2:
+            tx_date = re_match.group(1)
+            print_info("FOUND a NEW tx! Date: {}".format(tx_date), YELLOW)
+            curr_tx = {TRADE_DATE: tx_date}
+
+            tx_type = words[1]
+            curr_tx[DESC] = TX_TYPES[words[2]] if tx_type == INTRCL else TX_TYPES[tx_type]
+            print_info("curr_tx[DESC]: {}".format(curr_tx[DESC]))
+            curr_tx[GROSS] = words[-4]
+            print_info("curr_tx[GROSS]: {}".format(curr_tx[GROSS]))
+            curr_tx[UNITS] = words[-1]
+            print_info("curr_tx[UNITS]: {}".format(curr_tx[UNITS]))
+            curr_tx[PRICE] = words[-2]
+            print_info("curr_tx[PRICE]: {}".format(curr_tx[PRICE]))
+            curr_tx[LOAD] = words[-5]
+            print_info("curr_tx[LOAD]: {}".format(curr_tx[LOAD]))
+            curr_tx[FUND_CODE] = words[-7]
+            print_info("curr_tx[FUND_CODE]: {}".format(curr_tx[FUND_CODE]))
+            curr_tx[FUND_CMPY] = words[-8]
+            print_info("curr_tx[FUND_CMPY]: {}".format(curr_tx[FUND_CMPY]))
+
+            print_info('ADD current Tx to Collection!', GREEN)
+            return ( self.event(TRADE, TxRecord.from_dict(curr_tx)), )
+
+        return ()
+
+# END class CopyTxStream
+
+
+class FundsStream(MonarchStream):
+    """
+    Prices and final balances from a Monarch Funds Report COPIED from the Monarch web page:
+      1st line: owner ; then the document date
+      FUND line: plan type = wd[2]
+      fund company line: fund = wd[-10], balance = wd[-8], price = wd[-7]
+    """
+    def __init__(self):
+        super().__init__()
+        self.state = FIND_OWNER
+        self.doc_date = None
+
+    def parse_line(self, line:str):
+        print_info("Line {}".format(self.line_num))
+        if self.state == FIND_OWNER:
+            self.owner = line.strip()
+            print_info("\n\t\u0022Current owner: {}\u0022".format(self.owner), MAGENTA)
+            self.state = FIND_DATE
+            return ()
+
+        kind, words, re_match = TOKENIZER.tokenize(line)
+        if kind == TOK_EMPTY:
+            return ()
+
+        if self.state == FIND_DATE:
+            if kind == TOK_DATE:
+                self.doc_date = re_match.group(1)
+                print_info("Document date: {}".format(self.doc_date), YELLOW)
+                self.state = STATE_SEARCH
+
+        if kind == TOK_FUND:
+            self.plan_type = words[2]
+            print_info("\n\t\u0022Current plan_type: {}\u0022".format(self.plan_type), MAGENTA)
+            return ()
+
+        if kind == TOK_COMPANY:
+            fd_co = words[0]
+            print_info("Fund company = {}".format(fd_co))
+            fund = words[-10].replace('-', ' ')
+            print_info("Fund = {}".format(fund))
+            bal = words[-8]
+            print_info("Final balance = {}".format(bal))
+            price = words[-7]
+            print_info("Final price = {}".format(price))
+
+            curr_tx = {TRADE_DATE: self.doc_date, FUND_CMPY: fd_co, FUND: fund, UNIT_BAL: bal, PRICE: price}
+            print_info('ADD current Tx to Collection!', GREEN)
+            return ( self.event(PRICE, PriceRecord.from_dict(curr_tx)), )
+
+        return ()
+
+# END class FundsStream
@@ -0,0 +1,90 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# monarchTokens.py -- precompiled regex patterns and a first-word line tokenizer shared by all the Monarch parsers
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import re
+
+# dates: '07-Jun-2019' in the copied reports ; '01/11/2019' in the text extracted from pdf reports
+RE_DATE_DMY = re.compile(r"([0-9]{2}-\w{3}-[0-9]{4})")
+RE_DATE_MDY = re.compile(r".*([0-9]{2}/[0-9]{2}/[0-9]{4}).*")
+
+# amounts -- NOTE: RE_DOLLARS will match (leading minus sign) OR (amount is in parentheses) if a NEGATIVE number
+RE_DOLLARS = re.compile(r"([-(]?)\$([0-9,]{1,6})\.([0-9]{2}).*")
+RE_UNITS   = re.compile(r"(-?)([0-9]{1,5})\.([0-9]{4}).*")
+
+# text extracted from pdf Transaction reports
+RE_PDF_OWNER = re.compile(r".*(Owner).*")
+RE_PDF_PLAN  = re.compile(r"([OPENTFSAR]{4})(\s?.*)")
+RE_PDF_FUND  = re.compile(r".*([A-Z]{3})\s?([0-9]{3,5}).*")
+
+# text extracted from pdf Quarterly reports
+RE_QTR_DATE    = re.compile(r"^For the period (.*) to (\w{3}) (\d{1,2}), (\d{4})")
+RE_QTR_START   = re.compile(r"^Page 1.*")
+RE_QTR_COMP1   = re.compile(r"^(.*) - ([0-9ATL]{3,5}).*")
+RE_QTR_COMP2   = re.compile(r"^(- )?(\d{3,5}) - (.*)")
+RE_QTR_PRICE   = re.compile(r"^\$([0-9,]{1,5})\.(\d{2,4}).*")
+RE_QTR_PLAN    = re.compile(r"(OPEN|TFSA|RRSP)(\s?.*)")
+RE_QTR_ENDPLAN = re.compile(r"^Transaction Details.*")
+RE_QTR_FINISH  = re.compile(r"^Disclosure.*")
+
+# lines rebuilt from the word coordinates of the pdf reports, see monarchPdf.py
+RE_LAYOUT_PLAN  = re.compile(r"^(?:Plan Type: (OPEN|TFSA|RRSP)|(OPEN|TFSA|RRSP) \d+ )")
+RE_LAYOUT_FUND  = re.compile(r"/([A-Z]{3}) ?([0-9]{3,5})-")
+RE_LAYOUT_QFUND = re.compile(r"^(\D+?) - (?:[A-Z]{3} - )?([0-9]{3,5}) -")
+
+# kinds of line, from the first word
+TOK_EMPTY   = 0
+TOK_OTHER   = 1
+TOK_DATE    = 2
+TOK_FUND    = 3
+TOK_COMPANY = 4
+TOK_TXS     = 5
+
+FUND_WORD: str = "FUND"
+TXS_WORD: str  = "TRANSACTIONS"
+
+
+def match_date(word:str):
+    """:return the RE_DATE_DMY match of word, checking the cheap things first"""
+    if len(word) < 11 or word[2] != '-' or not word[0].isdigit():
+        return None
+    return RE_DATE_DMY.match(word)
+
+
+class LineTokenizer:
+    """
+    Split a line of a copied Monarch report into words and find the kind of line from the FIRST word ONLY:
+      date, FUND, fund company, TRANSACTIONS or other
+    a dict lookup replaces trying several regexes in sequence on every line
+    """
+    def __init__(self, p_companies=()):
+        self.dispatch = { FUND_WORD:TOK_FUND, TXS_WORD:TOK_TXS }
+        for company in p_companies:
+            self.dispatch[company] = TOK_COMPANY
+
+    def tokenize(self, line:str):
+        """
+        :return (kind of line, list of words, date match if a date line else None)
+        """
+        words = line.split()
+        if not words:
+            return TOK_EMPTY, words, None
+        first = words[0]
+        kind = self.dispatch.get(first)
+        if kind is not None:
+            return kind, words, None
+        date_match = match_date(first)
+        if date_match:
+            return TOK_DATE, words, date_match
+        return TOK_OTHER, words, None
+
+# END class LineTokenizer
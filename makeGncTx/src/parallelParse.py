@@ -0,0 +1,128 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# parallelParse.py -- parse many Monarch report files across a pool of processes,
+#                     then merge the records in the ORIGINAL file order
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from Configuration import *
+from parseMonarchTxRep import parse_pdf_txs, parse_copy_txs
+
+# report format -> parse function: each one takes (file name, timestamp) and returns an InvestmentRecord
+PARSERS = {
+    "pdf"  : parse_pdf_txs ,
+    # the record WITHOUT the txs that can NOT be read, instead of a failed file
+    "pdf-partial" : partial(parse_pdf_txs, p_partial=True) ,
+    "copy" : parse_copy_txs
+}
+
+
+class ParseResult:
+    """
+    Outcome of parsing ONE file: the record, OR the error if the parse failed.
+    Plain attributes only so that it pickles back from a worker process.
+    """
+    __slots__ = ('filename', 'record', 'error')
+
+    def __init__(self, p_fname:str, p_record=None, p_error:str = None):
+        self.filename = p_fname
+        self.record = p_record
+        self.error = p_error
+
+    def __getstate__(self):
+        return self.filename, self.record, self.error
+
+    def __setstate__(self, state):
+        self.filename, self.record, self.error = state
+
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        return "ParseResult({}: {})".format(self.filename, "OK" if self.ok() else self.error)
+
+# END class ParseResult
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def _init_worker(p_level:int):
+    # the workers all print to the same console: keep them quiet unless asked
+    GNULOG.set_level(p_level)
+
+
+def _guarded_parse(p_func, p_args:tuple, p_fname:str) -> ParseResult:
+    """Run the parse function on one file and catch ANY failure so that it is reported for that file only."""
+    try:
+        return ParseResult(p_fname, p_func(p_fname, *p_args))
+    except Exception as pex:
+        return ParseResult(p_fname, p_error=repr(pex))
+
+
+def parse_in_pool(p_files:list, p_func, p_jobs:int = None, p_args:tuple = (), p_level:int = LOG_ERROR) -> list:
+    """
+    Parse each file with p_func(file, *p_args) using up to p_jobs processes.
+    :param   p_files: files to parse
+    :param    p_func: MODULE-LEVEL function so that it can be sent to the workers
+    :param    p_jobs: number of worker processes; 1 parses in THIS process
+    :param    p_args: extra picklable arguments for p_func
+    :param   p_level: Gnulog level in the workers
+    :return list of ParseResult in the SAME order as p_files
+    """
+    jobs = default_jobs() if p_jobs is None else max(1, p_jobs)
+    work = partial(_guarded_parse, p_func, p_args)
+    if jobs == 1 or len(p_files) <= 1:
+        return [work(fname) for fname in p_files]
+
+    jobs = min(jobs, len(p_files))
+    # several files per task so that the small reports do not each pay a round trip to a worker
+    chunk = max(1, len(p_files) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(p_level,)) as pool:
+        return list( pool.map(work, p_files, chunksize=chunk) )
+
+
+def parse_reports(p_files:list, p_format:str = "pdf", p_jobs:int = None, p_level:int = LOG_ERROR) -> list:
+    """Parse Monarch report text files of one format in parallel: see PARSERS for the formats."""
+    if p_format not in PARSERS:
+        raise ValueError("Unknown report format: {}".format(p_format))
+    return parse_in_pool(p_files, PARSERS[p_format], p_jobs, (strnow,), p_level)
+
+
+def merge_by_owner(p_results:list) -> dict:
+    """
+    Merge the successful records into ONE InvestmentRecord per owner.
+    Txs are appended in file order then in their order within each file, so the merge is deterministic
+    no matter which worker finished first.
+    :return owner -> InvestmentRecord
+    """
+    merged = {}
+    for res in p_results:
+        if not res.ok():
+            continue
+        owner = res.record.get_owner()
+        if owner not in merged:
+            merged[owner] = InvestmentRecord()
+            merged[owner].set_owner(owner)
+        plans = res.record.get_plans()
+        for plan in plans:
+            for tx_type, txs in plans[plan].items():
+                for tx in txs:
+                    merged[owner].add_tx(plan, tx_type, tx)
+    return merged
+
+
+def report_failures(p_results:list) -> list:
+    """One line for each file that did NOT parse."""
+    return ["{}: {}".format(res.filename, res.error) for res in p_results if not res.ok()]
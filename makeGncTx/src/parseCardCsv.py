@@ -0,0 +1,197 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# parseCardCsv.py -- streaming parser of the credit card statements exported as csv, e.g. CC/cibc.csv and CC/pcbanking.csv,
+#                    to a CardRecord that GnucashSession writes to a Gnucash file in ONE batch
+#
+#   python3 parseCardCsv.py <card csv file> <mode: prod|test> [gnucash file]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import re
+import csv
+from datetime import date
+from functools import lru_cache
+from Configuration import *
+
+RE_ISO_DATE = re.compile(r"\d{4}-\d{1,2}-\d{1,2}$")
+RE_MDY_DATE = re.compile(r"\d{1,2}/\d{1,2}/\d{4}$")
+
+
+# a statement has few distinct dates, so each date string is converted ONCE
+@lru_cache(maxsize=4096)
+def iso_date(text:str) -> date:
+    year, month, day = text.split('-')
+    return date(int(year), int(month), int(day))
+
+
+@lru_cache(maxsize=4096)
+def mdy_date(text:str) -> date:
+    month, day, year = text.split('/')
+    return date(int(year), int(month), int(day))
+
+
+def clean_desc(text:str) -> str:
+    """the descriptions are padded to fixed width fields: keep ONE space between the words"""
+    return ' '.join(text.split())
+
+
+class CsvLayout:
+    """The columns of one bank's csv export"""
+    name = UNKNOWN
+    card = UNKNOWN
+    num_columns = 0
+    re_date = None
+
+    def matches(self, row:list) -> bool:
+        return len(row) == self.num_columns and self.re_date.match(row[0].strip()) is not None
+
+    def parse_row(self, row:list) -> CardTxRecord:
+        """:return: CardTxRecord ; raise ValueError or IndexError if the row is NOT a proper tx"""
+        raise NotImplementedError
+
+# END class CsvLayout
+
+
+class CibcLayout(CsvLayout):
+    """CIBC: date YYYY-MM-DD, description, debit, credit, card number -- a charge is a debit"""
+    name = "CIBC"
+    card = CIBC_VISA
+    num_columns = 5
+    re_date = RE_ISO_DATE
+
+    def parse_row(self, row:list) -> CardTxRecord:
+        debit, credit = row[2].strip(), row[3].strip()
+        amount = to_cents(debit) if debit else -to_cents(credit)
+        return CardTxRecord(iso_date(row[0].strip()), self.card, clean_desc(row[1]), amount, row[4].strip() or None)
+
+# END class CibcLayout
+
+
+class PcBankingLayout(CsvLayout):
+    """PC Banking: date M/D/YYYY, description, amount -- a charge is NEGATIVE"""
+    name = "PC Banking"
+    card = PC_MC
+    num_columns = 3
+    re_date = RE_MDY_DATE
+
+    def parse_row(self, row:list) -> CardTxRecord:
+        return CardTxRecord(mdy_date(row[0].strip()), self.card, clean_desc(row[1]), -to_cents(row[2]))
+
+# END class PcBankingLayout
+
+
+CSV_LAYOUTS = [ CibcLayout(), PcBankingLayout() ]
+
+
+def find_layout(row:list) -> CsvLayout:
+    for layout in CSV_LAYOUTS:
+        if layout.matches(row):
+            return layout
+    raise Exception("PROBLEM!! Row '{}' does NOT match any of the card csv layouts!".format(row))
+
+
+class CardCsvStream:
+    """
+    Feed the lines of a card csv file to records() and get back a CardTxRecord for each row as soon as it is read.
+    The layout is found from the first row, unless given. Rows that are NOT proper txs are kept in problems
+    with their line number, so that the caller can refuse to write a partial statement.
+    """
+    def __init__(self, p_layout:CsvLayout = None):
+        self.layout = p_layout
+        self.line_num = 0
+        self.problems = []
+
+    def records(self, p_lines):
+        """
+        :param p_lines: any iterable of lines, e.g. a file opened with newline=''
+        :return generator of CardTxRecord
+        """
+        for row in csv.reader(p_lines):
+            self.line_num += 1
+            if not any(field.strip() for field in row):
+                continue
+            if self.layout is None:
+                self.layout = find_layout(row)
+                print_info("Layout = {}".format(self.layout.name), MAGENTA)
+            try:
+                yield self.layout.parse_row(row)
+            except (ValueError, IndexError) as pre:
+                self.problems.append("line {}: {}".format(self.line_num, repr(pre)))
+
+    def read_file(self, file_name:str):
+        """generator of the CardTxRecords of a csv file, which is closed when the stream is finished"""
+        with open(file_name, newline='') as fp:
+            yield from self.records(fp)
+
+# END class CardCsvStream
+
+
+def collect_cards(p_stream, p_lines, p_record:CardRecord = None) -> CardRecord:
+    """
+    Gather ALL the txs of a card stream into a CardRecord
+    :param p_stream: CardCsvStream, or any stream with records()
+    :param  p_lines: iterable of lines
+    :param p_record: record to add to, or None for a new Configuration.CardRecord
+    :return: the record
+    """
+    record = CardRecord() if p_record is None else p_record
+    for ctx in p_stream.records(p_lines):
+        record.add_tx(ctx)
+    return record
+
+
+def parse_card_csv_main(args:list):
+    usage = "usage: python3 parseCardCsv.py <card csv file> <mode: prod|test> [gnucash file]"
+    if len(args) < 2:
+        print_error("NOT ENOUGH parameters!")
+        print_info(usage, MAGENTA)
+        exit(143)
+
+    csv_file = args[0]
+    if not osp.isfile(csv_file):
+        print_error("File path '{}' does not exist. Exiting...".format(csv_file))
+        print_info(usage, GREEN)
+        exit(149)
+    print_info("csv_file = {}".format(csv_file))
+
+    mode = args[1].upper()
+    gnc_file = args[2] if len(args) > 2 else None
+
+    try:
+        stream = CardCsvStream()
+        with open(csv_file, newline='') as fp:
+            record = collect_cards(stream, fp, CardRecord(csv_file))
+        print_info("Card record size = {}".format(record.get_size_str()), GREEN)
+        if stream.problems:
+            for problem in stream.problems:
+                print_error(problem)
+            raise Exception("{} BAD row(s) in '{}': NOTHING was written!".format(len(stream.problems), csv_file))
+
+        msg = TEST
+        if mode == PROD:
+            out_file = GncUtilities.save_to_json(osp.splitext(csv_file)[0], record.to_json(), strnow)
+            msg = "parseCardCsv created file: {}".format(out_file)
+
+        if gnc_file:
+            from gnucashSession import GnucashSession
+            gncs = GnucashSession(record, mode, gnc_file, False, CARD)
+            msg = gncs.prepare_session()
+
+    except Exception as pcce:
+        msg = "parse_card_csv_main() EXCEPTION!! '{}'".format(repr(pcce))
+        print_error(msg)
+
+    print_info("\n >>> PROGRAM ENDED.", GREEN)
+    return msg
+
+
+if __name__ == '__main__':
+    import sys
+    parse_card_csv_main(sys.argv[1:])
@@ -12,9 +12,9 @@ __python_version__ = 3.6
 __created__ = '2019-06-02'
 __updated__ = '2019-06-16'
 
-import re
 import json
 from Configuration import *
+from monarchStream import FundsStream, collect_record
 
 
 class ParseMonarchFundsReport:
@@ -37,58 +37,13 @@ class ParseMonarchFundsReport:
         *find gnc splits for each asset account:
             find last split and get tx:
                 add final balance to notes
+        see monarchStream.FundsStream to get each price as it is read
         :return: Configuration.InvestmentRecord object
         """
         print_info("\nparse_funds_info({})\nRuntime = {}\n".format(file_name, ts), MAGENTA)
 
-        re_date = re.compile(r"([0-9]{2}-\w{3}-[0-9]{4})")
-
-        tx_coll = InvestmentRecord()
-        mon_state = FIND_OWNER
-        plan_type = UNKNOWN
         with open(file_name) as fp:
-            ct = 0
-            for line in fp:
-                ct += 1
-                print_info("Line {}".format(ct))
-                if mon_state == FIND_OWNER:
-                    owner = line.strip()
-                    tx_coll.set_owner(owner)
-                    print_info("\n\t\u0022Current owner: {}\u0022".format(owner), MAGENTA)
-                    mon_state = FIND_DATE
-                    continue
-
-                words = line.split()
-                if len(words) <= 0:
-                    continue
-
-                if mon_state == FIND_DATE:
-                    re_match = re.match(re_date, words[0])
-                    if re_match:
-                        tx_date = re_match.group(1)
-                        print_info("Document date: {}".format(tx_date), YELLOW)
-                        mon_state = STATE_SEARCH
-
-                if words[0] == FUND.upper():
-                    plan_type = words[2]
-                    print_info("\n\t\u0022Current plan_type: {}\u0022".format(plan_type), MAGENTA)
-                    continue
-
-                if words[0] in FUND_NAME_CODE:
-                    fd_co = words[0]
-                    print_info("Fund company = {}".format(fd_co))
-                    fund = words[-10].replace('-', ' ')
-                    print_info("Fund = {}".format(fund))
-                    bal = words[-8]
-                    print_info("Final balance = {}".format(bal))
-                    price = words[-7]
-                    print_info("Final price = {}".format(price))
-
-                    curr_tx = {TRADE_DATE: tx_date, FUND_CMPY: fd_co, FUND: fund, UNIT_BAL: bal, PRICE: price}
-                    tx_coll.add_tx(plan_type, curr_tx)
-                    print_info('ADD current Tx to Collection!', GREEN)
-
-        return tx_coll
+            return collect_record(FundsStream(), fp)
 
 
 def mon_funds_rep_main(args):
@@ -16,8 +16,13 @@ __updated__ = '2019-06-05'
 import re
 import copy
 import json
-from gnucash import Session, GncNumeric, GncPrice
+from gncBindings import Session
 from Configuration import *
+from monarchTokens import *
+from priceLoader import PriceLoader
+
+RE_QTR_MARK = re.compile(".*({}).*".format(MON_MARK))
+RE_QTR_LULU = re.compile(".*({}).*".format(MON_LULU))
 
 
 # noinspection PyUnresolvedReferences
@@ -31,6 +36,8 @@ class MonarchQrepToGncPrices:
 
         self.root = self.book.get_root_account()
         self.root.get_instance()
+        # the account tree does not change while adding prices
+        self.acct_index = AccountIndex(self.root)
 
         self.price_db = self.book.get_price_db()
 
@@ -56,26 +63,14 @@ class MonarchQrepToGncPrices:
         """
         print_info("parse_monarch_qtrep()\nRuntime = {}\n".format(strnow), MAGENTA)
 
-        # re searches
-        re_date    = re.compile(r"^For the period (.*) to (\w{3}) (\d{1,2}), (\d{4})")
-        re_mark    = re.compile(".*({}).*".format(MON_MARK))
-        re_lulu    = re.compile(".*({}).*".format(MON_LULU))
-        re_start   = re.compile(r"^Page 1.*")
-        re_comp1   = re.compile(r"^(.*) - ([0-9ATL]{3,5}).*")
-        re_comp2   = re.compile(r"^(- )?(\d{3,5}) - (.*)")
-        re_price   = re.compile(r"^\$([0-9,]{1,5})\.(\d{2,4}).*")
-        re_plan    = re.compile(r"(OPEN|TFSA|RRSP)(\s?.*)")
-        re_endplan = re.compile(r"^Transaction Details.*")
-        re_finish  = re.compile(r"^Disclosure.*")
-
         mon_state = FIND_OWNER
         with open(self.mon_file) as fp:
             ct = 0
             for line in fp:
                 ct += 1
                 if mon_state == FIND_OWNER:
-                    match_mark = re.match(re_mark, line)
-                    match_lulu = re.match(re_lulu, line)
+                    match_mark = RE_QTR_MARK.match(line)
+                    match_lulu = None if match_mark else RE_QTR_LULU.match(line)
                     if match_mark or match_lulu:
                         if match_mark:
                             owner = match_mark.group(1)
@@ -87,14 +82,14 @@ class MonarchQrepToGncPrices:
                         continue
 
                 if mon_state == FIND_START:
-                    match_start = re.match(re_start, line)
+                    match_start = RE_QTR_START.match(line)
                     if match_start:
                         print_info("{}/ Found Start!".format(ct), GREEN)
                         mon_state = FIND_DATE
                         continue
 
                 if mon_state == FIND_DATE:
-                    match_date = re.match(re_date, line)
+                    match_date = RE_QTR_DATE.match(line)
                     if match_date:
                         day = match_date.group(3)
                         month = match_date.group(2)
@@ -107,11 +102,11 @@ class MonarchQrepToGncPrices:
                         continue
 
                 if mon_state == FIND_PLAN:
-                    match_finish = re.match(re_finish, line)
+                    match_finish = RE_QTR_FINISH.match(line)
                     if match_finish:
                         print_info("{}/ FINISHED!".format(ct), RED)
                         break
-                    match_plan = re.match(re_plan, line)
+                    match_plan = RE_QTR_PLAN.match(line)
                     if match_plan:
                         plan_type = match_plan.group(1)
                         print_info("{}/ Plan type: {}".format(ct, plan_type), BLUE)
@@ -119,13 +114,13 @@ class MonarchQrepToGncPrices:
                         continue
 
                 if mon_state == FIND_COMPANY:
-                    match_endsum = re.match(re_endplan, line)
+                    match_endsum = RE_QTR_ENDPLAN.match(line)
                     if match_endsum:
                         print_info("{}/ END of '{}' plan.".format(ct, plan_type), BLUE)
                         mon_state = FIND_PLAN
                         continue
-                    match_comp1 = re.match(re_comp1, line)
-                    match_comp2 = re.match(re_comp2, line)
+                    match_comp1 = RE_QTR_COMP1.match(line)
+                    match_comp2 = None if match_comp1 else RE_QTR_COMP2.match(line)
                     if match_comp1 or match_comp2:
                         if match_comp1:
                             company = match_comp1.group(1)
@@ -139,41 +134,55 @@ class MonarchQrepToGncPrices:
                         continue
 
                 if mon_state == FIND_PRICE:
-                    match_price = re.match(re_price, line)
+                    match_price = RE_QTR_PRICE.match(line)
                     if match_price:
                         dollar_str = match_price.group(1)
                         cents_str = match_price.group(2)
                         print_info("{}/ price = '${}.{}'".format(ct, dollar_str, cents_str), GREEN)
-                        curr_tx[DOLLARS] = dollar_str
-                        curr_tx[CENTS] = cents_str
-                        tx_coll.add_tx(plan_type, curr_tx)
+                        curr_tx[PRICE] = "{}.{}".format(dollar_str, cents_str)
+                        tx_coll.add_tx(plan_type, PRICE, self.get_price_record(curr_tx, tx_coll.get_date()))
                         mon_state = FIND_COMPANY
                         continue
 
         print_info("Found {} transactions.".format(tx_coll.get_size()))
         return tx_coll
 
+    @staticmethod
+    def get_price_record(p_tx:dict, p_date) -> PriceRecord:
+        """
+        Use the Fund Company and Fund Code to get the asset account name for the price
+        :param p_tx: dict with FUND_CMPY, FUND_CODE and PRICE strings from the report
+        :param p_date: date of the prices in the report
+        :return: PriceRecord
+        """
+        name_key = p_tx[FUND_CMPY].split(' ')[0]
+        print_info("name_key = {}".format(name_key), YELLOW)
+        if name_key in FUND_NAME_CODE.keys():
+            name_code = FUND_NAME_CODE[name_key]
+            # special case
+            if name_code == ATL:
+                asset_acct_name = ATL_O59
+            else:
+                asset_acct_name = name_code + " " + p_tx[FUND_CODE]
+        else:
+            raise Exception("Could NOT find name key {}!".format(name_key))
+        print_info("asset_acct_name = {}".format(asset_acct_name), BLUE)
+        return PriceRecord(p_date, asset_acct_name, p_tx[FUND_CMPY], p_tx[PRICE])
+
     def get_prices_and_save(self, tx_coll):
         """
-        create Gnucash prices, load and save to the Gnucash file's PriceDB
+        create Gnucash prices, load them to the Gnucash file's PriceDB in ONE batch and save
         :param tx_coll: InvestmentRecord object: transactions to use to extract Gnucash prices
         :return: message
         """
         print_info('get_prices_and_save()', MAGENTA)
 
-        gncu = GncUtilities()
-
         msg = TEST
-        self.price_db.begin_edit()
-        print_info("self.price_db.begin_edit()", MAGENTA)
+        loader = PriceLoader(self.book, self.price_db, self.currency, self.acct_index)
         try:
             for plan_type in tx_coll.plans:
                 print_info("\n\nPlan type = {}".format(plan_type))
-                for tx in tx_coll.plans[plan_type]:
-                    base = pow(10, len(tx[CENTS]))
-                    int_price = int(tx[DOLLARS] + tx[CENTS])
-                    val = GncNumeric(int_price, base)
-
+                for tx in tx_coll.plans[plan_type][PRICE]:
                     ast_parent_path = copy.copy(ACCT_PATHS[ASSET])
                     ast_parent_path.append(plan_type)
 
@@ -184,62 +193,31 @@ class MonarchQrepToGncPrices:
                         ast_parent_path.append(ACCT_PATHS[tx_coll.get_owner()])
 
                     print_info("ast_parent_path = {}".format(str(ast_parent_path)), BLUE)
-                    asset_parent = gncu.account_from_path(self.root, ast_parent_path)
-
-                    # get the asset account name
-                    name_key = tx[FUND_CMPY].split(' ')[0]
-                    print_info("name_key = {}".format(name_key), YELLOW)
-                    if name_key in FUND_NAME_CODE.keys():
-                        name_code = FUND_NAME_CODE[name_key]
-                        # special case
-                        if name_code == ATL:
-                            asset_acct_name = ATL_O59
-                        else:
-                            asset_acct_name = name_code + " " + tx[FUND_CODE]
-                    else:
-                        raise Exception("Could NOT find name key {}!".format(name_key))
-                    print_info("asset_acct_name = {}".format(asset_acct_name), BLUE)
+                    asset_parent = self.acct_index.from_path(ast_parent_path)
+
+                    asset_acct_name = tx.fund
 
                     # special location for Trust Asset account
                     if asset_acct_name == TRUST_AST_ACCT:
-                        asset_parent = self.root.lookup_by_name(TRUST)
+                        asset_parent = self.acct_index.lookup(self.root, TRUST)
                     print_info("asset_parent = {}".format(asset_parent.GetName()), BLUE)
 
-                    # get the asset account
-                    asset_acct = asset_parent.lookup_by_name(asset_acct_name)
-                    if asset_acct is None:
+                    # the commodity of each fund is found ONCE by the loader
+                    if not loader.add_record(tx, asset_parent, 'last'):
                         # just skip updating cash-holding funds
-                        if str(val) == '100000/10000':
+                        if tx.price == 100000:
                             continue
                         else:
                             raise Exception(
                                 "Could NOT find acct '{}' under parent '{}'".format(asset_acct_name, asset_parent.GetName()))
 
-                    print_info("Adding: {}[{}] @ ${}".format(asset_acct_name, tx_coll.get_date_str(), val), GREEN)
-
-                    pr = GncPrice(self.book)
-                    pr.begin_edit()
-                    pr.set_time64(tx_coll.get_date())
-                    comm = asset_acct.GetCommodity()
-                    print_info("Commodity = {}:{}".format(comm.get_namespace(), comm.get_printname()), YELLOW)
-                    pr.set_commodity(comm)
-
-                    pr.set_currency(self.currency)
-                    pr.set_value(val)
-                    pr.set_source_string("user:price")
-                    pr.set_typestr('last')
-                    pr.commit_edit()
-
-                    if self.prod:
-                        print_info("PROD: Add Price to DB.\n", GREEN)
-                        self.price_db.add_price(pr)
-                    else:
-                        print_info("PROD: ABANDON Prices!\n", RED)
+                    print_info("Adding: {}[{}] @ ${}".format(asset_acct_name, tx_coll.get_date_str(), tx.price / 10000), GREEN)
 
+            if not self.prod:
+                print_info("PROD: ABANDON Prices!\n", RED)
+            msg = loader.load(self.prod)
+            print_info(msg, GREEN)
             if self.prod:
-                msg = "PROD: COMMIT Price DB edits and Save session."
-                print_info("PROD: COMMIT Price DB edits and Save session.", GREEN)
-                self.price_db.commit_edit()
                 # only ONE session save for the entire run
                 self.session.save()
 
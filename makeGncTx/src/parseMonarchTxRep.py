@@ -12,15 +12,17 @@ __python_version__ = 3.6
 __created__ = '2018'
 __updated__ = '2019-06-16'
 
-import re
 import json
 from Configuration import *
+from monarchStream import PdfTxStream, CopyTxStream, collect_record
 
 
-def parse_pdf_txs(file_name, ts):
+def parse_pdf_txs(file_name, ts, p_partial:bool = False):
     """
     :param file_name: string: monarch transaction report text file to parse
     :param        ts: string: timestamp for file name
+    :param p_partial: if True, return the record WITHOUT the txs that could NOT be read, after listing them;
+                      otherwise a report with ANY such tx raises an Exception
     loop:
         check for 'Plan Type:'
             next line is either 'OPEN...', 'TFSA...' or 'RRSP...'
@@ -35,106 +37,21 @@ def parse_pdf_txs(file_name, ts):
                   line  = 'Units'        : float
                   line  = 'Price'        : Currency float
                   line  = 'Unit Balance' : float
+    see monarchStream.PdfTxStream to get each tx as it is read
     :return: Configuration.InvestmentRecord object
     """
     print_info("\nparse_pdf_txs({})\nRuntime = {}\n".format(file_name, ts), MAGENTA)
 
-    # re searches
-    re_own  = re.compile(".*({}).*".format(OWNER))
-    re_plan = re.compile(r"([OPENTFSAR]{4})(\s?.*)")
-    re_fund = re.compile(r".*([A-Z]{3})\s?([0-9]{3,5}).*")
-    re_date = re.compile(r".*([0-9]{2}/[0-9]{2}/[0-9]{4}).*")
-
-    tx_coll = InvestmentRecord()
-    own_line = 0
-    tx_line = 0
-    mon_state = STATE_SEARCH
+    stream = PdfTxStream()
     with open(file_name) as fp:
-        ct = 0
-        for line in fp:
-            ct += 1
-            print_info("line is type {}".format(type(line)))
-            line_list = line.split()
-            for it in line_list:
-                print_info("it = {}".format(it))
-            if mon_state == STATE_SEARCH:
-                re_match = re.match(re_plan, line)
-                if re_match:
-                    plan_type = re_match.group(1)
-                    print_info("\n\t\u0022Current plan_type: {}\u0022".format(plan_type), MAGENTA)
-                    mon_state = FIND_OWNER
-                    continue
-
-            if mon_state == FIND_OWNER:
-                if own_line == 0:
-                    re_match = re.match(re_own, line)
-                    if re_match:
-                        own_line += 1
-                else:
-                    owner_name = line.strip()
-                    print_info("Current owner_name: {}".format(owner_name), GREEN)
-                    tx_coll.set_owner(owner_name)
-                    own_line = 0
-                    mon_state = FIND_FUND
-                continue
-
-            if mon_state <= FIND_FUND:
-                re_match = re.match(re_fund, line)
-                if re_match:
-                    fund_company = re_match.group(1)
-                    fund_code = re_match.group(2)
-                    print_info("Current fund: {}".format(fund_company + " " + fund_code), BLUE)
-                    mon_state = FIND_NEXT_TX
-                    continue
-
-            if mon_state <= FIND_NEXT_TX:
-                re_match = re.match(re_date, line)
-                if re_match:
-                    tx_date = re_match.group(1)
-                    print_info("FOUND a NEW tx! Date: {}".format(tx_date), YELLOW)
-                    curr_tx = {FUND_CMPY: fund_company, FUND_CODE: fund_code, TRADE_DATE: tx_date, DESC: ''}
-                    # curr_tx[TRADE_DATE] = tx_date
-                    mon_state = FILL_CURR_TX
-                    continue
-
-            if mon_state == FILL_CURR_TX:
-                tx_line += 1
-                entry = line.strip()
-                if tx_line < 3:
-                    if entry == AUTO_SYS or entry == INTRF_IN:
-                        # back up by one as have one MORE line of DESCRIPTION for AUTO_SYS and INTRF_IN cases
-                        tx_line -= 1
-                    elif entry == SW_IN or entry == SW_OUT or entry == FEE:
-                        # move forward by one because one FEWER line of DESCRIPTION for these cases
-                        tx_line += 1
-                    # TODO: match number to proceed to looking for GROSS?
-                    curr_tx[DESC] += (entry + ":")
-                    continue
-                if tx_line == 3:
-                    print_info("curr_tx[DESC]: {}".format(curr_tx[DESC]))
-                    curr_tx[GROSS] = entry
-                    print_info("curr_tx[GROSS]: {}".format(curr_tx[GROSS]))
-                if tx_line == 4:
-                    curr_tx[NET] = entry
-                    if curr_tx[NET] != curr_tx[GROSS]:
-                        print_info("curr_tx[NET]: {}".format(curr_tx[NET]))
-                        print_error("\n>>> PROBLEM!!! GROSS and NET do NOT match!!!\n")
-                        continue
-                if tx_line == 5:
-                    curr_tx[UNITS] = entry
-                    print_info("curr_tx[UNITS]: {}".format(curr_tx[UNITS]))
-                if tx_line == 6:
-                    curr_tx[PRICE] = entry
-                    print_info("curr_tx[PRICE]: {}".format(curr_tx[PRICE]))
-                if tx_line == 7:
-                    curr_tx[UNIT_BAL] = entry
-                    print_info("curr_tx[UNIT_BAL]: {}".format(curr_tx[UNIT_BAL]))
-                    tx_coll.add_tx(plan_type, curr_tx)
-                    print_info('ADD current Tx to Collection!', GREEN)
-                    mon_state = STATE_SEARCH
-                    tx_line = 0
-
-    return tx_coll
+        record = collect_record(stream, fp)
+    if stream.problems:
+        for problem in stream.problems:
+            print_error(problem)
+        if not p_partial:
+            raise Exception("{} BAD tx(s) in '{}': the record would be INCOMPLETE!".format(len(stream.problems), file_name))
+        print_error("PARTIAL record: {} tx(s) of '{}' are MISSING!".format(len(stream.problems), file_name))
+    return record
 
 
 def parse_copy_txs(file_name, ts):
@@ -157,61 +74,13 @@ def parse_copy_txs(file_name, ts):
                 load  = wd[-5]
                 code  = wd[-7]
                 company = wd[-8]
+    see monarchStream.CopyTxStream to get each tx as it is read
     :return: Configuration.InvestmentRecord object
     """
     print_info("\nparse_copy_txs({})\nRuntime = {}\n".format(file_name, ts), MAGENTA)
 
-    re_date = re.compile(r"([0-9]{2}-\w{3}-[0-9]{4})")
-
-    tx_coll = InvestmentRecord()
-    mon_state = FIND_OWNER
     with open(file_name) as fp:
-        ct = 0
-        for line in fp:
-            ct += 1
-            print_info("Line {}".format(ct))
-            if mon_state == FIND_OWNER:
-                owner = line.strip()
-                tx_coll.set_owner(owner)
-                print_info("\n\t\u0022Current owner: {}\u0022".format(owner), MAGENTA)
-                mon_state = STATE_SEARCH
-                continue
-
-            words = line.split()
-            if len(words) <= 0:
-                continue
-
-            if words[0] == TXS:
-                plan_type = words[1]
-                print_info("\n\t\u0022Current plan_type: {}\u0022".format(plan_type), MAGENTA)
-                continue
-
-            re_match = re.match(re_date, words[0])
-            if re_match and len(words) > 2:
-                tx_date = re_match.group(1)
-                print_info("FOUND a NEW tx! Date: {}".format(tx_date), YELLOW)
-                curr_tx = {TRADE_DATE: tx_date}
-
-                tx_type = words[1]
-                curr_tx[DESC] = TX_TYPES[words[2]] if tx_type == INTRCL else TX_TYPES[tx_type]
-                print_info("curr_tx[DESC]: {}".format(curr_tx[DESC]))
-                curr_tx[GROSS] = words[-4]
-                print_info("curr_tx[GROSS]: {}".format(curr_tx[GROSS]))
-                curr_tx[UNITS] = words[-1]
-                print_info("curr_tx[UNITS]: {}".format(curr_tx[UNITS]))
-                curr_tx[PRICE] = words[-2]
-                print_info("curr_tx[PRICE]: {}".format(curr_tx[PRICE]))
-                curr_tx[LOAD] = words[-5]
-                print_info("curr_tx[LOAD]: {}".format(curr_tx[LOAD]))
-                curr_tx[FUND_CODE] = words[-7]
-                print_info("curr_tx[FUND_CODE]: {}".format(curr_tx[FUND_CODE]))
-                curr_tx[FUND_CMPY] = words[-8]
-                print_info("curr_tx[FUND_CMPY]: {}".format(curr_tx[FUND_CMPY]))
-
-                tx_coll.add_tx(plan_type, curr_tx)
-                print_info('ADD current Tx to Collection!', GREEN)
-
-    return tx_coll
+        return collect_record(CopyTxStream(), fp)
 
 
 def mon_tx_rep_main(args):
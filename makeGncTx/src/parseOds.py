@@ -0,0 +1,216 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# parseOds.py -- streaming reader of the credit card statements saved as OpenDocument spreadsheets,
+#                e.g. CC/ScotiaVisa_oct-nov2018.ods, to a CardRecord that GnucashSession writes to a Gnucash file
+#
+#   python3 parseOds.py <ods file> <mode: prod|test> [gnucash file] [card account]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import zipfile
+from decimal import Decimal, ROUND_HALF_UP
+from xml.etree.ElementTree import iterparse
+from Configuration import *
+from parseCardCsv import clean_desc, iso_date
+
+ODS_CONTENT = "content.xml"
+
+# OpenDocument namespaces
+NS_TABLE  = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+NS_OFFICE = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+NS_TEXT   = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+
+ODS_TABLE   = NS_TABLE + "table"
+ODS_ROW     = NS_TABLE + "table-row"
+ODS_NAME    = NS_TABLE + "name"
+ROWS_REPEAT = NS_TABLE + "number-rows-repeated"
+COLS_REPEAT = NS_TABLE + "number-columns-repeated"
+VALUE_TYPE  = NS_OFFICE + "value-type"
+VALUE       = NS_OFFICE + "value"
+DATE_VALUE  = NS_OFFICE + "date-value"
+TEXT_P      = NS_TEXT + "p"
+TEXT_S      = NS_TEXT + "s"
+TEXT_COUNT  = NS_TEXT + "c"
+
+NUMBER_TYPES = ("float", "currency", "percentage")
+
+
+def cell_text(p_elem) -> str:
+    """the text of a cell or paragraph: <text:s text:c="n"/> stands for n spaces"""
+    parts = [p_elem.text or '']
+    for child in p_elem:
+        if child.tag == TEXT_S:
+            parts.append( ' ' * int(child.get(TEXT_COUNT, 1)) )
+        else:
+            parts.append( cell_text(child) )
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def cell_value(p_cell):
+    """
+    :return: datetime.date for a date cell, str with the number for a number cell, str for a text cell,
+             or None for an empty cell
+    """
+    value_type = p_cell.get(VALUE_TYPE)
+    if value_type == "date":
+        return iso_date( p_cell.get(DATE_VALUE)[:10] )
+    if value_type in NUMBER_TYPES:
+        return p_cell.get(VALUE)
+    text = '\n'.join( cell_text(para) for para in p_cell.iter(TEXT_P) )
+    return text if text else None
+
+
+def to_cents_rounded(p_number:str) -> int:
+    """office:value is the full number of the cell, e.g. '-62.2' OR the result of a formula '0.30000000000000004'"""
+    return int( (Decimal(p_number) * 100).to_integral_value(ROUND_HALF_UP) )
+
+
+def ods_rows(p_content, p_sheet:str = None):
+    """
+    Stream the rows of the tables of an ODS content.xml with iterparse: each row is removed from the tree as soon as
+    it is read, so memory stays flat for ANY number of rows
+    :param p_content: file object or name of a content.xml
+    :param   p_sheet: name of the table to read, or None for ALL of them
+    :return: generator of (table name, row number, list of cell values) ; the trailing empty cells are dropped,
+             a repeated row comes back once for each repeat but an EMPTY repeated row not at all
+    """
+    # the open elements, so that a finished row can be removed from its parent
+    stack = []
+    table = None
+    row_num = 0
+    for event, elem in iterparse(p_content, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag == ODS_TABLE:
+                table = elem.get(ODS_NAME)
+                row_num = 0
+            continue
+        stack.pop()
+        if elem.tag != ODS_ROW:
+            if elem.tag == ODS_TABLE and stack:
+                stack[-1].remove(elem)
+            continue
+
+        repeat = int(elem.get(ROWS_REPEAT, 1))
+        row_num += repeat
+        if p_sheet is None or table == p_sheet:
+            cells = []
+            # empty cells are only added when a cell with a value follows: a row often ends with ~1000 of them
+            empty = 0
+            for cell in elem:
+                value = cell_value(cell)
+                columns = int(cell.get(COLS_REPEAT, 1))
+                if value is None:
+                    empty += columns
+                    continue
+                cells.extend( [None] * empty + [value] * columns )
+                empty = 0
+            if cells:
+                for num in range(row_num - repeat + 1, row_num + 1):
+                    yield table, num, cells
+        if stack:
+            stack[-1].remove(elem)
+
+
+class OdsStream:
+    """
+    Feed an ODS content.xml to records() and get back a CardTxRecord for each row as soon as it is read:
+      date cell, description, amount -- a charge is NEGATIVE, as in the PC Banking csv
+    Rows before the first tx, e.g. headers, are skipped ; any other row that is NOT a proper tx is kept in problems.
+    """
+    def __init__(self, p_card:str, p_sheet:str = None):
+        self.card = p_card
+        self.sheet = p_sheet
+        self.num_txs = 0
+        self.headers = 0
+        self.problems = []
+
+    def make_record(self, p_cells:list) -> CardTxRecord:
+        tx_date, desc, amount = p_cells[0], p_cells[1], p_cells[-1]
+        if not hasattr(tx_date, "year"):
+            raise ValueError("NO date in the first cell")
+        return CardTxRecord(tx_date, self.card, clean_desc(desc or ''), -to_cents_rounded(amount))
+
+    def records(self, p_content):
+        """
+        :param p_content: file object or name of a content.xml
+        :return generator of CardTxRecord
+        """
+        for table, row_num, cells in ods_rows(p_content, self.sheet):
+            try:
+                record = self.make_record(cells)
+            except (ValueError, IndexError, ArithmeticError) as odse:
+                if self.num_txs == 0:
+                    self.headers += 1
+                else:
+                    self.problems.append("{} row {}: {} {}".format(table, row_num, repr(odse), cells))
+                continue
+            self.num_txs += 1
+            yield record
+
+    def read_file(self, file_name:str):
+        """generator of the CardTxRecords of an ods file: content.xml is decompressed as it is parsed"""
+        with zipfile.ZipFile(file_name) as zfile, zfile.open(ODS_CONTENT) as content:
+            yield from self.records(content)
+
+# END class OdsStream
+
+
+def parse_ods_main(args:list):
+    usage = "usage: python3 parseOds.py <ods file> <mode: prod|test> [gnucash file] [card account]"
+    if len(args) < 2:
+        print_error("NOT ENOUGH parameters!")
+        print_info(usage, MAGENTA)
+        exit(167)
+
+    ods_file = args[0]
+    if not osp.isfile(ods_file):
+        print_error("File path '{}' does not exist. Exiting...".format(ods_file))
+        print_info(usage, GREEN)
+        exit(173)
+    print_info("ods_file = {}".format(ods_file))
+
+    mode = args[1].upper()
+    gnc_file = args[2] if len(args) > 2 else None
+    card = args[3] if len(args) > 3 else SCOTIA_VISA
+
+    try:
+        stream = OdsStream(card)
+        record = CardRecord(ods_file)
+        for ctx in stream.read_file(ods_file):
+            record.add_tx(ctx)
+        print_info("Card record size = {} ; skipped {} header row(s)".format(record.get_size_str(), stream.headers), GREEN)
+        if stream.problems:
+            for problem in stream.problems:
+                print_error(problem)
+            raise Exception("{} BAD row(s) in '{}': NOTHING was written!".format(len(stream.problems), ods_file))
+
+        msg = TEST
+        if mode == PROD:
+            out_file = GncUtilities.save_to_json(osp.splitext(ods_file)[0], record.to_json(), strnow)
+            msg = "parseOds created file: {}".format(out_file)
+
+        if gnc_file:
+            from gnucashSession import GnucashSession
+            gncs = GnucashSession(record, mode, gnc_file, False, CARD)
+            msg = gncs.prepare_session()
+
+    except Exception as pode:
+        msg = "parse_ods_main() EXCEPTION!! '{}'".format(repr(pode))
+        print_error(msg)
+
+    print_info("\n >>> PROGRAM ENDED.", GREEN)
+    return msg
+
+
+if __name__ == '__main__':
+    import sys
+    parse_ods_main(sys.argv[1:])
@@ -0,0 +1,237 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# parseOfx.py -- streaming parser of the OFX/QFX statements downloaded from a bank, e.g. CC/cibc.qfx,
+#                with a persistent set of the FITIDs ALREADY imported so that an overlapping download
+#                only adds the new txs to the Gnucash file
+#
+#   python3 parseOfx.py <ofx|qfx file> <mode: prod|test> [gnucash file] [card account]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import re
+from html import unescape
+from datetime import date
+from functools import lru_cache
+from Configuration import *
+from parseCardCsv import collect_cards
+
+# read the file in pieces of this many characters: a statement is NEVER loaded whole
+OFX_CHUNK_SIZE = 64 * 1024
+# the statements say CHARSET:1252 in the SGML header
+OFX_ENCODING = "cp1252"
+# the FITIDs of a Gnucash file are kept in <Gnucash file> + FITID_SUFFIX
+FITID_SUFFIX = ".fitids"
+
+# a tag and the text up to the next tag: the text of an aggregate tag is empty
+RE_OFX_TAG = re.compile(r"<([^<>]+)>([^<]*)")
+
+STMTTRN = "STMTTRN"
+STMTTRN_END = "/" + STMTTRN
+ACCTID = "ACCTID"
+DTPOSTED = "DTPOSTED"
+TRNAMT = "TRNAMT"
+FITID = "FITID"
+OFX_NAME = "NAME"
+OFX_MEMO = "MEMO"
+
+
+# a statement has few distinct dates, so each date is converted ONCE
+@lru_cache(maxsize=4096)
+def ofx_date(text:str) -> date:
+    """:return: the date of an OFX datetime, e.g. '20181122120000.000[-5:EST]'"""
+    return date(int(text[0:4]), int(text[4:6]), int(text[6:8]))
+
+
+def read_chunks(p_fp, p_size:int = OFX_CHUNK_SIZE):
+    """generator of the pieces of an open file"""
+    return iter(lambda: p_fp.read(p_size), '')
+
+
+def ofx_tokens(p_chunks):
+    """
+    Incremental tokenizer for SGML (OFX 1.x: NO end tags for the values) OR XML (OFX 2.x) statements:
+    the text before the LAST '<' of what has been read is complete, the rest waits for the next chunk
+    :param p_chunks: iterable of str, e.g. read_chunks() of a file or the lines of a file
+    :return: generator of (tag, text) ; an end tag comes back as ('/TAG', '')
+    """
+    buffer = ''
+    for chunk in p_chunks:
+        buffer += chunk
+        last = buffer.rfind('<')
+        if last <= 0:
+            continue
+        for re_match in RE_OFX_TAG.finditer(buffer, 0, last):
+            yield re_match.group(1).strip().upper(), re_match.group(2).strip()
+        buffer = buffer[last:]
+    for re_match in RE_OFX_TAG.finditer(buffer):
+        yield re_match.group(1).strip().upper(), re_match.group(2).strip()
+
+
+class FitidStore:
+    """
+    Persistent set of the FITIDs of the OFX txs ALREADY imported, one 'account id:FITID' per line of a text file:
+    a FITID is only unique for an account. The ids added in a run are pending until save(), which the caller
+    does ONLY once the txs are in the Gnucash file, so that a failed import does not hide them next time.
+    """
+    def __init__(self, p_file:str = None):
+        self.file = p_file
+        self.saved = set()
+        self.pending = []
+        self._pending_set = set()
+        if p_file and osp.isfile(p_file):
+            with open(p_file) as fp:
+                self.saved = { line.strip() for line in fp if line.strip() }
+
+    @staticmethod
+    def make_key(p_acct:str, p_fitid:str) -> str:
+        return "{}:{}".format(p_acct, p_fitid)
+
+    def __len__(self):
+        return len(self.saved) + len(self.pending)
+
+    def seen(self, p_acct:str, p_fitid:str) -> bool:
+        key = self.make_key(p_acct, p_fitid)
+        return key in self.saved or key in self._pending_set
+
+    def add(self, p_acct:str, p_fitid:str):
+        key = self.make_key(p_acct, p_fitid)
+        if key not in self.saved and key not in self._pending_set:
+            self.pending.append(key)
+            self._pending_set.add(key)
+
+    def save(self) -> int:
+        """append the pending ids to the file: :return: the number of ids saved"""
+        num = len(self.pending)
+        if self.file and self.pending:
+            with open(self.file, 'a') as fp:
+                fp.write("\n".join(self.pending) + "\n")
+        self.saved.update(self.pending)
+        self.pending = []
+        self._pending_set = set()
+        return num
+
+# END class FitidStore
+
+
+class OfxStream:
+    """
+    Feed the pieces of an OFX/QFX statement to records() and get back a CardTxRecord for each <STMTTRN> as soon as
+    its end is read. A tx whose FITID is in the FitidStore is skipped and counted, a new one is added to the store.
+      TRNAMT is NEGATIVE for a charge, so the amount of the CardTxRecord is -TRNAMT
+    """
+    def __init__(self, p_card:str, p_seen:FitidStore = None):
+        self.card = p_card
+        self.seen = FitidStore() if p_seen is None else p_seen
+        self.acct_id = UNKNOWN
+        self.num_txs = 0
+        self.skipped = 0
+        self.problems = []
+
+    def make_record(self, p_txn:dict) -> CardTxRecord:
+        desc = p_txn.get(OFX_NAME, '')
+        if p_txn.get(OFX_MEMO):
+            desc = desc + ' ' + p_txn[OFX_MEMO]
+        return CardTxRecord( ofx_date(p_txn[DTPOSTED][:8]), self.card,
+                             ' '.join(desc.split()), -to_cents(p_txn[TRNAMT]), p_txn[FITID] )
+
+    def records(self, p_chunks):
+        """
+        :param p_chunks: iterable of str, e.g. read_chunks() of an open file
+        :return generator of CardTxRecord
+        """
+        txn = None
+        for tag, text in ofx_tokens(p_chunks):
+            if tag == STMTTRN:
+                txn = {}
+            elif tag == STMTTRN_END:
+                self.num_txs += 1
+                try:
+                    record = self.make_record(txn)
+                except (KeyError, ValueError) as ofxe:
+                    self.problems.append("{} #{}: {} {}".format(STMTTRN, self.num_txs, repr(ofxe), txn))
+                else:
+                    if self.seen.seen(self.acct_id, record.ref):
+                        self.skipped += 1
+                    else:
+                        self.seen.add(self.acct_id, record.ref)
+                        yield record
+                txn = None
+            elif txn is not None:
+                if text:
+                    txn[tag] = unescape(text) if '&' in text else text
+            elif tag == ACCTID:
+                self.acct_id = text
+
+    def read_file(self, file_name:str, p_encoding:str = OFX_ENCODING):
+        """generator of the new CardTxRecords of a statement file, which is closed when the stream is finished"""
+        with open(file_name, encoding=p_encoding, errors="replace") as fp:
+            yield from self.records(read_chunks(fp))
+
+    def get_report(self) -> str:
+        return "{} tx(s) in the statement of account {}: {} NEW, SKIPPED {} ALREADY imported, {} problem(s)."\
+               .format(self.num_txs, self.acct_id, self.num_txs - self.skipped - len(self.problems),
+                       self.skipped, len(self.problems))
+
+# END class OfxStream
+
+
+def parse_ofx_main(args:list):
+    usage = "usage: python3 parseOfx.py <ofx|qfx file> <mode: prod|test> [gnucash file] [card account]"
+    if len(args) < 2:
+        print_error("NOT ENOUGH parameters!")
+        print_info(usage, MAGENTA)
+        exit(182)
+
+    ofx_file = args[0]
+    if not osp.isfile(ofx_file):
+        print_error("File path '{}' does not exist. Exiting...".format(ofx_file))
+        print_info(usage, GREEN)
+        exit(188)
+    print_info("ofx_file = {}".format(ofx_file))
+
+    mode = args[1].upper()
+    gnc_file = args[2] if len(args) > 2 else None
+    card = args[3] if len(args) > 3 else CIBC_VISA
+
+    try:
+        # without a Gnucash file there is nothing to remember
+        seen = FitidStore(gnc_file + FITID_SUFFIX if gnc_file else None)
+        stream = OfxStream(card, seen)
+        with open(ofx_file, encoding=OFX_ENCODING, errors="replace") as fp:
+            record = collect_cards(stream, read_chunks(fp), CardRecord(ofx_file))
+        print_info(stream.get_report(), GREEN)
+        if stream.problems:
+            for problem in stream.problems:
+                print_error(problem)
+            raise Exception("{} BAD tx(s) in '{}': NOTHING was written!".format(len(stream.problems), ofx_file))
+
+        msg = TEST
+        if mode == PROD:
+            out_file = GncUtilities.save_to_json(osp.splitext(ofx_file)[0], record.to_json(), strnow)
+            msg = "parseOfx created file: {}".format(out_file)
+
+        if gnc_file and record.get_size() > 0:
+            from gnucashSession import GnucashSession
+            gncs = GnucashSession(record, mode, gnc_file, False, CARD)
+            msg = gncs.prepare_session()
+            if mode == PROD:
+                print_info("Saved {} NEW FITID(s) to '{}'.".format(seen.save(), seen.file), GREEN)
+
+    except Exception as pofe:
+        msg = "parse_ofx_main() EXCEPTION!! '{}'".format(repr(pofe))
+        print_error(msg)
+
+    print_info("\n >>> PROGRAM ENDED.", GREEN)
+    return msg
+
+
+if __name__ == '__main__':
+    import sys
+    parse_ofx_main(sys.argv[1:])
@@ -0,0 +1,385 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# pdfBackends.py -- ONE interface to the different ways of getting the text of a pdf report:
+#                   pymupdf, the pdftotext command, pdfminer.six, PyPDF2 and a Tika server
+#                   each backend has  extract(path, pages) -> iterator of the text of each page
+#                   and the first one INSTALLED, in the order of BACKENDS, is used unless one is asked for
+#
+#   python3 pdfBackends.py <monarch pdf file> [backend]
+#
+#   set the environment variable PDF_BACKEND to choose the backend of get_backend() ;
+#   TIKA_SERVER_ENDPOINT is the url of the Tika server, e.g. the local stand-in of tikaStandIn.py
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import io
+import os
+import shutil
+import subprocess
+import urllib.request
+from html.parser import HTMLParser
+from Configuration import *
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+try:
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfparser import PDFParser
+except ImportError:
+    PDFPage = None
+
+try:
+    import PyPDF2
+except ImportError:
+    PyPDF2 = None
+
+PDF_BACKEND_ENV: str = "PDF_BACKEND"
+TIKA_ENDPOINT_ENV: str = "TIKA_SERVER_ENDPOINT"
+TIKA_DEFAULT_ENDPOINT: str = "http://localhost:9998"
+# seconds to wait for the Tika server to answer that it is there
+TIKA_PING_TIMEOUT = 1.0
+
+PDFTOTEXT_ENV: str = "PDFTOTEXT"
+PDFTOTEXT_PATHS = ("pdftotext", "/usr/local/bin/pdftotext")
+# pdftotext ends EACH page with a form feed
+PAGE_BREAK: str = '\f'
+READ_SIZE = 64 * 1024
+
+
+def wanted_pages(p_pages, p_count:int) -> list:
+    """:return: the page numbers (from 0) of p_pages, or ALL the pages of a document with p_count pages if None"""
+    if p_pages is None:
+        return list(range(p_count))
+    pages = list(p_pages)
+    for num in pages:
+        if not 0 <= num < p_count:
+            raise IndexError("PROBLEM!! Page {} is NOT in a document of {} pages!".format(num, p_count))
+    return pages
+
+
+class PdfBackend:
+    """
+    The text of the pages of a pdf file:
+      extract(path, pages) -> iterator of the text of each page, in the order of pages (numbered from 0),
+                              or of EVERY page if pages is None ; each line of a page ends with a newline
+    """
+    name = None
+
+    @staticmethod
+    def available() -> bool:
+        """:return: True if the package, program or server that the backend needs is there"""
+        raise NotImplementedError
+
+    def extract(self, p_path:str, p_pages=None):
+        raise NotImplementedError
+
+    def lines(self, p_path:str, p_pages=None):
+        """generator of the lines of the pages, e.g. for collect_record(PdfTxStream(), backend.lines(file))"""
+        for text in self.extract(p_path, p_pages):
+            yield from text.splitlines(True)
+
+# END class PdfBackend
+
+
+class PymupdfBackend(PdfBackend):
+    name = "pymupdf"
+
+    @staticmethod
+    def available() -> bool:
+        return pymupdf is not None
+
+    def extract(self, p_path:str, p_pages=None):
+        with pymupdf.open(p_path) as doc:
+            for num in wanted_pages(p_pages, doc.page_count):
+                yield doc[num].get_text("text")
+
+# END class PymupdfBackend
+
+
+def pdftotext_path():
+    """:return: the path of the pdftotext program, from the environment variable PDFTOTEXT or the PATH, or None"""
+    for prog in ([os.environ[PDFTOTEXT_ENV]] if os.environ.get(PDFTOTEXT_ENV) else PDFTOTEXT_PATHS):
+        path = shutil.which(prog)
+        if path:
+            return path
+    return None
+
+
+class PdftotextBackend(PdfBackend):
+    """
+    ONE pdftotext process for the range from the first to the last page wanted, and each page is yielded
+    as soon as its form feed is read from stdout, so the whole output is never held at once
+    """
+    name = "pdftotext"
+
+    def __init__(self, p_program:str = None):
+        self.program = p_program or pdftotext_path()
+
+    @staticmethod
+    def available() -> bool:
+        return pdftotext_path() is not None
+
+    def command(self, p_path:str, p_first:int = None, p_last:int = None) -> list:
+        """:return: the pdftotext command line for the pages p_first to p_last, from 0, or ALL if None"""
+        args = [self.program, "-enc", "UTF-8"]
+        if p_first is not None:
+            args += ["-f", str(p_first + 1), "-l", str(p_last + 1)]
+        return args + [p_path, '-']
+
+    def extract(self, p_path:str, p_pages=None):
+        pages = None if p_pages is None else list(p_pages)
+        if pages == []:
+            return
+        first = None if pages is None else min(pages)
+        last = None if pages is None else max(pages)
+        # the text of the pages wanted is kept until their turn, as pages may be asked for in any order
+        wanted = None if pages is None else set(pages)
+        texts = {}
+        with subprocess.Popen(self.command(p_path, first, last), stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            reader = io.TextIOWrapper(proc.stdout, encoding="utf-8", errors="replace", newline='')
+            num = first or 0
+            expected = 0
+            for text in split_pages(reader):
+                if pages is None:
+                    yield text
+                    continue
+                if num in wanted:
+                    texts[num] = text
+                while expected < len(pages) and pages[expected] in texts:
+                    yield texts[pages[expected]]
+                    expected += 1
+                num += 1
+            errors = proc.stderr.read().decode("utf-8", "replace").strip()
+        if proc.returncode != 0:
+            raise Exception("PROBLEM!! pdftotext exit code {} for '{}': {}".format(proc.returncode, p_path, errors))
+        if pages is not None and expected < len(pages):
+            raise IndexError("PROBLEM!! pdftotext did NOT return page {} of '{}'!".format(pages[expected], p_path))
+
+# END class PdftotextBackend
+
+
+def split_pages(p_reader):
+    """generator of the text of each page from a reader of pdftotext output, as soon as its form feed is read"""
+    pending = []
+    for chunk in iter(lambda: p_reader.read(READ_SIZE), ''):
+        while True:
+            end = chunk.find(PAGE_BREAK)
+            if end < 0:
+                pending.append(chunk)
+                break
+            pending.append(chunk[:end])
+            yield ''.join(pending)
+            pending = []
+            chunk = chunk[end + 1:]
+    # NO form feed after the last page if pdftotext was stopped
+    if ''.join(pending).strip():
+        yield ''.join(pending)
+
+
+class PdfminerBackend(PdfBackend):
+    """pdfminer.six with ONE interpreter and ONE output buffer for all the pages"""
+    name = "pdfminer"
+
+    @staticmethod
+    def available() -> bool:
+        return PDFPage is not None
+
+    def extract(self, p_path:str, p_pages=None):
+        manager = PDFResourceManager()
+        buffer = io.StringIO()
+        device = TextConverter(manager, buffer, laparams=LAParams())
+        interpreter = PDFPageInterpreter(manager, device)
+        try:
+            with open(p_path, 'rb') as fp:
+                doc_pages = list(PDFPage.create_pages(PDFDocument(PDFParser(fp))))
+                for num in wanted_pages(p_pages, len(doc_pages)):
+                    buffer.seek(0)
+                    buffer.truncate(0)
+                    interpreter.process_page(doc_pages[num])
+                    yield buffer.getvalue().rstrip(PAGE_BREAK)
+        finally:
+            device.close()
+
+# END class PdfminerBackend
+
+
+class Pypdf2Backend(PdfBackend):
+    name = "PyPDF2"
+
+    @staticmethod
+    def available() -> bool:
+        return PyPDF2 is not None
+
+    def extract(self, p_path:str, p_pages=None):
+        with open(p_path, 'rb') as fp:
+            reader = PyPDF2.PdfFileReader(fp)
+            for num in wanted_pages(p_pages, reader.numPages):
+                page = reader.getPage(num)
+                # extractText() was renamed in PyPDF2 2.0
+                text = page.extract_text() if hasattr(page, "extract_text") else page.extractText()
+                yield text if text.endswith('\n') or not text else text + '\n'
+
+# END class Pypdf2Backend
+
+
+class TikaPages(HTMLParser):
+    """the text of each <div class="page"> of the XHTML from a Tika server, one line per paragraph"""
+    def __init__(self):
+        super().__init__()
+        self.pages = []
+        self.depth = 0
+        self.text = None
+        self.in_para = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.text is None:
+            if tag == "div" and ("class", "page") in attrs:
+                self.text = []
+                self.depth = 1
+        elif tag == "div":
+            self.depth += 1
+        elif tag == 'p':
+            self.in_para = True
+
+    def handle_endtag(self, tag):
+        if self.text is None:
+            return
+        if tag == 'p':
+            self.text.append('\n')
+            self.in_para = False
+        elif tag == "div":
+            self.depth -= 1
+            if self.depth == 0:
+                self.pages.append(''.join(self.text))
+                self.text = None
+
+    def handle_data(self, data):
+        # the newlines between the tags are NOT part of the text
+        if self.in_para:
+            self.text.append(data)
+
+# END class TikaPages
+
+
+def tika_endpoint() -> str:
+    return os.environ.get(TIKA_ENDPOINT_ENV) or TIKA_DEFAULT_ENDPOINT
+
+
+class TikaBackend(PdfBackend):
+    """
+    The XHTML of a Tika server: PUT the pdf to <endpoint>/tika and split the answer on the page divs.
+    Any server with the same REST interface will do, e.g. the stand-in of tikaStandIn.py, which needs NO Java.
+    """
+    name = "tika"
+
+    def __init__(self, p_endpoint:str = None):
+        self.endpoint = p_endpoint or tika_endpoint()
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            with urllib.request.urlopen(tika_endpoint() + "/tika", timeout=TIKA_PING_TIMEOUT) as resp:
+                return resp.status == 200
+        except OSError:
+            return False
+
+    def extract(self, p_path:str, p_pages=None):
+        with open(p_path, 'rb') as fp:
+            request = urllib.request.Request(self.endpoint + "/tika", data=fp.read(), method="PUT",
+                                             headers={"Accept": "text/html", "Content-Type": "application/pdf"})
+        with urllib.request.urlopen(request) as resp:
+            parser = TikaPages()
+            parser.feed(resp.read().decode("utf-8"))
+            parser.close()
+        for num in wanted_pages(p_pages, len(parser.pages)):
+            yield parser.pages[num]
+
+# END class TikaBackend
+
+
+# name -> backend, in the order that get_backend() tries them
+BACKENDS = {
+    PymupdfBackend.name   : PymupdfBackend   ,
+    PdftotextBackend.name : PdftotextBackend ,
+    PdfminerBackend.name  : PdfminerBackend  ,
+    Pypdf2Backend.name    : Pypdf2Backend    ,
+    TikaBackend.name      : TikaBackend
+}
+
+
+def available_backends() -> list:
+    """:return: the names of the backends that can run here, in the order of BACKENDS"""
+    return [ name for name, backend in BACKENDS.items() if backend.available() ]
+
+
+def get_backend(p_name:str = None) -> PdfBackend:
+    """
+    :param p_name: key of BACKENDS ; if None, the environment variable PDF_BACKEND or else the FIRST available
+    :return: a PdfBackend
+    """
+    name = p_name or os.environ.get(PDF_BACKEND_ENV)
+    if name:
+        if name not in BACKENDS:
+            raise ValueError("Unknown pdf backend: {}".format(name))
+        if not BACKENDS[name].available():
+            raise ImportError("The pdf backend '{}' is NOT available here!".format(name))
+        return BACKENDS[name]()
+    for backend in BACKENDS.values():
+        if backend.available():
+            return backend()
+    raise ImportError("NO pdf backend is available: install one of {}".format(', '.join(BACKENDS)))
+
+
+def pdf_backends_main(args:list):
+    usage = "usage: python3 pdfBackends.py <monarch pdf file> [backend: {}]".format('|'.join(BACKENDS))
+    if len(args) < 1:
+        print_error("NOT ENOUGH parameters!")
+        print_info(usage, MAGENTA)
+        exit(281)
+
+    pdf_file = args[0]
+    if not osp.isfile(pdf_file):
+        print_error("File path '{}' does not exist. Exiting...".format(pdf_file))
+        print_info(usage, GREEN)
+        exit(287)
+    print_info("pdf_file = {}".format(pdf_file))
+
+    try:
+        print_info("available pdf backends: {}".format(available_backends()))
+        backend = get_backend(args[1] if len(args) > 1 else None)
+        print_info("using pdf backend '{}'".format(backend.name), CYAN)
+        from monarchStream import PdfTxStream, collect_record
+        stream = PdfTxStream()
+        record = collect_record( stream, backend.lines(pdf_file) )
+        msg = "Investment record size = {}".format(record.get_size())
+        print_info(msg, GREEN)
+        if stream.problems:
+            for problem in stream.problems:
+                print_error(problem)
+            raise Exception("{} BAD tx(s) in '{}': the record would be INCOMPLETE!".format(len(stream.problems), pdf_file))
+
+    except Exception as pbe:
+        msg = "pdf_backends_main() EXCEPTION!! '{}'".format(repr(pbe))
+        print_error(msg)
+
+    print_info("\n >>> PROGRAM ENDED.", GREEN)
+    return msg
+
+
+if __name__ == '__main__':
+    import sys
+    pdf_backends_main(sys.argv[1:])
@@ -0,0 +1,277 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# pdfPages.py -- extract the text of the pages of a Monarch pdf report across a pool of processes, each of which
+#                opens the document ONCE for its range of pages, and keep the text of each page in a cache keyed by
+#                (file hash, page number, extractor): a parse re-run after a fix to the parser decodes NO pdf at all
+#
+#   python3 pdfPages.py <monarch pdf file> [jobs] [extractor]
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from Configuration import *
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+PAGE_CACHE_DIR = osp.join(osp.expanduser("~"), ".cache", "makeGncTx", "pages")
+# the number of pages of a document is kept in the cache too, so that a fully cached run never opens the pdf
+PAGE_COUNT_FILE = "pages"
+HASH_CHUNK_SIZE = 1024 * 1024
+# a worker is only worth starting for this many pages
+MIN_RANGE_PAGES = 4
+
+
+def page_text(p_page) -> str:
+    """the plain text of a pymupdf page, as in the files of txtFromPdf"""
+    return p_page.get_text("text")
+
+
+def page_blocks(p_page) -> str:
+    """the text of the blocks of a pymupdf page, top to bottom then left to right"""
+    return ''.join( block[4] for block in sorted(p_page.get_text("blocks"), key=lambda b: (b[1], b[0])) )
+
+
+# name -> function of a pymupdf page: the name is part of the cache key so MUST change if the output does
+EXTRACTORS = {
+    "text"   : page_text ,
+    "blocks" : page_blocks
+}
+
+
+def file_hash(p_file:str) -> str:
+    """:return: the sha256 hex digest of the content of a file"""
+    digest = hashlib.sha256()
+    with open(p_file, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PageCache:
+    """
+    The text of each page of the pdf files ALREADY extracted, one file per (file hash, page number, extractor):
+      <cache dir>/<file hash>/<extractor>-<page>.txt
+    Only the main process writes to it, each file is renamed into place so that a reader never sees half a page.
+    """
+    def __init__(self, p_dir:str = PAGE_CACHE_DIR):
+        self.dir = p_dir
+        self.hits = 0
+        self.misses = 0
+
+    def page_file(self, p_hash:str, p_page:int, p_extractor:str) -> str:
+        return osp.join(self.dir, p_hash, "{}-{:04d}.txt".format(p_extractor, p_page))
+
+    @staticmethod
+    def _read(p_file:str):
+        try:
+            with open(p_file, encoding="utf-8") as fp:
+                return fp.read()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write(p_file:str, p_text:str):
+        os.makedirs(osp.dirname(p_file), exist_ok=True)
+        tmp_file = p_file + ".tmp"
+        with open(tmp_file, 'w', encoding="utf-8") as fp:
+            fp.write(p_text)
+        os.replace(tmp_file, p_file)
+
+    def get(self, p_hash:str, p_page:int, p_extractor:str):
+        """:return: the cached text of the page, or None"""
+        text = self._read( self.page_file(p_hash, p_page, p_extractor) )
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def put(self, p_hash:str, p_page:int, p_extractor:str, p_text:str):
+        self._write(self.page_file(p_hash, p_page, p_extractor), p_text)
+
+    def get_page_count(self, p_hash:str):
+        count = self._read( osp.join(self.dir, p_hash, PAGE_COUNT_FILE) )
+        return None if count is None else int(count)
+
+    def put_page_count(self, p_hash:str, p_count:int):
+        self._write(osp.join(self.dir, p_hash, PAGE_COUNT_FILE), str(p_count))
+
+    def get_report(self) -> str:
+        return "page cache '{}': {} hit(s), {} miss(es)".format(self.dir, self.hits, self.misses)
+
+# END class PageCache
+
+
+# the document open in THIS worker process: a worker given more ranges of the same file does not re-open it
+_worker_docs = {}
+
+
+def _worker_doc(p_file:str):
+    doc = _worker_docs.get(p_file)
+    if doc is None:
+        for old_doc in _worker_docs.values():
+            old_doc.close()
+        _worker_docs.clear()
+        doc = _worker_docs[p_file] = pymupdf.open(p_file)
+    return doc
+
+
+def _init_worker(p_level:int):
+    GNULOG.set_level(p_level)
+
+
+def extract_range(p_file:str, p_extractor:str, p_pages:list) -> list:
+    """
+    Run in a worker: the text of some pages from the ONE open document of the worker
+    :return: list of (page number, text)
+    """
+    doc = _worker_doc(p_file)
+    func = EXTRACTORS[p_extractor]
+    return [ (num, func(doc[num])) for num in p_pages ]
+
+
+def split_ranges(p_pages:list, p_parts:int) -> list:
+    """:return: at most p_parts lists of consecutive items of p_pages, as even as possible"""
+    parts = max(1, min(p_parts, len(p_pages)))
+    size, extra = divmod(len(p_pages), parts)
+    ranges = []
+    start = 0
+    for num in range(parts):
+        end = start + size + (1 if num < extra else 0)
+        ranges.append(p_pages[start:end])
+        start = end
+    return ranges
+
+
+def _cached_texts(p_file:str, p_extractor:str, p_cache:PageCache) -> tuple:
+    """:return: (file hash or None, list with the cached text of each page OR None if NOT cached)"""
+    digest = file_hash(p_file) if p_cache else None
+    num_pages = p_cache.get_page_count(digest) if p_cache else None
+    if num_pages is None:
+        if pymupdf is None:
+            raise ImportError("Package pymupdf is needed to read the pdf reports!")
+        with pymupdf.open(p_file) as doc:
+            num_pages = doc.page_count
+        if p_cache:
+            p_cache.put_page_count(digest, num_pages)
+    if not p_cache:
+        return digest, [None] * num_pages
+    return digest, [ p_cache.get(digest, num, p_extractor) for num in range(num_pages) ]
+
+
+def extract_files(p_files:list, p_extractor:str = "text", p_jobs:int = 1, p_cache:PageCache = None,
+                  p_level:int = LOG_ERROR) -> list:
+    """
+    The text of each page of some pdf files: the pages NOT in the cache are split into ranges of at least
+    MIN_RANGE_PAGES pages, up to p_jobs per file, and ALL the ranges go to ONE pool of worker processes,
+    each of which opens a document once for the ranges it gets
+    :param     p_files: pdf files
+    :param p_extractor: key of EXTRACTORS
+    :param      p_jobs: number of worker processes; 1 extracts in THIS process
+    :param     p_cache: PageCache, or None to extract EVERY page
+    :param     p_level: Gnulog level in the workers
+    :return: list with a list of str, one per page, for each file
+    """
+    if p_extractor not in EXTRACTORS:
+        raise ValueError("Unknown pdf extractor: {}".format(p_extractor))
+    digests = []
+    all_texts = []
+    work = []
+    for pdf_file in p_files:
+        digest, texts = _cached_texts(pdf_file, p_extractor, p_cache)
+        digests.append(digest)
+        all_texts.append(texts)
+        missing = [ num for num in range(len(texts)) if texts[num] is None ]
+        if missing:
+            parts = min(p_jobs, -(-len(missing) // MIN_RANGE_PAGES))
+            work.extend( (len(all_texts) - 1, pages) for pages in split_ranges(missing, parts) )
+    if not work:
+        return all_texts
+    if pymupdf is None:
+        raise ImportError("Package pymupdf is needed to read the pdf reports!")
+
+    if p_jobs <= 1 or len(work) == 1:
+        results = []
+        func = EXTRACTORS[p_extractor]
+        for index, pages in work:
+            with pymupdf.open(p_files[index]) as doc:
+                results.append( [(num, func(doc[num])) for num in pages] )
+    else:
+        with ProcessPoolExecutor(max_workers=min(p_jobs, len(work)), initializer=_init_worker,
+                                 initargs=(p_level,)) as pool:
+            futures = [ pool.submit(extract_range, p_files[index], p_extractor, pages) for index, pages in work ]
+            results = [ future.result() for future in futures ]
+
+    for (index, _), pages in zip(work, results):
+        for num, text in pages:
+            all_texts[index][num] = text
+            if p_cache:
+                p_cache.put(digests[index], num, p_extractor, text)
+    return all_texts
+
+
+def extract_pages(p_file:str, p_extractor:str = "text", p_jobs:int = 1, p_cache:PageCache = None,
+                  p_level:int = LOG_ERROR) -> list:
+    """:return: list of the text of each page of ONE pdf file, see extract_files()"""
+    return extract_files([p_file], p_extractor, p_jobs, p_cache, p_level)[0]
+
+
+def pdf_lines(p_file:str, p_extractor:str = "text", p_jobs:int = 1, p_cache:PageCache = None):
+    """generator of the lines of the text of a pdf file, e.g. for collect_record(PdfTxStream(), pdf_lines(file))"""
+    for text in extract_pages(p_file, p_extractor, p_jobs, p_cache):
+        yield from text.splitlines(True)
+
+
+def pdf_pages_main(args:list):
+    usage = "usage: python3 pdfPages.py <monarch pdf file> [jobs] [extractor: {}]".format('|'.join(EXTRACTORS))
+    if len(args) < 1:
+        print_error("NOT ENOUGH parameters!")
+        print_info(usage, MAGENTA)
+        exit(211)
+
+    pdf_file = args[0]
+    if not osp.isfile(pdf_file):
+        print_error("File path '{}' does not exist. Exiting...".format(pdf_file))
+        print_info(usage, GREEN)
+        exit(217)
+    print_info("pdf_file = {}".format(pdf_file))
+
+    jobs = int(args[1]) if len(args) > 1 else os.cpu_count() or 1
+    extractor = args[2] if len(args) > 2 else "text"
+
+    try:
+        from monarchStream import PdfTxStream, collect_record
+        cache = PageCache()
+        stream = PdfTxStream()
+        record = collect_record( stream, pdf_lines(pdf_file, extractor, jobs, cache) )
+        print_info(cache.get_report(), GREEN)
+        msg = "Investment record size = {}".format(record.get_size())
+        print_info(msg, GREEN)
+        if stream.problems:
+            for problem in stream.problems:
+                print_error(problem)
+            raise Exception("{} BAD tx(s) in '{}': the record would be INCOMPLETE!".format(len(stream.problems), pdf_file))
+
+    except Exception as ppe:
+        msg = "pdf_pages_main() EXCEPTION!! '{}'".format(repr(ppe))
+        print_error(msg)
+
+    print_info("\n >>> PROGRAM ENDED.", GREEN)
+    return msg
+
+
+if __name__ == '__main__':
+    import sys
+    pdf_pages_main(sys.argv[1:])
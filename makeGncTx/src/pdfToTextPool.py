@@ -0,0 +1,175 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# pdfToTextPool.py -- convert many Monarch pdf reports with at most <jobs> pdftotext processes running at once:
+#                     the stdout of each process is read line by line as it is written and fed straight to a
+#                     Monarch line parser, so there are NO temp files and the whole text of a report is never held
+#
+#   python3 pdfToTextPool.py [-j jobs] <monarch pdf files...>
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import os
+import asyncio
+from Configuration import *
+from monarchStream import PdfTxStream
+from pdfBackends import PAGE_BREAK, PdftotextBackend, pdftotext_path
+
+
+class PdfToTextResult:
+    """
+    What ONE pdftotext conversion produced:
+      record: InvestmentRecord with the trades of the report, or None if pdftotext or the parser failed
+      returncode: exit code of pdftotext, or None if it could NOT be started
+      problem: the exception of the parser, which stops the conversion of the file,
+               OR the txs the parser could NOT read: the record would be INCOMPLETE so it is NOT kept
+    """
+    __slots__ = ('file', 'record', 'returncode', 'errors', 'problem', 'lines')
+
+    def __init__(self, p_file:str):
+        self.file = p_file
+        self.record = None
+        self.returncode = None
+        self.errors = ''
+        self.problem = None
+        self.lines = 0
+
+    def ok(self) -> bool:
+        return self.returncode == 0 and self.problem is None
+
+    def __repr__(self):
+        if self.ok():
+            return "PdfToTextResult({}: {} lines, record size = {})".format(self.file, self.lines, self.record.get_size())
+        if self.problem:
+            return "PdfToTextResult({}: parser problem at line {}: {})".format(self.file, self.lines, self.problem)
+        return "PdfToTextResult({}: exit code {}: {})".format(self.file, self.returncode, self.errors)
+
+# END class PdfToTextResult
+
+
+async def read_lines(p_stdout, p_stream, p_record) -> int:
+    """
+    Feed each line of pdftotext output to the parser as soon as it is read
+    :return: number of lines
+    """
+    num = 0
+    while True:
+        data = await p_stdout.readline()
+        if not data:
+            return num
+        # the first line of each page after the first starts with the form feed of the page before
+        line = data.decode("utf-8", "replace").lstrip(PAGE_BREAK)
+        if not line:
+            continue
+        num += 1
+        for evt in p_stream.feed(line):
+            p_record.add_tx(evt.plan_type, evt.tx_type, evt.record)
+
+
+async def convert_file(p_file:str, p_backend:PdftotextBackend, p_slots:asyncio.Semaphore,
+                       p_stream_class=PdfTxStream) -> PdfToTextResult:
+    """run pdftotext on ONE file once a slot is free, parsing its output as it arrives"""
+    result = PdfToTextResult(p_file)
+    stream = p_stream_class()
+    record = InvestmentRecord()
+    async with p_slots:
+        print_debug("start pdftotext on '{}'".format(p_file))
+        try:
+            proc = await asyncio.create_subprocess_exec(*p_backend.command(p_file), stdout=asyncio.subprocess.PIPE,
+                                                        stderr=asyncio.subprocess.PIPE)
+        except OSError as ose:
+            result.errors = repr(ose)
+            return result
+        # stderr is read at the same time so that a full pipe can NOT block pdftotext
+        read_errors = asyncio.ensure_future(proc.stderr.read())
+        finished = False
+        try:
+            result.lines = await read_lines(proc.stdout, stream, record)
+            finished = True
+        except Exception as rle:
+            result.lines = stream.line_num
+            result.problem = repr(rle)
+        finally:
+            # a file the parser gave up on, or a cancelled run, must NOT leave pdftotext running
+            if not finished and proc.returncode is None:
+                proc.kill()
+            errors = await read_errors
+            result.returncode = await proc.wait()
+    result.errors = errors.decode("utf-8", "replace").strip()
+    if result.problem is None and stream.problems:
+        for problem in stream.problems:
+            print_error(problem)
+        result.problem = "{} BAD tx(s): the record would be INCOMPLETE!".format(len(stream.problems))
+    if result.ok():
+        if stream.owner is not None:
+            record.set_owner(stream.owner)
+        result.record = record
+    elif result.problem:
+        print_error("PROBLEM parsing the pdftotext output of '{}' at line {}: {}".format(p_file, result.lines, result.problem))
+    else:
+        print_error("pdftotext exit code {} for '{}': {}".format(result.returncode, p_file, result.errors))
+    return result
+
+
+async def convert_files_async(p_files:list, p_jobs:int, p_program:str = None, p_stream_class=PdfTxStream) -> list:
+    backend = PdftotextBackend(p_program)
+    slots = asyncio.Semaphore(max(1, p_jobs))
+    return await asyncio.gather( *[convert_file(pdf_file, backend, slots, p_stream_class) for pdf_file in p_files] )
+
+
+def convert_files(p_files:list, p_jobs:int = None, p_program:str = None, p_stream_class=PdfTxStream) -> list:
+    """
+    Convert and parse some pdf reports with a bounded pool of concurrent pdftotext processes
+    :param        p_files: pdf files
+    :param         p_jobs: most pdftotext processes at once, default: number of cpus
+    :param      p_program: path of pdftotext, default: see pdfBackends.pdftotext_path()
+    :param p_stream_class: MonarchStream class for the text of each report
+    :return: list of PdfToTextResult, in the order of p_files ; a failed file does NOT stop the others
+    """
+    program = p_program or pdftotext_path()
+    if program is None:
+        raise ImportError("Program pdftotext is needed to convert the pdf reports!")
+    return asyncio.run( convert_files_async(p_files, p_jobs or os.cpu_count() or 1, program, p_stream_class) )
+
+
+def pdf_to_text_pool_main(args:list):
+    usage = "usage: python3 pdfToTextPool.py [-j jobs] <monarch pdf files...>"
+    jobs = None
+    if len(args) > 1 and args[0] == "-j":
+        jobs = int(args[1])
+        args = args[2:]
+    if len(args) < 1:
+        print_error("NOT ENOUGH parameters!")
+        print_info(usage, MAGENTA)
+        exit(123)
+
+    for pdf_file in args:
+        if not osp.isfile(pdf_file):
+            print_error("File path '{}' does not exist. Exiting...".format(pdf_file))
+            print_info(usage, GREEN)
+            exit(129)
+
+    try:
+        results = convert_files(args, jobs)
+        for res in results:
+            print_info(repr(res), GREEN if res.ok() else RED)
+        msg = "{} of {} file(s) converted".format(sum(1 for res in results if res.ok()), len(results))
+        print_info(msg, GREEN)
+
+    except Exception as ptpe:
+        msg = "pdf_to_text_pool_main() EXCEPTION!! '{}'".format(repr(ptpe))
+        print_error(msg)
+
+    print_info("\n >>> PROGRAM ENDED.", GREEN)
+    return msg
+
+
+if __name__ == '__main__':
+    import sys
+    pdf_to_text_pool_main(sys.argv[1:])
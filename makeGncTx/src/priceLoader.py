@@ -0,0 +1,138 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# priceLoader.py -- load ALL the prices of a run into the Gnucash PriceDB in ONE edit batch,
+#                   collapsing duplicates and skipping the prices that are already in the PriceDB
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+from gncBindings import GncNumeric, GncPrice
+from Configuration import *
+
+PRICE_SOURCE = "user:price"
+
+
+class PriceLoader:
+    """
+    Collect the prices of a run with add() or add_record(), then write them with load():
+      key = (commodity namespace, commodity mnemonic, date, price type)
+      - prices with the SAME key in the run collapse into ONE: the last one added wins
+      - a price with the same key AND value as one already in the PriceDB is skipped
+      - a price with the same key but a DIFFERENT value replaces the one in the PriceDB
+    The commodity of each fund is looked up ONCE per (asset parent, fund) and the existing prices are read ONCE
+    per commodity, then all the new prices are added inside a single begin_edit() / commit_edit() of the PriceDB.
+    """
+    def __init__(self, p_book, p_price_db, p_currency, p_acct_index:AccountIndex):
+        self.book = p_book
+        self.price_db = p_price_db
+        self.currency = p_currency
+        self.acct_index = p_acct_index
+        # (parent GUID, fund name) -> commodity, or None if there is no such asset account
+        self._commodities = {}
+        # key -> [commodity, date, value in 1/10000]
+        self._pending = {}
+        self.created = 0
+        self.skipped = 0
+        self.replaced = 0
+        self.collapsed = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    @staticmethod
+    def make_key(p_comm, p_date, p_type:str) -> tuple:
+        return p_comm.get_namespace(), p_comm.get_mnemonic(), to_date(p_date), p_type
+
+    def get_commodity(self, p_parent, p_fund:str):
+        """:return: commodity of the asset account p_fund under p_parent, or None if it does NOT exist"""
+        key = (AccountIndex.guid_of(p_parent), p_fund)
+        if key not in self._commodities:
+            acct = self.acct_index.lookup(p_parent, p_fund)
+            self._commodities[key] = None if acct is None else acct.GetCommodity()
+        return self._commodities[key]
+
+    def add(self, p_comm, p_date, p_price:int, p_type:str = 'nav'):
+        """
+        :param    p_comm: Gnucash commodity
+        :param    p_date: date or datetime of the price
+        :param   p_price: in 1/10000 of the currency
+        :param    p_type: Gnucash price type
+        """
+        key = self.make_key(p_comm, p_date, p_type)
+        if key in self._pending:
+            self.collapsed += 1
+        self._pending[key] = [p_comm, to_date(p_date), p_price]
+
+    def add_record(self, p_prec:PriceRecord, p_parent, p_type:str = 'nav') -> bool:
+        """:return: False if there is NO asset account for the fund of the price under p_parent"""
+        comm = self.get_commodity(p_parent, p_prec.fund)
+        if comm is None:
+            return False
+        self.add(comm, p_prec.date, p_prec.price, p_type)
+        return True
+
+    def existing_prices(self, p_comm) -> dict:
+        """:return: (date, type) -> price, for the prices of the commodity ALREADY in the PriceDB"""
+        existing = {}
+        for price in self.price_db.get_prices(p_comm, self.currency):
+            existing.setdefault( (to_date(price.get_time64()), price.get_typestr()), price )
+        return existing
+
+    def new_price(self, p_comm, p_date, p_price:int, p_type:str):
+        price = GncPrice(self.book)
+        price.begin_edit()
+        price.set_time64( dt(p_date.year, p_date.month, p_date.day) )
+        price.set_commodity(p_comm)
+        price.set_currency(self.currency)
+        price.set_value( GncNumeric(p_price, 10000) )
+        price.set_source_string(PRICE_SOURCE)
+        price.set_typestr(p_type)
+        price.commit_edit()
+        return price
+
+    def load(self, p_save:bool) -> str:
+        """
+        Sort out the collected prices against the PriceDB and, if p_save, write them in ONE edit batch
+        :return: report of the counts
+        """
+        by_commodity = {}
+        for key, (comm, pr_date, value) in self._pending.items():
+            by_commodity.setdefault(key[:2], (comm, []))[1].append( (pr_date, key[3], value) )
+
+        to_add = []
+        to_remove = []
+        for comm, prices in by_commodity.values():
+            existing = self.existing_prices(comm)
+            for pr_date, pr_type, value in prices:
+                old = existing.get( (pr_date, pr_type) )
+                if old is not None:
+                    if scale_gnc_numeric(old.get_value(), 10000) == value:
+                        self.skipped += 1
+                        continue
+                    to_remove.append(old)
+                    self.replaced += 1
+                else:
+                    self.created += 1
+                to_add.append( (comm, pr_date, value, pr_type) )
+
+        if p_save and (to_add or to_remove):
+            self.price_db.begin_edit()
+            for old in to_remove:
+                self.price_db.remove_price(old)
+            for comm, pr_date, value, pr_type in to_add:
+                self.price_db.add_price( self.new_price(comm, pr_date, value, pr_type) )
+            self.price_db.commit_edit()
+        self._pending = {}
+        return self.get_report(p_save)
+
+    def get_report(self, p_saved:bool = True) -> str:
+        return "Prices {}: created {}, replaced {}, skipped {} ALREADY in the PriceDB, collapsed {} duplicates."\
+               .format("LOADED" if p_saved else "NOT saved", self.created, self.replaced, self.skipped, self.collapsed)
+
+# END class PriceLoader
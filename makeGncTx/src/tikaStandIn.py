@@ -0,0 +1,107 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# tikaStandIn.py -- local, pure-Python stand-in for the parts of the Tika server REST interface used by pdfBackends.py:
+#                   GET /tika to check the server is there, PUT /tika of a pdf to get back XHTML with a
+#                   <div class="page"> per page -- the text is from pymupdf, so NO Java is needed
+#
+#   python3 tikaStandIn.py [port]
+#   then e.g.  TIKA_SERVER_ENDPOINT=http://localhost:9998 python3 pdfBackends.py <monarch pdf file> tika
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+import html
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from Configuration import *
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+STAND_IN_HOST: str = "localhost"
+STAND_IN_PORT = 9998
+GREETING: str = "This is Tika Server (stand-in). Please PUT\n"
+
+
+def pdf_xhtml(p_data:bytes) -> str:
+    """:return: the XHTML of a pdf as a Tika server gives it: a div per page, a paragraph per line"""
+    parts = ["<html xmlns=\"http://www.w3.org/1999/xhtml\"><head></head><body>"]
+    with pymupdf.open(stream=p_data, filetype="pdf") as doc:
+        for page in doc:
+            parts.append("<div class=\"page\">")
+            parts.extend( "<p>{}</p>".format(html.escape(line)) for line in page.get_text("text").splitlines() )
+            parts.append("</div>")
+    parts.append("</body></html>")
+    return '\n'.join(parts)
+
+
+class TikaHandler(BaseHTTPRequestHandler):
+    def answer(self, p_code:int, p_text:str, p_type:str = "text/plain"):
+        body = p_text.encode("utf-8")
+        self.send_response(p_code)
+        self.send_header("Content-Type", p_type + "; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == "/tika":
+            self.answer(200, GREETING)
+        else:
+            self.answer(404, "Not Found")
+
+    def do_PUT(self):
+        if self.path.rstrip('/') != "/tika":
+            self.answer(404, "Not Found")
+            return
+        data = self.rfile.read( int(self.headers.get("Content-Length", 0)) )
+        try:
+            self.answer(200, pdf_xhtml(data), "text/html")
+        except Exception as tse:
+            self.answer(422, "Unprocessable Entity: {}".format(repr(tse)))
+
+    def log_message(self, p_format, *args):
+        print_debug("tika stand-in: " + (p_format % args))
+
+# END class TikaHandler
+
+
+def start_stand_in(p_port:int = 0) -> tuple:
+    """
+    Serve the stand-in from a daemon thread of THIS process
+    :param p_port: 0 for any free port
+    :return: (server, endpoint url) ; call server.shutdown() to stop it
+    """
+    if pymupdf is None:
+        raise ImportError("Package pymupdf is needed to read the pdf reports!")
+    server = ThreadingHTTPServer((STAND_IN_HOST, p_port), TikaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://{}:{}".format(STAND_IN_HOST, server.server_address[1])
+
+
+def tika_stand_in_main(args:list):
+    port = int(args[0]) if len(args) > 0 else STAND_IN_PORT
+    if pymupdf is None:
+        print_error("Package pymupdf is needed to read the pdf reports!")
+        exit(91)
+    server = ThreadingHTTPServer((STAND_IN_HOST, port), TikaHandler)
+    print_info("tika stand-in at http://{}:{}".format(STAND_IN_HOST, port), GREEN)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    print_info("\n >>> PROGRAM ENDED.", GREEN)
+
+
+if __name__ == '__main__':
+    import sys
+    tika_stand_in_main(sys.argv[1:])
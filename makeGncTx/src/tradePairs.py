@@ -0,0 +1,83 @@
+###############################################################################################################################
+# coding=utf-8
+#
+# tradePairs.py -- hash-indexed store of the pending legs of paired Monarch trades
+#                  (Switch-in/Switch-out, Inter-Class, Internal Transfer...)
+#
+# Copyright (c) 2026 Mark Sattolo <epistemik@gmail.com>
+
+__author_name__    = "Mark Sattolo"
+__author_email__   = "epistemik@gmail.com"
+__python_version__ = "3.9+"
+__created__ = "2026-10-17"
+__updated__ = "2026-10-17"
+
+
+class PendingPairs:
+    """
+    Keep the first leg of each paired trade until the opposite leg shows up.
+      key = (plan type, fund company, trade date, absolute amount)
+    the legs of a pair have the SAME key and OPPOSITE amounts, so a match is one dict lookup
+    instead of a scan of all the pending trades in the plan.
+    """
+    def __init__(self):
+        # key -> list of [amount, tx] waiting for a leg with the opposite amount
+        self._pending = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @staticmethod
+    def make_key(plan_type:str, fund_cmpy:str, trade_date, amount:int) -> tuple:
+        return plan_type, fund_cmpy, trade_date, abs(amount)
+
+    def pop_match(self, plan_type:str, fund_cmpy:str, trade_date, amount:int):
+        """
+        Find and REMOVE the pending leg that pairs with a tx of the given amount.
+        :return the stored tx with amount == -amount, or None
+        """
+        key = self.make_key(plan_type, fund_cmpy, trade_date, amount)
+        legs = self._pending.get(key)
+        if not legs:
+            return None
+        for indx, (leg_amt, leg_tx) in enumerate(legs):
+            if leg_amt == -amount:
+                del legs[indx]
+                if not legs:
+                    del self._pending[key]
+                self._size -= 1
+                return leg_tx
+        return None
+
+    def add(self, plan_type:str, fund_cmpy:str, trade_date, amount:int, tx):
+        """Store a leg until its opposite leg is found."""
+        key = self.make_key(plan_type, fund_cmpy, trade_date, amount)
+        self._pending.setdefault(key, []).append([amount, tx])
+        self._size += 1
+
+    def match_or_add(self, plan_type:str, fund_cmpy:str, trade_date, match_amount:int, tx, store_amount:int = None):
+        """
+        Return the stored opposite leg of tx if there is one, otherwise keep tx as a pending leg.
+        :param    match_amount: amount of tx to compare with the stored legs
+        :param    store_amount: amount to store tx with, if different from match_amount, e.g. Gross vs Net
+        :return the matching tx or None
+        """
+        pair_tx = self.pop_match(plan_type, fund_cmpy, trade_date, match_amount)
+        if pair_tx is None:
+            self.add(plan_type, fund_cmpy, trade_date, match_amount if store_amount is None else store_amount, tx)
+        return pair_tx
+
+    def get_unmatched(self) -> list:
+        """:return list of (plan type, fund company, trade date, amount, tx) for every leg still waiting"""
+        unmatched = []
+        for (plan_type, fund_cmpy, trade_date, _), legs in self._pending.items():
+            for amount, tx in legs:
+                unmatched.append((plan_type, fund_cmpy, trade_date, amount, tx))
+        return unmatched
+
+    def clear(self):
+        self._pending.clear()
+        self._size = 0
+
+# END class PendingPairs
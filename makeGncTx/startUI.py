@@ -13,7 +13,7 @@ __updated__ = "2024-02-08"
 
 from PyQt5.QtWidgets import (QApplication, QComboBox, QVBoxLayout, QGroupBox, QDialog, QFileDialog, QLabel,
                              QPushButton, QFormLayout, QDialogButtonBox, QTextEdit, QCheckBox, QInputDialog)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
 from functools import partial
 from parseMonarchCopyRep import *
 
@@ -24,6 +24,40 @@ INPUT:str        = "Input"
 SCRIPT_LABEL:str = MON + ' ' + INPUT
 
 
+class RunSignals(QObject):
+    """Signals of a MonarchRun, delivered to the GUI thread: run id, then progress counts or the reply."""
+    progress = pyqtSignal(int, dict)
+    finished = pyqtSignal(int, dict)
+
+
+class MonarchRun(QRunnable):
+    """ONE call of main_monarch_input on a worker thread so that the window stays responsive."""
+    def __init__(self, p_id:int, p_params:list):
+        super().__init__()
+        # the dialog keeps the run to be able to cancel it
+        self.setAutoDelete(False)
+        self.run_id = p_id
+        self.params = p_params
+        self.signals = RunSignals()
+        self.monitor = RunMonitor( partial(self.signals.progress.emit, p_id) )
+
+    def run(self):
+        try:
+            # may have been cancelled while waiting in the queue
+            self.monitor.check()
+            ui_lgr.info(F"Calling main_monarch_input for run #{self.run_id}...")
+            response = main_monarch_input(self.params, self.monitor)
+            reply = {"response": response}
+        except RunCancelled as rce:
+            reply = {"CANCELLED" : repr(rce)}
+        except Exception as mre:
+            msg = repr(mre)
+            ui_lgr.error(msg)
+            reply = {"EXCEPTION" : msg}
+        self.signals.finished.emit(self.run_id, reply)
+# END class MonarchRun
+
+
 # noinspection PyAttributeOutsideInit
 class MonarchGnucashUI(QDialog):
     """Create and run a UI to conveniently specify parameters and run the parseMonarchCopyRep program."""
@@ -37,6 +71,11 @@ class MonarchGnucashUI(QDialog):
         self.height = 800
         self.mon_file = None
         self.gnc_file = None
+        # ONE run at a time as the runs may write to the same Gnucash file: the others wait in the queue
+        self.run_pool = QThreadPool()
+        self.run_pool.setMaxThreadCount(1)
+        self.runs = {}
+        self.run_count = 0
 
         self.init_ui()
         ui_lgr.info(F"{self.title} Runtime = {dt.now().strftime(RUN_DATETIME_FORMAT)}\n")
@@ -56,6 +95,9 @@ class MonarchGnucashUI(QDialog):
         button_box = QDialogButtonBox(QDialogButtonBox.Close)
         button_box.accepted.connect(self.accept)
         button_box.rejected.connect(self.reject)
+        self.cancel_btn = button_box.addButton("Cancel runs", QDialogButtonBox.ActionRole)
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.clicked.connect(self.cancel_runs)
 
         qvb_layout = QVBoxLayout()
         # ?? none of the Alignment flags seem to give the same widget appearance as just leaving out the flag...
@@ -174,16 +216,36 @@ class MonarchGnucashUI(QDialog):
 
         ui_lgr.info(F"Parameters = \n{json.dumps(cl_params, indent=4)}")
 
-        try:
-            ui_lgr.info("Calling main_monarch_input...")
-            response = main_monarch_input(cl_params)
-            reply = {"response": response}
-        except Exception as bcce:
-            msg = repr(bcce)
-            ui_lgr.error(msg)
-            reply = {"EXCEPTION" : msg}
-
-        self.response_box.setText( json.dumps(reply, indent=4) )
+        self.run_count += 1
+        run = MonarchRun(self.run_count, cl_params)
+        run.signals.progress.connect(self.show_progress)
+        run.signals.finished.connect(self.run_finished)
+        self.runs[run.run_id] = run
+        self.cancel_btn.setEnabled(True)
+        self.response_box.append(F"\nRun #{run.run_id} QUEUED: {self.mon_file.split('/')[-1]} ; mode = {mode}")
+        self.run_pool.start(run)
+
+    def show_progress(self, p_id:int, p_counts:dict):
+        self.response_box.append(F"Run #{p_id}: " + " ; ".join(F"{name} = {num}" for name, num in p_counts.items()))
+
+    def run_finished(self, p_id:int, p_reply:dict):
+        self.runs.pop(p_id, None)
+        self.cancel_btn.setEnabled( bool(self.runs) )
+        ui_lgr.info(F"run #{p_id} finished.")
+        self.response_box.append(F"\nRun #{p_id} FINISHED:")
+        self.response_box.append( json.dumps(p_reply, indent=4) )
+
+    def cancel_runs(self):
+        """Cancel ALL the queued runs and the current run, unless it has started to write to the Gnucash file."""
+        ui_lgr.info(F"Cancel {len(self.runs)} run(s).")
+        for run in self.runs.values():
+            run.monitor.cancel()
+
+    def reject(self):
+        """on Close: cancel the runs and wait for the current one to end cleanly"""
+        self.cancel_runs()
+        self.run_pool.waitForDone()
+        super().reject()
 # END class MonarchGnucashUI
 
 
@@ -7,7 +7,9 @@
 # pdfminer.six==20170720
 
 import os
+import time
 import shutil
+import struct
 import warnings
 from io import StringIO
 
@@ -17,11 +19,19 @@ from PIL import Image
 from PyPDF2 import PdfFileWriter, PdfFileReader
 from pdfminer.converter import TextConverter
 from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument
 from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
 from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
 
 warnings.filterwarnings("ignore")
 
+# names of the text extractors of a page
+PYPDF2 = "PyPDF2"
+PDFMINER = "pdfminer"
+# a page with less text than this from the first extractor is read AGAIN with the second one
+MIN_PAGE_CHARS = 50
+
 
 def download_file(url):
     local_filename = url.split('/')[-1]
@@ -34,15 +44,34 @@ def download_file(url):
     return local_filename
 
 
+class PageMiner():
+    """pdfminer text of the pages of ONE open pdf file, with one interpreter and one output buffer for all the pages"""
+    def __init__(self, fp):
+        self.resource_manager = PDFResourceManager()
+        self.retstr = StringIO()
+        self.device = TextConverter(self.resource_manager, self.retstr, codec='utf-8', laparams=LAParams())
+        self.interpreter = PDFPageInterpreter(self.resource_manager, self.device)
+        # the page objects are only parsed once a page is processed
+        self.pages = list(PDFPage.create_pages(PDFDocument(PDFParser(fp))))
+
+    def page_text(self, i):
+        self.retstr.seek(0)
+        self.retstr.truncate(0)
+        self.interpreter.process_page(self.pages[i])
+        return self.retstr.getvalue().replace("\t", "").replace("\n", "")
+
+    def close(self):
+        self.device.close()
+        self.retstr.close()
+
+
 class PDFExtractor():
     def __init__(self, url):
         self.url = url
 
-    # Downloading File in local
-    def break_pdf(self, filename, start_page=-1, end_page=-1):
-        pdf_reader = PdfFileReader(open(filename, "rb"))
-        # Reading each pdf one by one
-        total_pages = pdf_reader.numPages
+    @staticmethod
+    def page_range(total_pages, start_page=-1, end_page=-1):
+        """the 0-based range of the 1-based pages start_page to end_page, or an error message"""
         if start_page == -1:
             start_page = 0
         elif start_page < 1 or start_page > total_pages:
@@ -54,10 +83,18 @@ class PDFExtractor():
             end_page = total_pages
         elif end_page < 1 or end_page > total_pages - 1:
             return "End Page Selection Is Wrong"
-        else:
-            end_page = end_page
 
-        for i in range(start_page, end_page):
+        return range(start_page, end_page)
+
+    # Downloading File in local
+    def break_pdf(self, filename, start_page=-1, end_page=-1):
+        pdf_reader = PdfFileReader(open(filename, "rb"))
+        # Reading each pdf one by one
+        pages = self.page_range(pdf_reader.numPages, start_page, end_page)
+        if isinstance(pages, str):
+            return pages
+
+        for i in pages:
             output = PdfFileWriter()
             output.addPage(pdf_reader.getPage(i))
             with open(str(i + 1) + "_" + filename, "wb") as outputStream:
@@ -69,9 +106,13 @@ class PDFExtractor():
         pageObj = pdf_reader.getPage(0)
 
         # extracting extract_text from page
-        text = pageObj.extractText()
-        text = text.replace("\n", "").replace("\t", "")
-        return text
+        return self.page_text_algo_1(pageObj)
+
+    @staticmethod
+    def page_text_algo_1(page):
+        """the text of a PyPDF2 page object"""
+        text = page.extractText()
+        return text.replace("\n", "").replace("\t", "")
 
     def extract_text_algo_2(self, file):
         pdfResourceManager = PDFResourceManager()
@@ -106,11 +147,11 @@ class PDFExtractor():
         else:
             return text1
 
-    def extarct_table(self, file):
+    def extarct_table(self, file, page=1):
 
         # Read pdf into DataFrame
         try:
-            df = tabula.read_pdf(file, output_format="csv")
+            df = tabula.read_pdf(file, output_format="csv", pages=page)
         except:
             print("Error Reading Table")
             return
@@ -141,124 +182,164 @@ class PDFExtractor():
         pdf_reader = PdfFileReader(open(filename, 'rb'))
 
         for i in range(0, pdf_reader.numPages):
+            number = self.save_page_images(pdf_reader.getPage(i), filename, number)
+            if number is None:
+                return
 
-            page = pdf_reader.getPage(i)
+        return number
 
-            try:
-                xObject = page['/Resources']['/XObject'].getObject()
-            except:
-                print("No XObject Found")
-                return
+    def save_page_images(self, page, filename, number):
+        """save the images of a PyPDF2 page object: return the next image number, or None if the page has none"""
+        try:
+            xObject = page['/Resources']['/XObject'].getObject()
+        except:
+            print("No XObject Found")
+            return
 
-            for obj in xObject:
+        for obj in xObject:
 
-                try:
+            try:
 
-                    if xObject[obj]['/Subtype'] == '/Image':
-                        size = (xObject[obj]['/Width'], xObject[obj]['/Height'])
-                        data = xObject[obj]._data
-                        if xObject[obj]['/ColorSpace'] == '/DeviceRGB':
-                            mode = "RGB"
+                if xObject[obj]['/Subtype'] == '/Image':
+                    size = (xObject[obj]['/Width'], xObject[obj]['/Height'])
+                    data = xObject[obj]._data
+                    if xObject[obj]['/ColorSpace'] == '/DeviceRGB':
+                        mode = "RGB"
+                    else:
+                        mode = "P"
+
+                    image_name = filename.split(".")[0] + str(number)
+
+                    print(xObject[obj]['/Filter'])
+
+                    if xObject[obj]['/Filter'] == '/FlateDecode':
+                        data = xObject[obj].getData()
+                        img = Image.frombytes(mode, size, data)
+                        img.save(image_name + "_Flate.png")
+                        # save_to_s3(imagename + "_Flate.png")
+                        print("Image_Saved")
+
+                        number += 1
+                    elif xObject[obj]['/Filter'] == '/DCTDecode':
+                        img = open(image_name + "_DCT.jpg", "wb")
+                        img.write(data)
+                        # save_to_s3(imagename + "_DCT.jpg")
+                        img.close()
+                        number += 1
+                    elif xObject[obj]['/Filter'] == '/JPXDecode':
+                        img = open(image_name + "_JPX.jp2", "wb")
+                        img.write(data)
+                        # save_to_s3(imagename + "_JPX.jp2")
+                        img.close()
+                        number += 1
+                    elif xObject[obj]['/Filter'] == '/CCITTFaxDecode':
+                        if xObject[obj]['/DecodeParms']['/K'] == -1:
+                            CCITT_group = 4
                         else:
-                            mode = "P"
-
-                        image_name = filename.split(".")[0] + str(number)
-
-                        print(xObject[obj]['/Filter'])
-
-                        if xObject[obj]['/Filter'] == '/FlateDecode':
-                            data = xObject[obj].getData()
-                            img = Image.frombytes(mode, size, data)
-                            img.save(image_name + "_Flate.png")
-                            # save_to_s3(imagename + "_Flate.png")
-                            print("Image_Saved")
-
-                            number += 1
-                        elif xObject[obj]['/Filter'] == '/DCTDecode':
-                            img = open(image_name + "_DCT.jpg", "wb")
-                            img.write(data)
-                            # save_to_s3(imagename + "_DCT.jpg")
-                            img.close()
-                            number += 1
-                        elif xObject[obj]['/Filter'] == '/JPXDecode':
-                            img = open(image_name + "_JPX.jp2", "wb")
-                            img.write(data)
-                            # save_to_s3(imagename + "_JPX.jp2")
-                            img.close()
-                            number += 1
-                        elif xObject[obj]['/Filter'] == '/CCITTFaxDecode':
-                            if xObject[obj]['/DecodeParms']['/K'] == -1:
-                                CCITT_group = 4
-                            else:
-                                CCITT_group = 3
-                            width = xObject[obj]['/Width']
-                            height = xObject[obj]['/Height']
-                            data = xObject[obj]._data  # sorry, getData() does not work for CCITTFaxDecode
-                            img_size = len(data)
-                            tiff_header = self.tiff_header_for_CCITT(width, height, img_size, CCITT_group)
-                            img_name = image_name + '_CCITT.tiff'
-                            with open(img_name, 'wb') as img_file:
-                                img_file.write(tiff_header + data)
-
-                            # save_to_s3(img_name)
-                            number += 1
-                except:
-                    continue
+                            CCITT_group = 3
+                        width = xObject[obj]['/Width']
+                        height = xObject[obj]['/Height']
+                        data = xObject[obj]._data  # sorry, getData() does not work for CCITTFaxDecode
+                        img_size = len(data)
+                        tiff_header = self.tiff_header_for_CCITT(width, height, img_size, CCITT_group)
+                        img_name = image_name + '_CCITT.tiff'
+                        with open(img_name, 'wb') as img_file:
+                            img_file.write(tiff_header + data)
+
+                        # save_to_s3(img_name)
+                        number += 1
+            except:
+                continue
 
         return number
 
-    def read_pages(self, start_page=-1, end_page=-1):
+    def read_file(self, filename, start_page=-1, end_page=-1, first=PYPDF2, tables=True, images=True):
+        """
+        Read the pages of the pdf file in memory, opening it ONCE: the text of each page comes from the first
+        extractor, and ONLY from the second one as well if the first found less than MIN_PAGE_CHARS characters.
+        Print the time of each extractor on each page and return the text of each page.
+        """
+        if first not in (PYPDF2, PDFMINER):
+            return "First Extractor Must Be %s Or %s" % (PYPDF2, PDFMINER)
+        second = PDFMINER if first == PYPDF2 else PYPDF2
+        texts = []
+        # images are numbered across ALL the pages so that a page does not overwrite those of the page before
+        image_number = 1
+        timings = {PYPDF2: [], PDFMINER: []}
+        miner = None
+        with open(filename, 'rb') as fp:
+            pdf_reader = PdfFileReader(fp)
+            pages = self.page_range(pdf_reader.numPages, start_page, end_page)
+            if isinstance(pages, str):
+                return pages
+
+            for i in pages:
+                print("\nStarting to Read Page: ", i + 1, "\n -----------===-------------")
+
+                page_texts = {}
+                for extractor in (first, second):
+                    if extractor == PDFMINER and miner is None:
+                        miner = PageMiner(fp)
+                    start = time.perf_counter()
+                    if extractor == PYPDF2:
+                        page_texts[extractor] = self.page_text_algo_1(pdf_reader.getPage(i))
+                    else:
+                        page_texts[extractor] = miner.page_text(i)
+                    timings[extractor].append(time.perf_counter() - start)
+                    if len(page_texts[extractor]) >= MIN_PAGE_CHARS:
+                        break
+
+                file_text = max(page_texts.values(), key=len)
+                print(file_text)
+                texts.append(file_text)
+                print("Page", i + 1, "timing:", ", ".join("%s %.4f s, %d chars"
+                      % (name, timings[name][-1], len(text)) for name, text in page_texts.items()))
+
+                if images:
+                    image_number = self.save_page_images(pdf_reader.getPage(i), filename, image_number) or image_number
+                if tables:
+                    self.extarct_table(filename, i + 1)
+                print("Stopped Reading Page: ", i + 1, "\n -----------===-------------")
+
+        if miner:
+            miner.close()
+        for name, secs in timings.items():
+            if secs:
+                print("%s: %d page(s) in %.4f s = %.4f s/page" % (name, len(secs), sum(secs), sum(secs) / len(secs)))
+        return texts
+
+    def read_pages(self, start_page=-1, end_page=-1, first=PYPDF2):
 
         # Downloading file locally
         downloaded_file = download_file(self.url)
         print(downloaded_file)
 
-        # breaking PDF into number of pages in diff pdf files
-        self.break_pdf(downloaded_file, start_page, end_page)
-
-        # creating a pdf reader object
-        pdf_reader = PdfFileReader(open(downloaded_file, 'rb'))
-
-        # Reading each pdf one by one
-        total_pages = pdf_reader.numPages
-
-        if start_page == -1:
-            start_page = 0
-        elif start_page < 1 or start_page > total_pages:
-            return "Start Page Selection Is Wrong"
-        else:
-            start_page = start_page - 1
-
-        if end_page == -1:
-            end_page = total_pages
-        elif end_page < 1 or end_page > total_pages - 1:
-            return "End Page Selection Is Wrong"
-        else:
-            end_page = end_page
-
-        for i in range(start_page, end_page):
-            # creating a page based filename
-            file = str(i + 1) + "_" + downloaded_file
-
-            print("\nStarting to Read Page: ", i + 1, "\n -----------===-------------")
-
-            file_text = self.extract_text(file)
-            print(file_text)
-            self.extract_image(file)
-
-            self.extarct_table(file)
-            os.remove(file)
-            print("Stopped Reading Page: ", i + 1, "\n -----------===-------------")
+        # reading each page from the ONE downloaded file, with no pdf file per page
+        texts = self.read_file(downloaded_file, start_page, end_page, first)
 
         os.remove(downloaded_file)
-
-
-# I have tested on these 3 pdf files
-# url = "http://s3.amazonaws.com/NLP_Project/Original_Documents/Healthcare-January-2017.pdf"
-url = "http://s3.amazonaws.com/NLP_Project/Original_Documents/Sample_Test.pdf"
-# url = "http://s3.amazonaws.com/NLP_Project/Original_Documents/Sazerac_FS_2017_06_30%20Annual.pdf"
-# creating the instance of class
-pdf_extractor = PDFExtractor(url)
-
-# Getting desired data out
-pdf_extractor.read_pages(15, 23)
+        return texts
+
+
+if __name__ == "__main__":
+    import sys
+
+    # a local pdf file: python3 withPdfminer.py <pdf file> [start page] [end page] [first extractor]
+    if len(sys.argv) > 1:
+        start_page = int(sys.argv[2]) if len(sys.argv) > 2 else -1
+        end_page = int(sys.argv[3]) if len(sys.argv) > 3 else -1
+        first = sys.argv[4] if len(sys.argv) > 4 else PYPDF2
+        texts = PDFExtractor(sys.argv[1]).read_file(sys.argv[1], start_page, end_page, first, tables=False, images=False)
+        if isinstance(texts, str):
+            print(texts)
+        sys.exit()
+
+    # I have tested on these 3 pdf files
+    # url = "http://s3.amazonaws.com/NLP_Project/Original_Documents/Healthcare-January-2017.pdf"
+    url = "http://s3.amazonaws.com/NLP_Project/Original_Documents/Sample_Test.pdf"
+    # url = "http://s3.amazonaws.com/NLP_Project/Original_Documents/Sazerac_FS_2017_06_30%20Annual.pdf"
+    # creating the instance of class
+    pdf_extractor = PDFExtractor(url)
+
+    # Getting desired data out
+    pdf_extractor.read_pages(15, 23)